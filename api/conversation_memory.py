@@ -0,0 +1,141 @@
+"""
+Conversation memory for chat sessions.
+Keeps recent messages verbatim and folds older ones into a rolling summary,
+so chat prompts stay within a token budget however long the chat runs.
+"""
+
+from datetime import datetime
+
+from services.transcript_chunker import estimate_tokens
+
+
+class ConversationMemory:
+    """Chat messages with a token-budgeted prompt window and a rolling summary of older turns."""
+    
+    def __init__(self, max_messages=20):
+        self.messages = []
+        self.max_messages = max_messages
+        # Rolling summary of turns that no longer fit the prompt window
+        self.summary = ''
+        self.summarized_messages = 0
+        # Messages trimmed from the window but not folded into the summary yet
+        self.unsummarized = []
+    
+    def add_user_message(self, message):
+        """Add a user message to memory."""
+        self.messages.append({
+            'type': 'user',
+            'content': message,
+            'timestamp': datetime.now().isoformat()
+        })
+        self._trim_memory()
+    
+    def add_ai_message(self, message):
+        """Add an AI response to memory."""
+        self.messages.append({
+            'type': 'ai',
+            'content': message,
+            'timestamp': datetime.now().isoformat()
+        })
+        self._trim_memory()
+    
+    def get_conversation_history(self):
+        """Get formatted conversation history for context."""
+        return self._format(self.messages)
+    
+    def get_recent_context(self, num_messages=10):
+        """Get recent conversation context."""
+        recent = self.messages[-num_messages:] if len(self.messages) > num_messages else self.messages
+        return self._format(recent)
+    
+    def get_budgeted_context(self, token_budget, summarize=None):
+        """
+        Get conversation context that fits a token budget.
+        
+        The newest messages that fit the budget are included verbatim. Older
+        messages are folded into the rolling summary with ``summarize``; each
+        fold goes down to half the budget, so summarization runs once every
+        few turns rather than on every message.
+        
+        Args:
+            token_budget (int): Approximate tokens for the verbatim messages
+            summarize (callable, optional): summarize(previous_summary, turns_text) -> new summary
+            
+        Returns:
+            str: The summary (if any) followed by the recent messages
+        """
+        window = self._fit(token_budget)
+        if summarize and (self.unsummarized or window < len(self.messages)):
+            keep = self._fit(token_budget // 2)
+            folded = self.unsummarized + self.messages[:len(self.messages) - keep]
+            try:
+                self.summary = summarize(self.summary, self._format(folded))
+                self.summarized_messages += len(folded)
+                self.unsummarized = []
+                self.messages = self.messages[len(self.messages) - keep:]
+                window = keep
+                print(f"🧠 Folded {len(folded)} older messages into the conversation summary")
+            except Exception as e:
+                # Keep the older turns for the next attempt, the window alone stays in budget
+                print(f"⚠️  Could not summarize older conversation: {e}")
+        
+        context = self._format(self.messages[len(self.messages) - window:])
+        if self.summary:
+            context = f"Summary of the earlier conversation:\n{self.summary}\n\n{context}"
+        return context
+    
+    def _fit(self, token_budget):
+        """Number of newest messages that fit a token budget (at least the last one)."""
+        count, used = 0, 0
+        for msg in reversed(self.messages):
+            cost = estimate_tokens(msg['content'])
+            if count and used + cost > token_budget:
+                break
+            count += 1
+            used += cost
+        return count
+    
+    @staticmethod
+    def _format(messages):
+        """Format messages as Human/Assistant lines."""
+        lines = []
+        for msg in messages:
+            if msg['type'] == 'user':
+                lines.append(f"Human: {msg['content']}")
+            else:
+                lines.append(f"Assistant: {msg['content']}")
+        return "\n".join(lines)
+    
+    def _trim_memory(self):
+        """Keep memory within limits, queueing the oldest messages for the summary."""
+        overflow = len(self.messages) - self.max_messages
+        if overflow > 0:
+            self.unsummarized.extend(self.messages[:overflow])
+            self.messages = self.messages[overflow:]
+    
+    def clear(self):
+        """Clear conversation memory."""
+        self.messages = []
+        self.summary = ''
+        self.summarized_messages = 0
+        self.unsummarized = []
+    
+    def to_dict(self):
+        """Convert memory to dictionary for storage."""
+        return {
+            'messages': self.messages,
+            'max_messages': self.max_messages,
+            'summary': self.summary,
+            'summarized_messages': self.summarized_messages,
+            'unsummarized': self.unsummarized
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Create memory from dictionary."""
+        memory = cls(max_messages=data.get('max_messages', 20))
+        memory.messages = data.get('messages', [])
+        memory.summary = data.get('summary', '')
+        memory.summarized_messages = data.get('summarized_messages', 0)
+        memory.unsummarized = data.get('unsummarized', [])
+        return memory
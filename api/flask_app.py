@@ -1,88 +1,37 @@
-from flask import Flask, request, jsonify, send_file, session, send_from_directory
-from werkzeug.utils import secure_filename
+from flask import Flask, Response, request, jsonify, send_file, session, send_from_directory, stream_with_context
+import copy
+import hashlib
 import os
+import shutil
+import time
 from pathlib import Path
-import tempfile
 import json
 from datetime import datetime
 import uuid
 
-# Simple conversation memory implementation (will upgrade to LangChain later)
-class ConversationMemory:
-    """Simple conversation memory management."""
-    
-    def __init__(self, max_messages=20):
-        self.messages = []
-        self.max_messages = max_messages
-    
-    def add_user_message(self, message):
-        """Add a user message to memory."""
-        self.messages.append({
-            'type': 'user',
-            'content': message,
-            'timestamp': datetime.now().isoformat()
-        })
-        self._trim_memory()
-    
-    def add_ai_message(self, message):
-        """Add an AI response to memory."""
-        self.messages.append({
-            'type': 'ai',
-            'content': message,
-            'timestamp': datetime.now().isoformat()
-        })
-        self._trim_memory()
-    
-    def get_conversation_history(self):
-        """Get formatted conversation history for context."""
-        history = []
-        for msg in self.messages:
-            if msg['type'] == 'user':
-                history.append(f"Human: {msg['content']}")
-            else:
-                history.append(f"Assistant: {msg['content']}")
-        return "\n".join(history)
-    
-    def get_recent_context(self, num_messages=10):
-        """Get recent conversation context."""
-        recent = self.messages[-num_messages:] if len(self.messages) > num_messages else self.messages
-        context = []
-        for msg in recent:
-            if msg['type'] == 'user':
-                context.append(f"Human: {msg['content']}")
-            else:
-                context.append(f"Assistant: {msg['content']}")
-        return "\n".join(context)
-    
-    def _trim_memory(self):
-        """Keep memory within limits."""
-        if len(self.messages) > self.max_messages:
-            # Keep the first few messages for context and trim the middle
-            self.messages = self.messages[:2] + self.messages[-(self.max_messages-2):]
-    
-    def clear(self):
-        """Clear conversation memory."""
-        self.messages = []
-    
-    def to_dict(self):
-        """Convert memory to dictionary for storage."""
-        return {
-            'messages': self.messages,
-            'max_messages': self.max_messages
-        }
-    
-    @classmethod
-    def from_dict(cls, data):
-        """Create memory from dictionary."""
-        memory = cls(max_messages=data.get('max_messages', 20))
-        memory.messages = data.get('messages', [])
-        return memory
-
+from api.conversation_memory import ConversationMemory
 from api.meeting_assistant import MeetingAssistant
+from api.idempotency import IdempotencyConflictError, IdempotencyRegistry, request_fingerprint
+from api.job_manager import Job, JobManager, JobQueueFullError
+from api.upload_ingest import (
+    EXTENSION_CONTAINERS, IngestRequest, UploadRejectedError,
+    discard_unclaimed_uploads, pipelined_audio, save_upload, sniff_container, upload_digest
+)
+from api.run_store import RunStore
+from api.session_store import create_session_store
+from api.resumable_uploads import ResumableUploadManager, UploadError, parse_content_range
+from services.client_registry import get_client_registry
+from services.rate_limiter import get_rate_limiter
+from services.transcript_index import build_context, build_index
 from services.tts_service import TTSService
 from config import Config
+from utils.circuit_breaker import CircuitOpenError
+from utils.hashing import file_sha256
+from utils.sweeper import PeriodicSweeper
 
 app = Flask(__name__, static_folder='../frontend/dist', static_url_path='')
+app.request_class = IngestRequest  # Stream uploads straight into UPLOAD_FOLDER
+app.teardown_request(discard_unclaimed_uploads)
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max file size
 app.secret_key = 'your-secret-key-change-this'  # Change this in production
 
@@ -92,19 +41,38 @@ meeting_assistant = MeetingAssistant()
 # Initialize TTS service
 tts_service = TTSService()
 
-# Store active chat sessions with conversation memory
-chat_sessions = {}
+# Background job pool for the long-running processing pipelines
+job_manager = JobManager()
+
+# In-progress resumable uploads
+upload_manager = ResumableUploadManager()
+
+# Jobs already started per Idempotency-Key and request fingerprint
+idempotency = IdempotencyRegistry()
+
+# Active chat sessions with conversation memory (SESSION_STORE_BACKEND)
+chat_sessions = create_session_store()
+
+# Drops idle chat sessions in the background (reads also skip expired ones)
+session_sweeper = PeriodicSweeper('chat sessions', Config.SESSION_SWEEP_INTERVAL_SECONDS,
+                                  chat_sessions.purge_expired)
+session_sweeper.start()
 
 # Allowed file extensions
 ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'wmv'}
 ALLOWED_AUDIO_EXTENSIONS = {'mp3', 'wav', 'flac', 'm4a', 'ogg', 'webm'}
 
+# Request headers cross-origin clients may send, and response headers they may read
+CORS_ALLOW_HEADERS = 'Content-Type,Authorization,Content-Range,X-Chunk-SHA256,Idempotency-Key'
+CORS_EXPOSE_HEADERS = 'Upload-Offset,Idempotent-Replayed,Retry-After'
+
 # CORS handler
 @app.after_request
 def after_request(response):
     response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
+    response.headers['Access-Control-Allow-Headers'] = CORS_ALLOW_HEADERS
     response.headers['Access-Control-Allow-Methods'] = 'GET,PUT,POST,DELETE,OPTIONS'
+    response.headers['Access-Control-Expose-Headers'] = CORS_EXPOSE_HEADERS
     return response
 
 @app.before_request
@@ -112,7 +80,7 @@ def handle_preflight():
     if request.method == "OPTIONS":
         response = jsonify({'status': 'OK'})
         response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
+        response.headers['Access-Control-Allow-Headers'] = CORS_ALLOW_HEADERS
         response.headers['Access-Control-Allow-Methods'] = 'GET,PUT,POST,DELETE,OPTIONS'
         return response
 
@@ -120,6 +88,95 @@ def allowed_file(filename, allowed_extensions):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
+def release_upload(run_id, upload_dir):
+    """Return a cleanup callback that deletes an upload unless its failed run needs it to resume."""
+    def cleanup():
+        if meeting_assistant.run_store.keeps_upload(run_id):
+            print(f"📦 Keeping upload for run {run_id} so it can be resumed")
+            return
+        shutil.rmtree(upload_dir, ignore_errors=True)
+    return cleanup
+
+def inspect_upload(file_path, temp_dir):
+    """Probe a saved upload; returns (media_info, None) or (None, 400 error response)."""
+    try:
+        return meeting_assistant.inspect_media(file_path), None
+    except Exception as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return None, (jsonify({'error': str(e)}), 400)
+
+def submit_job(job_type, target, cleanup=None, media_info=None, upload_dir=None,
+               run_id=None, fingerprint=None, **kwargs):
+    """
+    Queue a checkpointed processing job and build the 202 Accepted response.
+    
+    Requests with a fingerprint are submitted at most once: a retry with the same
+    Idempotency-Key header, or an identical request while the earlier job is
+    queued, running or completed, gets the earlier job's response instead.
+    """
+    def submit():
+        new_run_id = run_id or meeting_assistant.run_store.create(job_type, upload_dir=upload_dir)
+        job = job_manager.submit(
+            job_type, target,
+            cleanup=release_upload(new_run_id, upload_dir) if upload_dir else cleanup,
+            run_id=new_run_id, **kwargs
+        )
+        body = {
+            'success': True,
+            'job_id': job.job_id,
+            'status': job.status,
+            'status_url': f'/jobs/{job.job_id}',
+            'run_id': new_run_id,
+            'resume_url': f'/runs/{new_run_id}/resume',
+            'queue_depth': job_manager.queue_depth
+        }
+        if media_info:
+            body['media_info'] = media_info
+        return body
+    
+    try:
+        if fingerprint is None:
+            body, replayed = submit(), False
+        else:
+            body, replayed = idempotency.submit_once(
+                request.headers.get('Idempotency-Key'), fingerprint, submit,
+                reusable=lambda previous: job_is_reusable(previous['job_id'])
+            )
+    except IdempotencyConflictError as e:
+        discard_duplicate(upload_dir, run_id, cleanup)
+        return jsonify({'error': str(e)}), 422
+    except JobQueueFullError as e:
+        discard_duplicate(upload_dir, run_id, cleanup)
+        response = jsonify({'error': str(e), 'queue_depth': job_manager.queue_depth})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    if not replayed:
+        return jsonify(body), 202
+    
+    # Attach to the job that is already handling this request
+    discard_duplicate(upload_dir, run_id, cleanup)
+    job = job_manager.get_job(body['job_id'])
+    response = jsonify({**body, 'status': job.status if job else body['status'],
+                        'queue_depth': job_manager.queue_depth, 'replayed': True})
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response, 202
+
+def job_is_reusable(job_id):
+    """Whether an identical request may attach to this job instead of starting a new one."""
+    job = job_manager.get_job(job_id)
+    return job is not None and job.status != Job.FAILED
+
+def discard_duplicate(upload_dir, run_id, cleanup):
+    """Release the upload of a request that was not queued."""
+    if run_id:
+        # Resuming: the upload belongs to the run, not to this request
+        return
+    if upload_dir:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+    elif cleanup:
+        cleanup()
+
 @app.route('/', methods=['GET'])
 def serve_frontend():
     """Serve the main React frontend application."""
@@ -153,8 +210,16 @@ def api_info():
             'process_audio': '/process-audio',
             'process_transcript': '/process-transcript',
             'transcribe': '/transcribe-only',
+            'jobs': '/jobs',
+            'job_status': '/jobs/{job_id}',
+            'run_status': '/runs/{run_id}',
+            'run_resume': '/runs/{run_id}/resume',
+            'upload_create': '/uploads',
+            'upload_chunk': '/uploads/{upload_id}',
+            'upload_finalize': '/uploads/{upload_id}/finalize',
             'chat_start': '/chat/start',
             'chat_message': '/chat/{session_id}/message',
+            'chat_message_stream': '/chat/{session_id}/message/stream',
             'chat_history': '/chat/{session_id}/history',
             'chat_memory': '/chat/{session_id}/memory',
             'chat_memory_clear': '/chat/{session_id}/memory/clear',
@@ -174,7 +239,8 @@ def health_check():
         return jsonify({
             'status': 'healthy',
             'timestamp': datetime.now().isoformat(),
-            'services': service_status
+            'services': service_status,
+            'jobs': job_manager.get_stats()
         })
     except Exception as e:
         return jsonify({
@@ -210,15 +276,29 @@ def process_video():
         company_name = request.form.get('company_name')
         custom_message = request.form.get('custom_message')
         
-        # Save uploaded file temporarily
-        filename = secure_filename(file.filename)
-        temp_dir = tempfile.mkdtemp()
-        file_path = os.path.join(temp_dir, filename)
-        file.save(file_path)
-        
-        # Process the video
-        results = meeting_assistant.process_meeting_recording(
+        # Keep the upload (already streamed to disk) until the job finishes;
+        # streamable videos also had their audio extracted during the upload
+        file_path, temp_dir = save_upload(file)
+        extracted_audio = pipelined_audio(file)
+        
+        # Reject unreadable, silent or over-long recordings before queueing
+        media_info, error_response = inspect_upload(extracted_audio or file_path, temp_dir)
+        if error_response:
+            return error_response
+        
+        # Process the video in the background; the upload is removed afterwards
+        return submit_job(
+            'video',
+            meeting_assistant.process_meeting_recording,
+            upload_dir=temp_dir,
+            media_info=media_info,
+            fingerprint=request_fingerprint(
+                'video', upload_digest(file, file_path or extracted_audio),
+                recipients=recipients, meeting_title=meeting_title, meeting_date=meeting_date,
+                company_name=company_name, custom_message=custom_message
+            ),
             video_file_path=file_path,
+            extracted_audio_path=extracted_audio,
             recipients=recipients,
             meeting_title=meeting_title,
             meeting_date=meeting_date,
@@ -226,15 +306,8 @@ def process_video():
             custom_email_message=custom_message
         )
         
-        # Clean up temporary file
-        try:
-            os.remove(file_path)
-            os.rmdir(temp_dir)
-        except:
-            pass
-        
-        return jsonify(results)
-        
+    except UploadRejectedError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -265,14 +338,25 @@ def process_audio():
         company_name = request.form.get('company_name')
         custom_message = request.form.get('custom_message')
         
-        # Save uploaded file temporarily
-        filename = secure_filename(file.filename)
-        temp_dir = tempfile.mkdtemp()
-        file_path = os.path.join(temp_dir, filename)
-        file.save(file_path)
-        
-        # Process the audio
-        results = meeting_assistant.process_audio_file(
+        # Keep the upload (already streamed to disk) until the job finishes
+        file_path, temp_dir = save_upload(file)
+        
+        # Reject unreadable, silent or over-long recordings before queueing
+        media_info, error_response = inspect_upload(file_path, temp_dir)
+        if error_response:
+            return error_response
+        
+        # Process the audio in the background; the upload is removed afterwards
+        return submit_job(
+            'audio',
+            meeting_assistant.process_audio_file,
+            upload_dir=temp_dir,
+            media_info=media_info,
+            fingerprint=request_fingerprint(
+                'audio', upload_digest(file, file_path),
+                recipients=recipients, meeting_title=meeting_title, meeting_date=meeting_date,
+                company_name=company_name, custom_message=custom_message
+            ),
             audio_file_path=file_path,
             recipients=recipients,
             meeting_title=meeting_title,
@@ -281,15 +365,8 @@ def process_audio():
             custom_email_message=custom_message
         )
         
-        # Clean up temporary file
-        try:
-            os.remove(file_path)
-            os.rmdir(temp_dir)
-        except:
-            pass
-        
-        return jsonify(results)
-        
+    except UploadRejectedError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -313,8 +390,15 @@ def process_transcript():
         company_name = data.get('company_name')
         custom_message = data.get('custom_message')
         
-        # Process the transcript
-        results = meeting_assistant.process_transcript_text(
+        # Process the transcript in the background
+        return submit_job(
+            'transcript',
+            meeting_assistant.process_transcript_text,
+            fingerprint=request_fingerprint(
+                'transcript', hashlib.sha256(transcript.encode('utf-8')).hexdigest(),
+                recipients=recipients, meeting_title=meeting_title, meeting_date=meeting_date,
+                company_name=company_name, custom_message=custom_message
+            ),
             transcript=transcript,
             recipients=recipients,
             meeting_title=meeting_title,
@@ -323,8 +407,6 @@ def process_transcript():
             custom_email_message=custom_message
         )
         
-        return jsonify(results)
-        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -333,52 +415,225 @@ def transcribe_only():
     """Transcribe audio/video file without generating summary."""
     try:
         file = None
-        file_path = None
+        media_path = None
+        is_video = False
+        upload_dir = None
         
         # Check for video file
         if 'video_file' in request.files:
             file = request.files['video_file']
             if allowed_file(file.filename, ALLOWED_VIDEO_EXTENSIONS):
-                # Save and convert video to audio first
-                filename = secure_filename(file.filename)
-                temp_dir = tempfile.mkdtemp()
-                file_path = os.path.join(temp_dir, filename)
-                file.save(file_path)
-                
-                # Convert to audio
-                audio_path = meeting_assistant.media_converter.convert_mp4_to_mp3(file_path)
-                file_path = audio_path
+                file_path, upload_dir = save_upload(file)
+                # Use the audio extracted during the upload if there is one
+                media_path = pipelined_audio(file) or file_path
+                is_video = media_path == file_path
         
         # Check for audio file
         elif 'audio_file' in request.files:
             file = request.files['audio_file']
             if allowed_file(file.filename, ALLOWED_AUDIO_EXTENSIONS):
-                filename = secure_filename(file.filename)
-                temp_dir = tempfile.mkdtemp()
-                file_path = os.path.join(temp_dir, filename)
-                file.save(file_path)
+                media_path, upload_dir = save_upload(file)
         
-        if not file_path:
+        if not media_path:
             return jsonify({'error': 'No valid audio or video file provided'}), 400
         
-        # Transcribe the audio
-        result = meeting_assistant.transcription_service.transcribe_audio(file_path)
+        # Strip silence and encode exactly as the processing pipeline does, so
+        # both endpoints share transcription cache entries and transcripts
+        file_path, voiced = meeting_assistant.prepare_for_transcription(media_path, is_video)
+        result = meeting_assistant.transcription_service.transcribe_audio(
+            file_path,
+            duration=voiced['processed_duration'] if voiced else None,
+            time_map=voiced['time_map'] if voiced else None
+        )
         
         # Clean up temporary files
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except:
-            pass
+        for path in (file_path, voiced['audio_file'] if voiced else None):
+            try:
+                if path and os.path.exists(path):
+                    os.remove(path)
+            except:
+                pass
+        if upload_dir:
+            shutil.rmtree(upload_dir, ignore_errors=True)
         
         return jsonify({
             'success': True,
             'transcript': result['text'],
+            'segments': result.get('segments'),
             'language': result.get('language'),
             'duration': result.get('duration'),
             'output_file': result['output_file']
         })
         
+    except UploadRejectedError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """List tracked processing jobs along with worker pool statistics."""
+    return jsonify({
+        'success': True,
+        'stats': job_manager.get_stats(),
+        'jobs': job_manager.list_jobs()
+    })
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Get the status, per-stage timings and artifacts of a processing job."""
+    job = job_manager.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    job_info = job.to_dict()
+    job_info['queue_depth'] = job_manager.queue_depth
+    return jsonify({'success': True, 'job': job_info})
+
+@app.route('/runs/<run_id>', methods=['GET'])
+def get_run(run_id):
+    """Get the checkpointed state of a processing run."""
+    run = meeting_assistant.run_store.get(run_id)
+    if not run:
+        return jsonify({'error': 'Run not found'}), 404
+    
+    return jsonify({'success': True, 'run': {
+        key: run[key] for key in ('run_id', 'job_type', 'status', 'start_stage',
+                                  'completed_stages', 'failed_stage', 'error')
+    }})
+
+@app.route('/runs/<run_id>/resume', methods=['POST'])
+def resume_run(run_id):
+    """Resume a failed run at its first incomplete stage as a new job."""
+    run = meeting_assistant.run_store.get(run_id)
+    if not run:
+        return jsonify({'error': 'Run not found'}), 404
+    if run['status'] == RunStore.COMPLETED:
+        # Nothing left to do; return what the run produced
+        return jsonify({'success': True, 'run_id': run_id, 'status': run['status'],
+                        'results': run['results']})
+    if run['status'] != RunStore.FAILED:
+        # Created runs are queued and running runs are in progress; resuming
+        # either would start a second pipeline for the same run
+        return jsonify({'error': f"Only failed runs can be resumed; run is {run['status']}"}), 409
+    
+    return submit_job(
+        run['job_type'],
+        meeting_assistant.resume_run,
+        upload_dir=run['upload_dir'],
+        run_id=run_id,
+        fingerprint=request_fingerprint('resume', run_id)
+    )
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    """Start a resumable upload; the client then PUTs byte ranges."""
+    try:
+        data = request.get_json() or {}
+        status = upload_manager.create(data.get('filename'), data.get('size'), data.get('sha256'))
+        status['upload_url'] = f"/uploads/{status['upload_id']}"
+        return jsonify({'success': True, **status}), 201
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def get_upload_status(upload_id):
+    """Report how much of an upload has been received, so a client can resume."""
+    try:
+        status = upload_manager.status(upload_id)
+        response = jsonify({'success': True, **status})
+        response.headers['Upload-Offset'] = str(status['offset'])
+        return response
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+@app.route('/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    """Write one chunk, addressed by Content-Range and verified by X-Chunk-SHA256."""
+    try:
+        start, end, total = parse_content_range(request.headers.get('Content-Range'))
+        status = upload_manager.write_chunk(
+            upload_id, start, end, total, request.stream,
+            checksum=request.headers.get('X-Chunk-SHA256')
+        )
+        response = jsonify({'success': True, **status})
+        response.headers['Upload-Offset'] = str(status['offset'])
+        return response
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/uploads/<upload_id>', methods=['DELETE'])
+def cancel_upload(upload_id):
+    """Abandon a resumable upload."""
+    try:
+        upload_manager.cancel(upload_id)
+        return jsonify({'success': True})
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+@app.route('/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Complete a resumable upload and queue it as a video or audio job."""
+    try:
+        data = request.get_json() or {}
+        media_type = data.get('type', 'video')
+        if media_type not in ('video', 'audio'):
+            return jsonify({'error': "type must be 'video' or 'audio'"}), 400
+        
+        recipients = data.get('recipients', [])
+        if isinstance(recipients, str):
+            recipients = recipients.split(',')
+        recipients = [email.strip() for email in recipients if email.strip()]
+        if not recipients:
+            return jsonify({'error': 'No recipients provided'}), 400
+        
+        status = upload_manager.status(upload_id)
+        allowed = ALLOWED_VIDEO_EXTENSIONS if media_type == 'video' else ALLOWED_AUDIO_EXTENSIONS
+        if not allowed_file(status['filename'], allowed):
+            return jsonify({'error': 'Invalid file type. Allowed: ' + ', '.join(allowed)}), 400
+        
+        file_path, upload_dir = upload_manager.finalize(upload_id)
+        
+        # Same magic-byte check as streamed uploads
+        with open(file_path, 'rb') as f:
+            container = sniff_container(f.read(64))
+        extension = status['filename'].rsplit('.', 1)[1].lower()
+        if container not in EXTENSION_CONTAINERS.get(extension, set()):
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            return jsonify({'error': f"'{status['filename']}' does not look like a .{extension} file"}), 400
+        
+        media_info, error_response = inspect_upload(file_path, upload_dir)
+        if error_response:
+            return error_response
+        
+        if media_type == 'video':
+            target, path_kwarg = meeting_assistant.process_meeting_recording, 'video_file_path'
+        else:
+            target, path_kwarg = meeting_assistant.process_audio_file, 'audio_file_path'
+        return submit_job(
+            media_type,
+            target,
+            upload_dir=upload_dir,
+            media_info=media_info,
+            fingerprint=request_fingerprint(
+                media_type, file_sha256(file_path),
+                recipients=recipients, meeting_title=data.get('meeting_title'),
+                meeting_date=data.get('meeting_date'), company_name=data.get('company_name'),
+                custom_message=data.get('custom_message')
+            ),
+            recipients=recipients,
+            meeting_title=data.get('meeting_title'),
+            meeting_date=data.get('meeting_date'),
+            company_name=data.get('company_name'),
+            custom_email_message=data.get('custom_message'),
+            **{path_kwarg: file_path}
+        )
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -434,6 +689,84 @@ def not_found(e):
 def internal_error(e):
     return jsonify({'error': 'Internal server error'}), 500
 
+def chat_transcript_context(session_data, user_message):
+    """Transcript text for a chat turn: the full transcript, or excerpts relevant to the question."""
+    # Include the previous question so follow-ups ("who owns that?") retrieve the same topic
+    previous = [m['content'] for m in session_data['memory'].messages if m['type'] == 'user'][-1:]
+    query = ' '.join(previous + [user_message])
+    return build_context(session_data['transcript'], session_data.get('index'), query)
+
+def chat_history(memory):
+    """Conversation history for a chat prompt, kept within CHAT_HISTORY_TOKEN_BUDGET."""
+    return memory.get_budgeted_context(
+        Config.CHAT_HISTORY_TOKEN_BUDGET,
+        summarize=meeting_assistant.summarization_service.summarize_conversation
+    )
+
+def chat_state(session_data):
+    """Snapshot of a session's conversation, to detect changes made by other requests."""
+    return copy.deepcopy((session_data['memory'].to_dict(), session_data['messages']))
+
+def save_chat_exchange(session_id, session_data, loaded_state, user_message, bot_response):
+    """
+    Add a completed exchange to a chat session and write it back to the store.
+    
+    The session is re-read first. If another request changed the conversation
+    while this answer was generated, the exchange is added to that newer copy
+    instead of overwriting it; otherwise the copy this request loaded (with
+    any history it folded into the summary) is kept.
+    
+    Returns:
+        ConversationMemory: The memory that was stored
+    """
+    current = chat_sessions.get(session_id)
+    if current is not None and chat_state(current) != loaded_state:
+        session_data = current
+    memory = session_data['memory']
+    memory.add_user_message(user_message)
+    memory.add_ai_message(bot_response)
+    
+    # Store conversation in old format for backward compatibility
+    session_data['messages'].append({
+        'user': user_message,
+        'bot': bot_response,
+        'timestamp': datetime.now().isoformat()
+    })
+    chat_sessions[session_id] = session_data
+    return memory
+
+def build_chat_prompt(transcript, conversation_history, user_message):
+    """Build the chat prompt from the transcript, recent history and the new message."""
+    return f"""
+        Your name is ConverSync, and you are a helpful AI meeting assistant with access to a transcript and the ongoing conversation history.
+        
+        **Instructions:**
+        - If the user's question is related to the meeting, provide detailed answers based on the meeting content
+        - If the question is general, answer as a knowledgeable AI assistant
+        - Use the conversation history to maintain context and provide coherent responses
+        - Reference previous parts of our conversation when relevant
+        
+        **Meeting Transcript:**
+        {transcript}
+        
+        **Recent Conversation History:**
+        {conversation_history}
+        
+        **Current User Message:** {user_message}
+        
+        Please provide a helpful response that takes into account both the meeting content and our conversation history:
+        """
+
+def circuit_open_response(error):
+    """503 response telling the client when to retry while Gemini is unavailable."""
+    response = jsonify({'error': str(error), 'retry_after': round(error.retry_after)})
+    response.headers['Retry-After'] = str(max(1, round(error.retry_after)))
+    return response, 503
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @app.route('/chat/start', methods=['POST'])
 def start_chat_session():
     """Start a new chat session with transcript context."""
@@ -449,17 +782,24 @@ def start_chat_session():
         # Initialize conversation memory
         memory = ConversationMemory(max_messages=30)  # Store up to 30 messages
         
+        # Index long transcripts so each question only sends the relevant parts
+        index = build_index(data['transcript'], data.get('segments'))
+        
         # Store session data with memory
         chat_sessions[session_id] = {
             'transcript': data['transcript'],
             'created_at': datetime.now().isoformat(),
             'memory': memory,
+            'segments': data.get('segments'),
+            'index': index,
             'messages': []  # Keep for backward compatibility
         }
         
         print(f"✅ Created new chat session: {session_id}")
         print(f"📝 Session has transcript of length: {len(data['transcript'])}")
         print(f"🧠 Initialized conversation memory with max {memory.max_messages} messages")
+        if index:
+            print(f"🔎 Indexed transcript into {len(index.chunks)} chunks for retrieval")
         
         return jsonify({
             'success': True,
@@ -474,7 +814,8 @@ def start_chat_session():
 def send_chat_message(session_id):
     """Send a message in an active chat session."""
     try:
-        if session_id not in chat_sessions:
+        session_data = chat_sessions.get(session_id)
+        if session_data is None:
             return jsonify({'error': 'Invalid or expired session'}), 404
         
         data = request.get_json()
@@ -482,53 +823,25 @@ def send_chat_message(session_id):
             return jsonify({'error': 'No message provided'}), 400
         
         user_message = data['message']
-        session_data = chat_sessions[session_id]
-        transcript = session_data['transcript']
+        loaded_state = chat_state(session_data)
+        transcript = chat_transcript_context(session_data, user_message)
         memory = session_data['memory']
         
-        # Add user message to memory
-        memory.add_user_message(user_message)
-        
         # Get conversation history for context
-        conversation_history = memory.get_recent_context(num_messages=10)
+        conversation_history = chat_history(memory)
         
         # Create enhanced context-aware prompt with conversation history
-        context_prompt = f"""
-        Your name is ConverSync, and you are a helpful AI meeting assistant with access to a transcript and the ongoing conversation history.
-        
-        **Instructions:**
-        - If the user's question is related to the meeting, provide detailed answers based on the meeting content
-        - If the question is general, answer as a knowledgeable AI assistant
-        - Use the conversation history to maintain context and provide coherent responses
-        - Reference previous parts of our conversation when relevant
-        
-        **Meeting Transcript:**
-        {transcript}
-        
-        **Recent Conversation History:**
-        {conversation_history}
-        
-        **Current User Message:** {user_message}
-        
-        Please provide a helpful response that takes into account both the meeting content and our conversation history:
-        """
+        context_prompt = build_chat_prompt(transcript, conversation_history, user_message)
         
         print(f"🔄 Processing message for session {session_id}")
         print(f"📝 User message: {user_message[:100]}...")
         print(f"🧠 Using {len(memory.messages)} messages from conversation history")
         
         # Get response from Gemini
-        bot_response = meeting_assistant.summarization_service._gpt(context_prompt)
-        
-        # Add bot response to memory
-        memory.add_ai_message(bot_response)
+        bot_response = meeting_assistant.summarization_service._gpt(context_prompt, use_cache=False)
         
-        # Store conversation in old format for backward compatibility
-        session_data['messages'].append({
-            'user': user_message,
-            'bot': bot_response,
-            'timestamp': datetime.now().isoformat()
-        })
+        # Only a successful exchange is added to the memory and stored
+        memory = save_chat_exchange(session_id, session_data, loaded_state, user_message, bot_response)
         
         print(f"✅ Generated response for session {session_id}")
         print(f"🧠 Memory now contains {len(memory.messages)} total messages")
@@ -540,23 +853,96 @@ def send_chat_message(session_id):
             'conversation_length': len(memory.messages)
         })
         
+    except CircuitOpenError as e:
+        print(f"⚠️  Chat unavailable for session {session_id}: {e}")
+        return circuit_open_response(e)
     except Exception as e:
         print(f"❌ Error in send_chat_message: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/chat/<session_id>/message/stream', methods=['POST'])
+def stream_chat_message(session_id):
+    """
+    Send a message and stream the answer as Server-Sent Events.
+    
+    Emits 'token' events ({"text": ...}) as Gemini generates the answer, then a
+    'done' event with the full response, or an 'error' event. The exchange is
+    only added to the conversation memory once the stream completes.
+    """
+    try:
+        session_data = chat_sessions.get(session_id)
+        if session_data is None:
+            return jsonify({'error': 'Invalid or expired session'}), 404
+        
+        data = request.get_json()
+        if not data or 'message' not in data:
+            return jsonify({'error': 'No message provided'}), 400
+        
+        user_message = data['message']
+        loaded_state = chat_state(session_data)
+        memory = session_data['memory']
+        context_prompt = build_chat_prompt(chat_transcript_context(session_data, user_message),
+                                           chat_history(memory),
+                                           user_message)
+        
+        print(f"🔄 Streaming message for session {session_id}")
+        print(f"📝 User message: {user_message[:100]}...")
+        started = time.monotonic()
+        chunks = meeting_assistant.summarization_service.stream_generate(context_prompt)
+        
+    except CircuitOpenError as e:
+        print(f"⚠️  Chat unavailable for session {session_id}: {e}")
+        return circuit_open_response(e)
+    except Exception as e:
+        print(f"❌ Error in stream_chat_message: {e}")
+        return jsonify({'error': str(e)}), 500
+    
+    def events():
+        parts = []
+        first_token_seconds = None
+        try:
+            for text in chunks:
+                if first_token_seconds is None:
+                    first_token_seconds = time.monotonic() - started
+                    print(f"⚡ First token for session {session_id} after {first_token_seconds:.2f}s")
+                parts.append(text)
+                yield sse_event('token', {'text': text})
+        except Exception as e:
+            print(f"❌ Error while streaming for session {session_id}: {e}")
+            yield sse_event('error', {'error': str(e)})
+            return
+        
+        bot_response = ''.join(parts).strip()
+        stored_memory = save_chat_exchange(session_id, session_data, loaded_state,
+                                           user_message, bot_response)
+        print(f"✅ Streamed response for session {session_id} in {time.monotonic() - started:.2f}s")
+        
+        yield sse_event('done', {
+            'success': True,
+            'response': bot_response,
+            'timestamp': datetime.now().isoformat(),
+            'conversation_length': len(stored_memory.messages),
+            'first_token_seconds': round(first_token_seconds or 0.0, 3)
+        })
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Let nginx forward events as they are produced
+    })
+
 @app.route('/chat/<session_id>/generate-minutes', methods=['POST'])
 def generate_meeting_minutes(session_id):
     """Generate PDF meeting minutes for the session."""
     try:
         print(f"🔄 PDF generation requested for session: {session_id}")
-        print(f"🔄 Available sessions: {list(chat_sessions.keys())}")
         
-        if session_id not in chat_sessions:
+        session_data = chat_sessions.get(session_id)
+        if session_data is None:
             print(f"❌ Session {session_id} not found in active sessions")
             return jsonify({'error': 'Invalid or expired session'}), 404
         
         data = request.get_json()
-        transcript = chat_sessions[session_id]['transcript']
+        transcript = session_data['transcript']
         
         # Get meeting details from request
         meeting_title = data.get('meeting_title', 'Meeting Minutes')
@@ -596,9 +982,9 @@ def send_meeting_email(session_id):
     """Send meeting minutes via email."""
     try:
         print(f"🔄 Email endpoint called for session: {session_id}")
-        print(f"🔄 Available sessions: {list(chat_sessions.keys())}")
         
-        if session_id not in chat_sessions:
+        session_data = chat_sessions.get(session_id)
+        if session_data is None:
             print(f"❌ Session {session_id} not found")
             return jsonify({'error': 'Invalid or expired session'}), 404
         
@@ -618,7 +1004,7 @@ def send_meeting_email(session_id):
             print(f"❌ Empty recipients list: {recipients}")
             return jsonify({'error': 'Recipients list is empty'}), 400
         
-        transcript = chat_sessions[session_id]['transcript']
+        transcript = session_data['transcript']
         
         # Get meeting details
         meeting_title = data.get('meeting_title', 'Meeting Minutes')
@@ -719,10 +1105,10 @@ def generate_tts(session_id):
 def get_chat_history(session_id):
     """Get chat history for a session."""
     try:
-        if session_id not in chat_sessions:
+        session_data = chat_sessions.get(session_id)
+        if session_data is None:
             return jsonify({'error': 'Invalid or expired session'}), 404
         
-        session_data = chat_sessions[session_id]
         memory = session_data.get('memory')
         
         # Return both old format and new memory format
@@ -786,14 +1172,21 @@ def debug_test_tts():
 
 @app.route('/debug/sessions', methods=['GET'])
 def debug_sessions():
-    """Debug endpoint to check active sessions."""
+    """Debug endpoint to check active sessions and their memory use."""
+    usage = chat_sessions.get_memory_usage_stats()
     sessions_detail = {}
-    for k, v in chat_sessions.items():
+    for k, usage_detail in usage.pop('sessions').items():
+        # peek() so that inspecting sessions doesn't refresh their TTL or LRU position
+        v = chat_sessions.peek(k)
+        if v is None:
+            continue
         memory = v.get('memory')
         detail = {
             'created_at': v['created_at'], 
             'transcript_length': len(v['transcript']), 
-            'message_count': len(v['messages'])
+            'message_count': len(v['messages']),
+            'index_chunks': len(v['index'].chunks) if v.get('index') else 0,
+            **usage_detail
         }
         
         # Add memory information if available
@@ -809,11 +1202,40 @@ def debug_sessions():
         sessions_detail[k] = detail
     
     return jsonify({
-        'active_sessions': list(chat_sessions.keys()),
-        'session_count': len(chat_sessions),
-        'sessions_detail': sessions_detail
+        'active_sessions': list(sessions_detail),
+        'session_count': len(sessions_detail),
+        'sessions_detail': sessions_detail,
+        'memory_usage': usage
     })
 
+@app.route('/debug/cache', methods=['GET'])
+def debug_cache():
+    """Debug endpoint to inspect cache hit rates and sizes."""
+    return jsonify({
+        'transcription': meeting_assistant.transcription_service.get_cache_stats(),
+        'llm': meeting_assistant.summarization_service.get_cache_stats(),
+        'idempotency': idempotency.get_stats()
+    })
+
+@app.route('/debug/rate-limits', methods=['GET'])
+def debug_rate_limits():
+    """Debug endpoint to inspect provider request counts, queue wait times and 429s."""
+    return jsonify({
+        'enabled': Config.RATE_LIMIT_ENABLED,
+        'limits': get_rate_limiter().limits,
+        'providers': get_rate_limiter().get_stats()
+    })
+
+@app.route('/debug/clients', methods=['GET'])
+def debug_clients():
+    """Debug endpoint to inspect shared provider clients and connection reuse."""
+    return jsonify(get_client_registry().get_stats())
+
+@app.route('/debug/llm-health', methods=['GET'])
+def debug_llm_health():
+    """Debug endpoint to inspect the Gemini circuit breaker and request hedging."""
+    return jsonify(meeting_assistant.summarization_service.get_health_stats())
+
 @app.route('/debug/create-test-session', methods=['POST'])
 def create_test_session():
     """Create a test session with the existing test transcript."""
@@ -833,6 +1255,7 @@ def create_test_session():
         chat_sessions[session_id] = {
             'transcript': transcript,
             'memory': memory,
+            'index': build_index(transcript),
             'messages': [],
             'created_at': datetime.now().isoformat()
         }
@@ -913,10 +1336,10 @@ def debug_test_email():
 def get_conversation_memory(session_id):
     """Get detailed conversation memory for a session."""
     try:
-        if session_id not in chat_sessions:
+        session_data = chat_sessions.get(session_id)
+        if session_data is None:
             return jsonify({'error': 'Invalid or expired session'}), 404
         
-        session_data = chat_sessions[session_id]
         memory = session_data.get('memory')
         
         if not memory:
@@ -929,6 +1352,8 @@ def get_conversation_memory(session_id):
                 'max_messages': memory.max_messages,
                 'conversation_history': memory.get_conversation_history(),
                 'recent_context': memory.get_recent_context(10),
+                'conversation_summary': memory.summary,
+                'summarized_messages': memory.summarized_messages,
                 'messages': memory.messages
             }
         })
@@ -940,10 +1365,10 @@ def get_conversation_memory(session_id):
 def clear_conversation_memory(session_id):
     """Clear conversation memory for a session."""
     try:
-        if session_id not in chat_sessions:
+        session_data = chat_sessions.get(session_id)
+        if session_data is None:
             return jsonify({'error': 'Invalid or expired session'}), 404
         
-        session_data = chat_sessions[session_id]
         memory = session_data.get('memory')
         
         if not memory:
@@ -951,6 +1376,7 @@ def clear_conversation_memory(session_id):
         
         messages_before = len(memory.messages)
         memory.clear()
+        chat_sessions[session_id] = session_data
         
         print(f"🧠 Cleared conversation memory for session {session_id}")
         print(f"📝 Removed {messages_before} messages from memory")
@@ -968,10 +1394,10 @@ def clear_conversation_memory(session_id):
 def get_memory_summary(session_id):
     """Get a summary of the conversation memory."""
     try:
-        if session_id not in chat_sessions:
+        session_data = chat_sessions.get(session_id)
+        if session_data is None:
             return jsonify({'error': 'Invalid or expired session'}), 404
         
-        session_data = chat_sessions[session_id]
         memory = session_data.get('memory')
         
         if not memory:
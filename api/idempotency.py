@@ -0,0 +1,118 @@
+"""
+Idempotent submission of processing requests.
+Retries carrying the same Idempotency-Key, and identical requests sent while
+an earlier one is still queued or running, attach to the existing job instead
+of starting a duplicate pipeline.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import Config
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when an Idempotency-Key is reused for a different request."""
+
+
+def request_fingerprint(job_type: str, content_digest: str = None, **fields) -> str:
+    """
+    Hash what makes two processing requests identical.
+
+    Args:
+        job_type (str): Kind of job (e.g. 'video')
+        content_digest (str, optional): SHA-256 of the uploaded file or transcript
+        **fields: Other request parameters (recipients, title, ...)
+
+    Returns:
+        str: Hex SHA-256 fingerprint
+    """
+    payload = json.dumps({'type': job_type, 'content': content_digest, 'fields': fields},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class IdempotencyRegistry:
+    """
+    Remembers the job started for each idempotency key and request fingerprint.
+
+    An explicit Idempotency-Key always replays its original response while it
+    is remembered. Without a key, an identical request (same fingerprint) only
+    attaches to the earlier job while ``reusable`` says it is still useful,
+    e.g. queued, running or completed but not failed.
+    """
+
+    def __init__(self, ttl_seconds: int = None):
+        self.ttl_seconds = ttl_seconds or Config.IDEMPOTENCY_TTL_SECONDS
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._replayed = 0
+
+    def submit_once(self, idempotency_key: Optional[str], fingerprint: str,
+                    submit: Callable[[], Dict[str, Any]],
+                    reusable: Callable[[Dict[str, Any]], bool] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Submit a request unless an equivalent one was already submitted.
+
+        ``submit`` runs under the registry lock, so it must be quick (queue
+        the job, don't run it).
+
+        Args:
+            idempotency_key (str, optional): Client-supplied Idempotency-Key header
+            fingerprint (str): request_fingerprint() of the request
+            submit (Callable): Queues the job and returns the response body
+            reusable (Callable, optional): Whether a fingerprint match may be reused
+
+        Returns:
+            Tuple[Dict[str, Any], bool]: (response body, True if it was replayed)
+
+        Raises:
+            IdempotencyConflictError: If the key was used for a different request
+        """
+        keys = [f"key:{idempotency_key}"] if idempotency_key else []
+        keys.append(f"fingerprint:{fingerprint}")
+
+        with self._lock:
+            self._prune()
+            if idempotency_key:
+                entry = self._entries.get(keys[0])
+                if entry is not None:
+                    if entry['fingerprint'] != fingerprint:
+                        raise IdempotencyConflictError(
+                            "Idempotency-Key was already used for a different request"
+                        )
+                    self._replayed += 1
+                    return entry['body'], True
+
+            entry = self._entries.get(keys[-1])
+            if entry is not None and (reusable is None or reusable(entry['body'])):
+                for key in keys:
+                    self._entries[key] = entry
+                self._replayed += 1
+                return entry['body'], True
+
+            body = submit()
+            entry = {'fingerprint': fingerprint, 'body': body, 'created_at': time.time()}
+            for key in keys:
+                self._entries[key] = entry
+            return body, False
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get registry statistics.
+
+        Returns:
+            Dict[str, int]: Remembered keys and requests answered by replay
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'replayed': self._replayed}
+
+    def _prune(self):
+        """Forget entries older than the TTL. Caller holds the lock."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry['created_at'] < cutoff]
+        for key in expired:
+            del self._entries[key]
@@ -0,0 +1,249 @@
+"""
+Background job management for long-running meeting processing.
+Runs pipelines on a bounded worker pool so API requests return immediately.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+
+
+class JobQueueFullError(Exception):
+    """Raised when no more jobs can be accepted until the queue drains."""
+
+
+class Job:
+    """State of a single background processing job."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    def __init__(self, job_type: str):
+        self.job_id = str(uuid.uuid4())
+        self.job_type = job_type
+        self.status = Job.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.current_stage: Optional[str] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def record_stage(self, stage: str, event: str):
+        """
+        Record a stage transition reported by the pipeline.
+
+        Args:
+            stage (str): Stage name (e.g. 'transcribe')
+            event (str): One of 'started', 'completed' or 'failed'
+        """
+        now = time.time()
+        with self._lock:
+            if event == 'started':
+                self.current_stage = stage
+                self.stages[stage] = {'status': Job.RUNNING, 'started_at': now}
+                return
+
+            info = self.stages.setdefault(stage, {'started_at': now})
+            info['status'] = Job.COMPLETED if event == 'completed' else Job.FAILED
+            info['finished_at'] = now
+            info['duration'] = round(now - info['started_at'], 3)
+            if self.current_stage == stage:
+                self.current_stage = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the job to a JSON-serializable dictionary."""
+        with self._lock:
+            stages = {
+                name: {
+                    'status': info.get('status'),
+                    'duration': info.get('duration'),
+                    'started_at': _isoformat(info.get('started_at')),
+                    'finished_at': _isoformat(info.get('finished_at')),
+                }
+                for name, info in self.stages.items()
+            }
+
+        artifacts = {}
+        if self.result:
+            artifacts = {
+                key: value for key, value in self.result.items()
+                if key.endswith('_file') and value
+            }
+
+        end = self.finished_at or time.time()
+        return {
+            'job_id': self.job_id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'current_stage': self.current_stage,
+            'created_at': _isoformat(self.created_at),
+            'started_at': _isoformat(self.started_at),
+            'finished_at': _isoformat(self.finished_at),
+            'queue_time': round((self.started_at or end) - self.created_at, 3),
+            'run_time': round(end - self.started_at, 3) if self.started_at else None,
+            'stages': stages,
+            'artifacts': artifacts,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs processing jobs on a bounded thread pool.
+
+    At most ``max_workers`` jobs run concurrently and at most
+    ``max_queue_size`` jobs may wait for a worker; further submissions are
+    rejected with ``JobQueueFullError`` instead of piling up.
+    """
+
+    def __init__(self, max_workers: int = None, max_queue_size: int = None,
+                 retention_seconds: int = None):
+        self.max_workers = max_workers or Config.JOB_MAX_WORKERS
+        self.max_queue_size = max_queue_size if max_queue_size is not None else Config.JOB_MAX_QUEUE_SIZE
+        self.retention_seconds = retention_seconds or Config.JOB_RETENTION_SECONDS
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='conversync-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+    def submit(self, job_type: str, target: Callable[..., Dict[str, Any]],
+               cleanup: Callable[[], None] = None, **kwargs) -> Job:
+        """
+        Queue a processing function for background execution.
+
+        Args:
+            job_type (str): Label for the job (e.g. 'video')
+            target (Callable): Function returning a results dict. It is called
+                with ``stage_callback`` plus the given keyword arguments.
+            cleanup (Callable, optional): Called once the job has finished,
+                whether it succeeded or not
+            **kwargs: Keyword arguments for ``target``
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            JobQueueFullError: If the queue is at capacity.
+        """
+        job = Job(job_type)
+
+        with self._lock:
+            self._prune_finished()
+            if self._queued >= self.max_queue_size:
+                raise JobQueueFullError(
+                    f"Job queue is full ({self._queued} waiting). Please retry later."
+                )
+            self._jobs[job.job_id] = job
+            self._queued += 1
+
+        self._executor.submit(self._run, job, target, cleanup, kwargs)
+        print(f"📥 Queued {job_type} job {job.job_id} (queue depth: {self.queue_depth})")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Get a job by id, or None if unknown or expired."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a free worker."""
+        with self._lock:
+            return self._queued
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get job pool statistics.
+
+        Returns:
+            Dict[str, Any]: Worker capacity, queue depth and job counts
+        """
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                'max_workers': self.max_workers,
+                'max_queue_size': self.max_queue_size,
+                'running': self._running,
+                'queue_depth': self._queued,
+                'completed': statuses.count(Job.COMPLETED),
+                'failed': statuses.count(Job.FAILED),
+                'tracked_jobs': len(statuses),
+            }
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Get a summary of every tracked job, newest first."""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+        return [
+            {'job_id': job.job_id, 'job_type': job.job_type, 'status': job.status,
+             'current_stage': job.current_stage, 'created_at': _isoformat(job.created_at)}
+            for job in jobs
+        ]
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running ones."""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: Job, target: Callable[..., Dict[str, Any]],
+             cleanup: Optional[Callable[[], None]], kwargs: Dict[str, Any]):
+        """Execute a job on a worker thread."""
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        job.started_at = time.time()
+        job.status = Job.RUNNING
+
+        try:
+            result = target(stage_callback=job.record_stage, **kwargs)
+            job.result = result
+            if result.get('success', True):
+                job.status = Job.COMPLETED
+            else:
+                job.status = Job.FAILED
+                job.error = result.get('error')
+        except Exception as e:
+            job.status = Job.FAILED
+            job.error = str(e)
+            print(f"❌ Job {job.job_id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._running -= 1
+            if cleanup:
+                try:
+                    cleanup()
+                except Exception as e:
+                    print(f"⚠️  Cleanup for job {job.job_id} failed: {e}")
+
+        print(f"🏁 Job {job.job_id} {job.status} in {job.finished_at - job.started_at:.2f} seconds")
+
+    def _prune_finished(self):
+        """Forget finished jobs older than the retention period. Caller holds the lock."""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    """Format a UNIX timestamp as ISO-8601, passing None through."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp).isoformat()
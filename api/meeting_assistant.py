@@ -1,10 +1,18 @@
+import math
+import os
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from datetime import datetime
 
+from api.pipeline import Pipeline, Stage
+from api.run_store import RunStore
 from config import Config
+from utils.media_probe import probe_media
 from services import (
     MediaConverter,
+    NoAudioStreamError,
+    SilenceStripper,
+    TimeMap,
     TranscriptionService,
     SummarizationService,
     PDFService,
@@ -20,111 +28,88 @@ class MeetingAssistant:
     def __init__(self):
         """Initialize all services."""
         self.media_converter = MediaConverter()
+        self.silence_stripper = SilenceStripper()
         self.transcription_service = TranscriptionService()
         self.summarization_service = SummarizationService()
         self.pdf_service = PDFService()
         self.email_service = EmailService()
+        self.pipeline = self.build_pipeline()
+        self.run_store = RunStore()
         
         # Ensure all required directories exist
         Config.ensure_directories()
     
+    def build_pipeline(self) -> Pipeline:
+        """
+        Declare the processing stages and the artifacts they exchange.
+        
+        probe and vad only need the uploaded media, so they run concurrently;
+        summarize produces the summary sections and the participant list from
+        concurrent prompts of its own.
+        
+        Returns:
+            Pipeline: The meeting processing pipeline
+        """
+        return Pipeline([
+            Stage('probe', self.inspect_media, ['media_file'], ['media_info']),
+            Stage('vad', self.strip_silence, ['media_file'], ['voiced']),
+            Stage('convert', self._convert_stage,
+                  ['media_file', 'is_video', 'media_info', 'voiced'], ['audio_file']),
+            Stage('transcribe', self._transcribe_stage,
+                  ['audio_file', 'media_info', 'voiced'],
+                  ['transcript', 'segments', 'transcript_file']),
+            Stage('summarize', self._summarize, ['transcript', 'segments'],
+                  ['sections', 'participants']),
+            Stage('pdf', self._pdf_stage,
+                  ['sections', 'participants', 'company_name', 'meeting_title', 'meeting_date'],
+                  ['pdf_file']),
+            Stage('email', self._email_stage,
+                  ['pdf_file', 'recipients', 'meeting_title', 'meeting_date', 'custom_email_message'],
+                  ['email_sent']),
+        ])
+    
     def process_meeting_recording(self, 
                                 video_file_path: str,
                                 recipients: List[str],
                                 meeting_title: str = None,
                                 meeting_date: str = None,
                                 company_name: str = None,
-                                custom_email_message: str = None) -> Dict[str, Any]:
+                                custom_email_message: str = None,
+                                stage_callback: Callable[[str, str], None] = None,
+                                extracted_audio_path: str = None,
+                                run_id: str = None) -> Dict[str, Any]:
         """
         Complete end-to-end processing of a meeting recording.
         
         Args:
-            video_file_path (str): Path to the video file
+            video_file_path (str): Path to the video file (None if only its audio was kept)
             recipients (List[str]): Email addresses to send the summary to
             meeting_title (str, optional): Title of the meeting
             meeting_date (str, optional): Date of the meeting
             company_name (str, optional): Company name for PDF header
             custom_email_message (str, optional): Custom message for email
+            stage_callback (Callable, optional): Called with (stage, event) as each
+                                                 stage starts, completes or fails
+            extracted_audio_path (str, optional): Audio already extracted while the
+                                                  video was uploading; used instead of the video
+            run_id (str, optional): Run to checkpoint into (see RunStore); created if omitted
             
         Returns:
             Dict[str, Any]: Processing results including file paths and status
         """
-        results = {
-            'success': False,
-            'video_file': video_file_path,
-            'audio_file': None,
-            'transcript_file': None,
-            'pdf_file': None,
-            'email_sent': False,
-            'error': None,
-            'processing_time': None
-        }
-        
-        start_time = datetime.now()
-        
-        try:
-            print("🎬 Starting meeting recording processing...")
-            
-            # Step 1: Convert video to audio
-            print("🔄 Converting video to audio...")
-            audio_file = self.media_converter.convert_mp4_to_mp3(video_file_path)
-            results['audio_file'] = audio_file
-            print(f"✅ Audio conversion complete: {audio_file}")
-            
-            # Step 2: Transcribe audio
-            print("🎤 Transcribing audio...")
-            transcription_result = self.transcription_service.transcribe_audio(audio_file)
-            transcript_text = transcription_result['text']
-            results['transcript_file'] = transcription_result['output_file']
-            print(f"✅ Transcription complete: {results['transcript_file']}")
-            
-            # Step 3: Generate summary
-            print("📝 Generating meeting summary...")
-            summary_sections = self.summarization_service.generate_meeting_summary(transcript_text)
-            
-            # Add participants section if we can extract them
-            participants = self.summarization_service.extract_participants(transcript_text)
-            print("✅ Summary generation complete")
-            
-            # Step 4: Create PDF
-            print("📄 Creating PDF...")
-            pdf_file = self.pdf_service.create_minutes_pdf(
-                sections=summary_sections,
-                company=company_name,
-                meeting_title=meeting_title,
-                meeting_date=meeting_date,
-                participants=participants
-            )
-            results['pdf_file'] = pdf_file
-            print(f"✅ PDF creation complete: {pdf_file}")
-            
-            # Step 5: Send email
-            print("📧 Sending email...")
-            email_success = self.email_service.send_meeting_summary(
-                pdf_path=pdf_file,
-                recipients=recipients,
-                meeting_title=meeting_title,
-                meeting_date=meeting_date,
-                custom_message=custom_email_message
-            )
-            results['email_sent'] = email_success
-            
-            if email_success:
-                print("✅ Email sent successfully")
-            else:
-                print("❌ Email sending failed")
-            
-            results['success'] = True
-            results['processing_time'] = (datetime.now() - start_time).total_seconds()
-            
-            print(f"🎉 Processing complete! Total time: {results['processing_time']:.2f} seconds")
-            
-        except Exception as e:
-            results['error'] = str(e)
-            results['processing_time'] = (datetime.now() - start_time).total_seconds()
-            print(f"❌ Processing failed: {e}")
-        
-        return results
+        print("🎬 Starting meeting recording processing...")
+        return self.process_from_stage(
+            'probe',
+            {
+                # Audio extracted during the upload replaces the video from here on
+                'media_file': extracted_audio_path or video_file_path,
+                'is_video': extracted_audio_path is None,
+            },
+            recipients, meeting_title, meeting_date, company_name, custom_email_message,
+            stage_callback,
+            results={'video_file': video_file_path, 'audio_file': None, 'transcript_file': None},
+            run_id=run_id
+        )
     
     def process_audio_file(self,
                           audio_file_path: str,
@@ -132,7 +117,9 @@ class MeetingAssistant:
                           meeting_title: str = None,
                           meeting_date: str = None,
                           company_name: str = None,
-                          custom_email_message: str = None) -> Dict[str, Any]:
+                          custom_email_message: str = None,
+                          stage_callback: Callable[[str, str], None] = None,
+                          run_id: str = None) -> Dict[str, Any]:
         """
         Process an audio file directly (skip video conversion).
         
@@ -143,72 +130,21 @@ class MeetingAssistant:
             meeting_date (str, optional): Date of the meeting
             company_name (str, optional): Company name for PDF header
             custom_email_message (str, optional): Custom message for email
+            stage_callback (Callable, optional): Called with (stage, event) as each
+                                                 stage starts, completes or fails
+            run_id (str, optional): Run to checkpoint into (see RunStore); created if omitted
             
         Returns:
             Dict[str, Any]: Processing results
         """
-        results = {
-            'success': False,
-            'audio_file': audio_file_path,
-            'transcript_file': None,
-            'pdf_file': None,
-            'email_sent': False,
-            'error': None,
-            'processing_time': None
-        }
-        
-        start_time = datetime.now()
-        
-        try:
-            print("🎤 Starting audio processing...")
-            
-            # Step 1: Transcribe audio
-            print("🔄 Transcribing audio...")
-            transcription_result = self.transcription_service.transcribe_audio(audio_file_path)
-            transcript_text = transcription_result['text']
-            results['transcript_file'] = transcription_result['output_file']
-            print(f"✅ Transcription complete: {results['transcript_file']}")
-            
-            # Step 2: Generate summary
-            print("📝 Generating meeting summary...")
-            summary_sections = self.summarization_service.generate_meeting_summary(transcript_text)
-            participants = self.summarization_service.extract_participants(transcript_text)
-            print("✅ Summary generation complete")
-            
-            # Step 3: Create PDF
-            print("📄 Creating PDF...")
-            pdf_file = self.pdf_service.create_minutes_pdf(
-                sections=summary_sections,
-                company=company_name,
-                meeting_title=meeting_title,
-                meeting_date=meeting_date,
-                participants=participants
-            )
-            results['pdf_file'] = pdf_file
-            print(f"✅ PDF creation complete: {pdf_file}")
-            
-            # Step 4: Send email
-            print("📧 Sending email...")
-            email_success = self.email_service.send_meeting_summary(
-                pdf_path=pdf_file,
-                recipients=recipients,
-                meeting_title=meeting_title,
-                meeting_date=meeting_date,
-                custom_message=custom_email_message
-            )
-            results['email_sent'] = email_success
-            
-            results['success'] = True
-            results['processing_time'] = (datetime.now() - start_time).total_seconds()
-            
-            print(f"🎉 Processing complete! Total time: {results['processing_time']:.2f} seconds")
-            
-        except Exception as e:
-            results['error'] = str(e)
-            results['processing_time'] = (datetime.now() - start_time).total_seconds()
-            print(f"❌ Processing failed: {e}")
-        
-        return results
+        print("🎤 Starting audio processing...")
+        return self.process_from_stage(
+            'probe',
+            {'media_file': audio_file_path, 'is_video': False},
+            recipients, meeting_title, meeting_date, company_name, custom_email_message,
+            stage_callback, results={'audio_file': audio_file_path, 'transcript_file': None},
+            run_id=run_id
+        )
     
     def process_transcript_text(self,
                                transcript: str,
@@ -216,7 +152,9 @@ class MeetingAssistant:
                                meeting_title: str = None,
                                meeting_date: str = None,
                                company_name: str = None,
-                               custom_email_message: str = None) -> Dict[str, Any]:
+                               custom_email_message: str = None,
+                               stage_callback: Callable[[str, str], None] = None,
+                               run_id: str = None) -> Dict[str, Any]:
         """
         Process raw transcript text (skip conversion and transcription).
         
@@ -227,53 +165,139 @@ class MeetingAssistant:
             meeting_date (str, optional): Date of the meeting
             company_name (str, optional): Company name for PDF header
             custom_email_message (str, optional): Custom message for email
+            stage_callback (Callable, optional): Called with (stage, event) as each
+                                                 stage starts, completes or fails
+            run_id (str, optional): Run to checkpoint into (see RunStore); created if omitted
             
         Returns:
             Dict[str, Any]: Processing results
         """
+        print("📝 Starting transcript processing...")
+        return self.process_from_stage(
+            'summarize',
+            {'transcript': transcript, 'segments': None},
+            recipients, meeting_title, meeting_date, company_name, custom_email_message,
+            stage_callback, results={'transcript_text': transcript}, run_id=run_id
+        )
+    
+    def process_from_stage(self,
+                           start_stage: str,
+                           artifacts: Dict[str, Any],
+                           recipients: List[str],
+                           meeting_title: str = None,
+                           meeting_date: str = None,
+                           company_name: str = None,
+                           custom_email_message: str = None,
+                           stage_callback: Callable[[str, str], None] = None,
+                           results: Dict[str, Any] = None,
+                           run_id: str = None) -> Dict[str, Any]:
+        """
+        Run the pipeline from any stage, given the artifacts earlier stages would produce.
+        
+        For example, start at 'pdf' with 'sections' and 'participants', or at
+        'summarize' with 'transcript' and 'segments'.
+        
+        Args:
+            start_stage (str): First stage to run (see build_pipeline)
+            artifacts (Dict[str, Any]): Artifacts already held by the caller
+            recipients (List[str]): Email addresses to send the summary to
+            meeting_title (str, optional): Title of the meeting
+            meeting_date (str, optional): Date of the meeting
+            company_name (str, optional): Company name for PDF header
+            custom_email_message (str, optional): Custom message for email
+            stage_callback (Callable, optional): Called with (stage, event) as each
+                                                 stage starts, completes or fails
+            results (Dict[str, Any], optional): Extra keys for the results dict
+            run_id (str, optional): Run to checkpoint into (see RunStore); created if omitted
+            
+        Returns:
+            Dict[str, Any]: Processing results including artifact paths, per-stage
+                            wall time in 'stage_timings', the failed stage, if any,
+                            and the 'run_id' to resume from
+        """
+        initial = {
+            'recipients': recipients,
+            'meeting_title': meeting_title,
+            'meeting_date': meeting_date,
+            'company_name': company_name,
+            'custom_email_message': custom_email_message,
+            **artifacts
+        }
+        if run_id is None:
+            run_id = self.run_store.create('pipeline')
+        return self._execute(start_stage, initial, results or {}, stage_callback, run_id)
+    
+    def resume_run(self, run_id: str,
+                   stage_callback: Callable[[str, str], None] = None) -> Dict[str, Any]:
+        """
+        Resume a checkpointed run at its first incomplete stage.
+        
+        Completed stages are not repeated, so e.g. retrying a failed email only
+        re-sends the already rendered PDF. Stages whose output files have since
+        been deleted are run again.
+        
+        Args:
+            run_id (str): Run id from a previous results dict
+            stage_callback (Callable, optional): Called with (stage, event) as each
+                                                 stage starts, completes or fails
+            
+        Returns:
+            Dict[str, Any]: Processing results; 'resumed_from' names the first
+                            stage that ran (None if the run had already completed)
+            
+        Raises:
+            KeyError: If the run is unknown or has expired
+            Exception: If the stage to resume needs an upload that no longer exists
+        """
+        run = self.run_store.get(run_id)
+        if run is None:
+            raise KeyError(f"Run '{run_id}' not found")
+        if run['status'] == RunStore.COMPLETED:
+            return {**run['results'], 'resumed_from': None}
+        
+        artifacts = self._decode_artifacts(run['artifacts'])
+        start_stage = self._first_incomplete_stage(run, artifacts)
+        if start_stage is None:
+            return {**(run['results'] or {}), 'success': True, 'resumed_from': None}
+        media_file = artifacts.get('media_file')
+        if start_stage in ('probe', 'vad', 'convert') and not (media_file and os.path.exists(media_file)):
+            raise Exception("The original upload is no longer available; please submit it again")
+        
+        print(f"🔁 Resuming run {run_id} at '{start_stage}'...")
+        base = {key: value for key, value in (run['results'] or {}).items()
+                if key in ('video_file', 'audio_file', 'transcript_file', 'transcript_text')}
+        results = self._execute(start_stage, artifacts, base, stage_callback, run_id)
+        results['resumed_from'] = start_stage
+        return results
+    
+    def _execute(self, start_stage: str, initial: Dict[str, Any], base_results: Dict[str, Any],
+                 stage_callback: Optional[Callable[[str, str], None]], run_id: str) -> Dict[str, Any]:
+        """Run the pipeline with checkpointing and build the results dict."""
         results = {
             'success': False,
-            'transcript_text': transcript,
+            **base_results,
             'pdf_file': None,
             'email_sent': False,
             'error': None,
-            'processing_time': None
+            'failed_stage': None,
+            'processing_time': None,
+            'stage_timings': {},
+            'run_id': run_id
         }
         
         start_time = datetime.now()
         
         try:
-            print("📝 Starting transcript processing...")
-            
-            # Step 1: Generate summary
-            print("🔄 Generating meeting summary...")
-            summary_sections = self.summarization_service.generate_meeting_summary(transcript)
-            participants = self.summarization_service.extract_participants(transcript)
-            print("✅ Summary generation complete")
-            
-            # Step 2: Create PDF
-            print("📄 Creating PDF...")
-            pdf_file = self.pdf_service.create_minutes_pdf(
-                sections=summary_sections,
-                company=company_name,
-                meeting_title=meeting_title,
-                meeting_date=meeting_date,
-                participants=participants
+            self.run_store.start(run_id, start_stage, self._encode_artifacts(initial))
+            outputs = self.pipeline.run(
+                initial, start_at=start_stage,
+                stage_callback=stage_callback,
+                timings=results['stage_timings'],
+                checkpoint=lambda stage, produced: self.run_store.save_stage(
+                    run_id, stage, self._encode_artifacts(produced))
             )
-            results['pdf_file'] = pdf_file
-            print(f"✅ PDF creation complete: {pdf_file}")
-            
-            # Step 3: Send email
-            print("📧 Sending email...")
-            email_success = self.email_service.send_meeting_summary(
-                pdf_path=pdf_file,
-                recipients=recipients,
-                meeting_title=meeting_title,
-                meeting_date=meeting_date,
-                custom_message=custom_email_message
-            )
-            results['email_sent'] = email_success
-            
+            self._collect_results(outputs, results)
+            self._discard_voiced_audio(outputs)
             results['success'] = True
             results['processing_time'] = (datetime.now() - start_time).total_seconds()
             
@@ -281,11 +305,267 @@ class MeetingAssistant:
             
         except Exception as e:
             results['error'] = str(e)
+            results['failed_stage'] = getattr(e, 'stage', None)
             results['processing_time'] = (datetime.now() - start_time).total_seconds()
             print(f"❌ Processing failed: {e}")
         
+        try:
+            self.run_store.finish(run_id, results)
+        except Exception as e:
+            print(f"⚠️  Could not record the outcome of run {run_id}: {e}")
         return results
     
+    def _first_incomplete_stage(self, run: Dict[str, Any], artifacts: Dict[str, Any]) -> Optional[str]:
+        """Find the stage to resume at: not yet completed, or its output files are gone."""
+        names = self.pipeline.stage_names
+        start = run['start_stage'] if run['start_stage'] in names else names[0]
+        for stage in self.pipeline.stages[names.index(start):]:
+            if stage.name not in run['completed_stages']:
+                return stage.name
+            for output in stage.outputs:
+                value = artifacts.get(output)
+                if output == 'voiced' and value:
+                    value = value['audio_file']
+                elif output not in ('audio_file', 'pdf_file'):
+                    continue
+                if value and not os.path.exists(value):
+                    return stage.name
+        return None
+    
+    @staticmethod
+    def _encode_artifacts(artifacts: Dict[str, Any]) -> Dict[str, Any]:
+        """Make artifacts JSON-serializable for the run store."""
+        encoded = dict(artifacts)
+        voiced = encoded.get('voiced')
+        if voiced and isinstance(voiced.get('time_map'), TimeMap):
+            encoded['voiced'] = {**voiced, 'time_map': voiced['time_map'].to_dict()}
+        return encoded
+    
+    @staticmethod
+    def _decode_artifacts(artifacts: Dict[str, Any]) -> Dict[str, Any]:
+        """Inverse of _encode_artifacts."""
+        decoded = dict(artifacts)
+        voiced = decoded.get('voiced')
+        if voiced:
+            decoded['voiced'] = {**voiced, 'time_map': TimeMap.from_dict(voiced['time_map'])}
+        return decoded
+    
+    def _collect_results(self, outputs: Dict[str, Any], results: Dict[str, Any]):
+        """Copy the artifacts callers care about into the results dict."""
+        if 'media_info' in outputs:
+            results['media_info'] = outputs['media_info']
+        if outputs.get('voiced'):
+            results['silence_removed_seconds'] = outputs['voiced']['seconds_removed']
+        if 'audio_file' in outputs and not results.get('audio_file'):
+            results['audio_file'] = outputs['audio_file']
+        if 'transcript_file' in outputs:
+            results['transcript_file'] = outputs['transcript_file']
+        results['pdf_file'] = outputs.get('pdf_file')
+        results['email_sent'] = outputs.get('email_sent', False)
+    
+    def _discard_voiced_audio(self, outputs: Dict[str, Any]):
+        """
+        Delete the silence-stripped intermediate once a run has completed.
+        
+        Failed runs keep it so they can resume without repeating vad. It is
+        kept when it is also the run's reported audio_file (speech profile off).
+        """
+        voiced = outputs.get('voiced')
+        if not voiced or voiced['audio_file'] == outputs.get('audio_file'):
+            return
+        try:
+            os.remove(voiced['audio_file'])
+        except OSError:
+            pass
+    
+    def _convert_stage(self, media_file: str, is_video: bool,
+                       media_info: Optional[Dict[str, Any]],
+                       voiced: Optional[Dict[str, Any]]) -> str:
+        """Produce the audio to transcribe, from the silence-stripped audio if there is one."""
+        if voiced:
+            return self.prepare_audio(voiced['audio_file'], voiced['processed_duration'], False)
+        return self.prepare_audio(media_file, media_info['duration'] if media_info else None, is_video)
+    
+    def _transcribe_stage(self, audio_file: str, media_info: Optional[Dict[str, Any]],
+                          voiced: Optional[Dict[str, Any]]):
+        """Transcribe the prepared audio, mapping timestamps back to the original recording."""
+        if voiced:
+            duration = voiced['processed_duration']
+        else:
+            duration = media_info['duration'] if media_info else None
+        result = self.transcription_service.transcribe_audio(
+            audio_file, duration=duration,
+            time_map=voiced['time_map'] if voiced else None
+        )
+        return result['text'], result.get('segments'), result['output_file']
+    
+    def _pdf_stage(self, sections: dict, participants: str, company_name: str,
+                   meeting_title: str, meeting_date: str) -> str:
+        """Render the minutes PDF."""
+        return self.pdf_service.create_minutes_pdf(
+            sections=sections,
+            company=company_name,
+            meeting_title=meeting_title,
+            meeting_date=meeting_date,
+            participants=participants
+        )
+    
+    def _email_stage(self, pdf_file: str, recipients: List[str], meeting_title: str,
+                     meeting_date: str, custom_email_message: str) -> bool:
+        """Email the minutes PDF to the recipients."""
+        email_success = self.email_service.send_meeting_summary(
+            pdf_path=pdf_file,
+            recipients=recipients,
+            meeting_title=meeting_title,
+            meeting_date=meeting_date,
+            custom_message=custom_email_message
+        )
+        if not email_success:
+            # Fail the stage so the run can be resumed from here
+            raise Exception("Failed to send the meeting summary email")
+        print("✅ Email sent successfully")
+        return email_success
+    
+    def _summarize(self, transcript: str, segments: list = None):
+        """Generate the summary sections and participant list for a transcript."""
+        return self.summarization_service.summarize_meeting(transcript, segments=segments)
+    
+    def strip_silence(self, media_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Remove long silences from a recording before transcription.
+        
+        Args:
+            media_path (str): Path to the audio or video file
+            
+        Returns:
+            Dict[str, Any] or None: SilenceStripper.strip() output, or None when
+                                    silence removal is disabled, unavailable,
+                                    fails or would remove less than a second
+        """
+        if not Config.VAD_ENABLED or not self.silence_stripper.is_available():
+            return None
+        
+        try:
+            voiced = self.silence_stripper.strip(media_path)
+        except Exception as e:
+            print(f"⚠️  Silence removal failed, transcribing the full recording: {e}")
+            return None
+        
+        if voiced['seconds_removed'] < 1.0:
+            os.remove(voiced['audio_file'])
+            return None
+        return voiced
+    
+    def prepare_for_transcription(self, media_path: str, is_video: bool = True,
+                                  media_info: Optional[Dict[str, Any]] = None
+                                  ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Run the pipeline's vad and convert steps on a recording outside the pipeline.
+        
+        Callers that transcribe directly get byte-identical audio to the
+        pipeline, so they share its transcription cache entries and transcripts.
+        
+        Args:
+            media_path (str): Path to the audio or video file
+            is_video (bool): Whether the input is a video file
+            media_info (Dict[str, Any], optional): inspect_media() output, if probed
+            
+        Returns:
+            Tuple[str, Optional[Dict[str, Any]]]: The audio file to transcribe and the
+                                                  strip_silence() output (pass its
+                                                  'time_map' to transcribe_audio)
+        """
+        voiced = self.strip_silence(media_path)
+        return self._convert_stage(media_path, is_video, media_info, voiced), voiced
+    
+    def prepare_audio(self, media_path: str, duration: float = None, is_video: bool = True) -> str:
+        """
+        Produce the audio file that is sent for transcription.
+        
+        Uses the mono 16 kHz speech profile when enabled, otherwise extracts
+        the audio track from videos and passes audio files through unchanged.
+        
+        Args:
+            media_path (str): Path to the audio or video file
+            duration (float, optional): Duration in seconds if already probed
+            is_video (bool): Whether the input is a video file
+            
+        Returns:
+            str: Path to the audio file to transcribe
+        """
+        if Config.SPEECH_PROFILE_ENABLED:
+            try:
+                return self.media_converter.encode_for_transcription(media_path, duration=duration)
+            except NoAudioStreamError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Speech encoding failed, using the original audio: {e}")
+        
+        if is_video:
+            return self.media_converter.extract_audio(media_path)
+        return media_path
+    
+    def inspect_media(self, media_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Probe an uploaded recording, validate it and estimate the processing time.
+        
+        Args:
+            media_path (str): Path to the audio or video file
+            
+        Returns:
+            Dict[str, Any] or None: Duration, codecs, audio format, whether the audio
+                                    will be transcribed in chunks and the estimated
+                                    processing time in seconds; None if the file
+                                    cannot be probed (validation is then skipped)
+            
+        Raises:
+            NoAudioStreamError: If the recording has no audio track
+            Exception: If the recording is longer than MAX_MEDIA_DURATION_SECONDS
+        """
+        try:
+            info = probe_media(media_path)
+        except Exception as e:
+            print(f"⚠️  Could not probe '{media_path}': {e}")
+            return None
+        
+        if info['streams'] and not info['audio']:
+            raise NoAudioStreamError(f"No audio stream found in '{info['filename']}'")
+        
+        duration = info['duration']
+        if duration and duration > Config.MAX_MEDIA_DURATION_SECONDS:
+            raise Exception(
+                f"Recording is {duration / 60:.0f} minutes long; the limit is "
+                f"{Config.MAX_MEDIA_DURATION_SECONDS / 60:.0f} minutes"
+            )
+        
+        chunked = bool(
+            Config.TRANSCRIPTION_CHUNKING_ENABLED and duration
+            and duration > Config.TRANSCRIPTION_CHUNK_SECONDS + Config.TRANSCRIPTION_CHUNK_SEARCH_SECONDS
+        )
+        estimate = None
+        if duration:
+            media_seconds = duration / 60 * Config.PROCESSING_SECONDS_PER_MEDIA_MINUTE
+            if chunked:
+                # Chunks are transcribed in parallel
+                chunks = math.ceil(duration / Config.TRANSCRIPTION_CHUNK_SECONDS)
+                media_seconds /= max(min(Config.TRANSCRIPTION_MAX_WORKERS, chunks), 1)
+            estimate = Config.PROCESSING_BASE_SECONDS + media_seconds
+        
+        audio = info['audio'] or {}
+        video = info['video'] or {}
+        return {
+            'duration': duration,
+            'filesize': info['filesize'],
+            'format': info['format_name'],
+            'video_codec': video.get('codec_name'),
+            'audio_codec': audio.get('codec_name'),
+            'sample_rate': audio.get('sample_rate'),
+            'channels': audio.get('channels'),
+            'bit_rate': info['bit_rate'],
+            'chunked_transcription': chunked,
+            'estimated_processing_time': round(estimate, 1) if estimate else None,
+        }
+    
     def test_services(self) -> Dict[str, bool]:
         """
         Test all services to ensure they're working properly.
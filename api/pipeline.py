@@ -0,0 +1,191 @@
+"""
+Declarative stage pipeline for meeting processing.
+Stages name the artifacts they consume and produce; the engine derives the
+dependency graph from those names, runs independent stages concurrently and
+records each stage's wall time.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config import Config
+
+
+class StageFailedError(Exception):
+    """Raised when a pipeline stage fails; the original error is the __cause__."""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(str(error))
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    """
+    One step of a pipeline.
+
+    The stage function is called with its inputs as positional arguments, in
+    the order they are declared. It returns the value of its single output, or a tuple with one value per
+    output when it declares several.
+    """
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str] = (),
+                 outputs: Sequence[str] = ()):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+    def run(self, artifacts: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the stage against the available artifacts.
+
+        Returns:
+            Dict[str, Any]: The stage's outputs by name
+        """
+        value = self.func(*[artifacts[name] for name in self.inputs])
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: value}
+        if len(self.outputs) != len(value or ()):
+            raise ValueError(f"Stage '{self.name}' returned {len(value or ())} values "
+                             f"for outputs {', '.join(self.outputs)}")
+        return dict(zip(self.outputs, value))
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order on a small thread pool.
+
+    A stage depends on the stages that produce its inputs. Stages whose
+    dependencies are met run concurrently; others wait. Runs can start at any
+    stage, in which case the artifacts produced by earlier stages must be
+    supplied by the caller.
+    """
+
+    def __init__(self, stages: List[Stage], max_workers: int = None):
+        self.stages = list(stages)
+        self.max_workers = max_workers or Config.PIPELINE_MAX_WORKERS
+        self._producers: Dict[str, str] = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in self._producers:
+                    raise ValueError(f"Artifact '{output}' is produced by both "
+                                     f"'{self._producers[output]}' and '{stage.name}'")
+                self._producers[output] = stage.name
+
+    @property
+    def stage_names(self) -> List[str]:
+        """Names of the stages in declaration order."""
+        return [stage.name for stage in self.stages]
+
+    def run(self, artifacts: Dict[str, Any], start_at: str = None,
+            stage_callback: Optional[Callable[[str, str], None]] = None,
+            timings: Dict[str, float] = None,
+            checkpoint: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Run the pipeline.
+
+        Args:
+            artifacts (Dict[str, Any]): Initial artifacts (inputs and any
+                                        outputs of skipped stages)
+            start_at (str, optional): First stage to run; earlier stages are skipped
+            stage_callback (Callable, optional): Called with (stage, event) as each
+                                                 stage starts, completes or fails
+            timings (Dict[str, float], optional): Receives per-stage wall time in seconds
+            checkpoint (Callable, optional): Called with (stage, outputs) after each
+                                             stage completes, before dependents start
+
+        Returns:
+            Dict[str, Any]: All artifacts, including every stage's outputs
+
+        Raises:
+            ValueError: If a stage to run needs an artifact nobody provides
+            StageFailedError: If a stage fails; stages already running are
+                              allowed to finish first
+        """
+        artifacts = dict(artifacts)
+        timings = timings if timings is not None else {}
+        pending = self._stages_from(start_at)
+        self._check_inputs(pending, artifacts)
+
+        pending_names = {stage.name for stage in pending}
+        running = {}
+        failure = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='pipeline') as executor:
+            while pending or running:
+                if failure is None:
+                    for stage in list(pending):
+                        if self._ready(stage, pending_names, artifacts):
+                            pending.remove(stage)
+                            if stage_callback:
+                                stage_callback(stage.name, 'started')
+                            future = executor.submit(self._timed, stage, dict(artifacts))
+                            running[future] = stage
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    pending_names.discard(stage.name)
+                    elapsed, outputs, error = future.result()
+                    timings[stage.name] = round(elapsed, 3)
+                    if error is not None:
+                        if stage_callback:
+                            stage_callback(stage.name, 'failed')
+                        if failure is None:
+                            failure = StageFailedError(stage.name, error)
+                            failure.__cause__ = error
+                        continue
+                    artifacts.update(outputs)
+                    if checkpoint:
+                        try:
+                            checkpoint(stage.name, outputs)
+                        except Exception as e:
+                            print(f"⚠️  Could not checkpoint stage '{stage.name}': {e}")
+                    if stage_callback:
+                        stage_callback(stage.name, 'completed')
+
+        if failure is not None:
+            raise failure
+        if pending:
+            raise ValueError(f"Stages could not run: {', '.join(stage.name for stage in pending)}")
+        return artifacts
+
+    def _stages_from(self, start_at: Optional[str]) -> List[Stage]:
+        if start_at is None:
+            return list(self.stages)
+        names = self.stage_names
+        if start_at not in names:
+            raise ValueError(f"Unknown stage '{start_at}'. Stages: {', '.join(names)}")
+        return self.stages[names.index(start_at):]
+
+    def _check_inputs(self, stages: List[Stage], artifacts: Dict[str, Any]):
+        available = set(artifacts)
+        for stage in stages:
+            missing = [name for name in stage.inputs if name not in available]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' needs {', '.join(missing)}, "
+                                 f"which no earlier stage or caller provides")
+            available.update(stage.outputs)
+
+    def _ready(self, stage: Stage, pending_names: set, artifacts: Dict[str, Any]) -> bool:
+        for name in stage.inputs:
+            producer = self._producers.get(name)
+            if producer in pending_names and producer != stage.name:
+                return False
+            if name not in artifacts:
+                return False
+        return True
+
+    @staticmethod
+    def _timed(stage: Stage, artifacts: Dict[str, Any]):
+        start = time.perf_counter()
+        try:
+            outputs = stage.run(artifacts)
+        except Exception as e:
+            return time.perf_counter() - start, None, e
+        return time.perf_counter() - start, outputs, None
@@ -0,0 +1,315 @@
+"""
+Resumable chunked uploads for large recordings.
+A client creates an upload, PUTs byte ranges in any order (each verified by
+checksum), asks for the received offset after a failure, and finalizes the
+upload into a processing job.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from werkzeug.utils import secure_filename
+
+from config import Config
+from utils.hashing import file_sha256
+
+META_FILE = 'meta.json'
+DATA_FILE = 'data.part'
+# Bytes read from the request body at a time
+WRITE_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Raised for invalid resumable-upload requests; carries an HTTP status."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class ResumableUploadManager:
+    """
+    Stores in-progress uploads under UPLOAD_FOLDER/resumable/<upload_id>.
+
+    Each upload has a data file preallocated to its final size, written with
+    positional writes, and a small JSON sidecar with the received byte ranges
+    so progress survives a server restart.
+    """
+
+    def __init__(self, root: str = None, chunk_size: int = None,
+                 max_size: int = None, ttl_seconds: int = None):
+        self.root = str(root or Config.UPLOAD_FOLDER / 'resumable')
+        self.chunk_size = chunk_size or Config.RESUMABLE_CHUNK_BYTES
+        self.max_size = max_size or Config.RESUMABLE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds or Config.RESUMABLE_UPLOAD_TTL_SECONDS
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def create(self, filename: str, size: int, sha256: str = None) -> Dict[str, Any]:
+        """
+        Start a new upload and preallocate its data file.
+
+        Args:
+            filename (str): Original file name (its extension is kept)
+            size (int): Total size in bytes
+            sha256 (str, optional): Expected SHA-256 of the whole file, checked on finalize
+
+        Returns:
+            Dict[str, Any]: Upload status including 'upload_id' and 'chunk_size'
+        """
+        if not filename or not secure_filename(filename):
+            raise UploadError("A filename is required")
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError("size must be a positive integer")
+        if size > self.max_size:
+            raise UploadError(f"Upload exceeds the {self.max_size} byte limit", 413)
+
+        self.purge_expired()
+
+        upload_id = uuid.uuid4().hex
+        upload_dir = os.path.join(self.root, upload_id)
+        os.makedirs(upload_dir)
+        fd = os.open(os.path.join(upload_dir, DATA_FILE), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            _preallocate(fd, size)
+        finally:
+            os.close(fd)
+
+        meta = {
+            'upload_id': upload_id,
+            'filename': secure_filename(filename),
+            'size': size,
+            'sha256': sha256.lower() if sha256 else None,
+            'received': [],
+            'created_at': time.time(),
+            'updated_at': time.time(),
+        }
+        self._save_meta(meta)
+        return self._status(meta)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """
+        Get the progress of an upload.
+
+        Returns:
+            Dict[str, Any]: 'offset' (first missing byte), 'received_bytes',
+                            'missing' ranges and 'complete'
+        """
+        with self._lock:
+            return self._status(self._load_meta(upload_id))
+
+    def write_chunk(self, upload_id: str, start: int, end: int, total: int,
+                    stream, checksum: str = None) -> Dict[str, Any]:
+        """
+        Write one byte range of an upload from a request body stream.
+
+        Args:
+            upload_id (str): Upload identifier
+            start (int): First byte offset (inclusive)
+            end (int): Last byte offset (inclusive), as in Content-Range
+            total (int): Total size from Content-Range; must match the upload
+            stream: Readable body stream
+            checksum (str, optional): Hex SHA-256 of the chunk
+
+        Returns:
+            Dict[str, Any]: Upload status after the write
+
+        Raises:
+            UploadError: On an invalid range, short body or checksum mismatch
+        """
+        with self._lock:
+            meta = self._load_meta(upload_id)
+        if total != meta['size'] or start < 0 or end < start or end >= meta['size']:
+            raise UploadError(f"Invalid range {start}-{end}/{total} for a {meta['size']} byte upload", 416)
+        length = end - start + 1
+        if length > self.chunk_size:
+            raise UploadError(f"Chunks may be at most {self.chunk_size} bytes", 413)
+
+        # Buffer and verify the chunk (at most chunk_size bytes) before touching
+        # the data file, so a rejected resend can't overwrite good bytes
+        chunk = bytearray()
+        while len(chunk) < length:
+            block = stream.read(min(WRITE_BLOCK_SIZE, length - len(chunk)))
+            if not block:
+                break
+            chunk += block
+
+        if len(chunk) != length:
+            raise UploadError(f"Expected {length} bytes, received {len(chunk)}")
+        if checksum and hashlib.sha256(chunk).hexdigest() != checksum.lower():
+            raise UploadError("Chunk checksum mismatch; resend the chunk", 422)
+
+        fd = os.open(self._data_path(upload_id), os.O_WRONLY)
+        try:
+            _pwrite(fd, chunk, start)
+        finally:
+            os.close(fd)
+
+        with self._lock:
+            meta = self._load_meta(upload_id)
+            meta['received'] = _merge_ranges(meta['received'] + [[start, end + 1]])
+            meta['updated_at'] = time.time()
+            self._save_meta(meta)
+            return self._status(meta)
+
+    def finalize(self, upload_id: str) -> Tuple[str, str]:
+        """
+        Complete an upload and move it into place for processing.
+
+        Returns:
+            Tuple[str, str]: (file path, upload directory to remove when done)
+
+        Raises:
+            UploadError: If bytes are missing or the whole-file checksum differs
+        """
+        with self._lock:
+            meta = self._load_meta(upload_id)
+            status = self._status(meta)
+            if not status['complete']:
+                raise UploadError(f"Upload incomplete; next missing byte is {status['offset']}", 409)
+
+            upload_dir = os.path.join(self.root, upload_id)
+            file_path = os.path.join(upload_dir, meta['filename'])
+            os.replace(self._data_path(upload_id), file_path)
+            os.remove(os.path.join(upload_dir, META_FILE))
+
+        digest = file_sha256(file_path)
+        if meta['sha256'] and digest != meta['sha256']:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            raise UploadError("File checksum mismatch; the upload was discarded", 422)
+        return file_path, upload_dir
+
+    def cancel(self, upload_id: str):
+        """Delete an upload and everything received so far."""
+        with self._lock:
+            self._load_meta(upload_id)
+            shutil.rmtree(os.path.join(self.root, upload_id), ignore_errors=True)
+
+    def purge_expired(self) -> int:
+        """
+        Delete uploads that have not received data within the TTL.
+
+        Returns:
+            int: Number of uploads removed
+        """
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        with self._lock:
+            for upload_id in os.listdir(self.root):
+                meta_path = os.path.join(self.root, upload_id, META_FILE)
+                try:
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        updated_at = json.load(f)['updated_at']
+                except (OSError, ValueError, KeyError):
+                    continue
+                if updated_at < cutoff:
+                    shutil.rmtree(os.path.join(self.root, upload_id), ignore_errors=True)
+                    removed += 1
+        return removed
+
+    def _status(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        received = meta['received']
+        offset = received[0][1] if received and received[0][0] == 0 else 0
+        return {
+            'upload_id': meta['upload_id'],
+            'filename': meta['filename'],
+            'size': meta['size'],
+            'offset': offset,
+            'received_bytes': sum(end - start for start, end in received),
+            'missing': _missing_ranges(received, meta['size']),
+            'complete': received == [[0, meta['size']]],
+            'chunk_size': self.chunk_size,
+        }
+
+    def _data_path(self, upload_id: str) -> str:
+        return os.path.join(self.root, upload_id, DATA_FILE)
+
+    def _load_meta(self, upload_id: str) -> Dict[str, Any]:
+        if not upload_id.isalnum():
+            raise UploadError("Upload not found", 404)
+        try:
+            with open(os.path.join(self.root, upload_id, META_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise UploadError("Upload not found", 404)
+
+    def _save_meta(self, meta: Dict[str, Any]):
+        path = os.path.join(self.root, meta['upload_id'], META_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+
+def parse_content_range(header: Optional[str]) -> Tuple[int, int, int]:
+    """
+    Parse a ``Content-Range: bytes start-end/total`` header.
+
+    Returns:
+        Tuple[int, int, int]: (start, end, total), with end inclusive
+
+    Raises:
+        UploadError: If the header is missing or malformed
+    """
+    try:
+        unit, spec = header.strip().split(' ', 1)
+        byte_range, total = spec.split('/', 1)
+        start, end = byte_range.split('-', 1)
+        if unit != 'bytes':
+            raise ValueError(unit)
+        return int(start), int(end), int(total)
+    except (AttributeError, ValueError):
+        raise UploadError("Content-Range header must look like 'bytes start-end/total'")
+
+
+def _merge_ranges(ranges: List[List[int]]) -> List[List[int]]:
+    """Merge overlapping or adjacent half-open [start, end) ranges."""
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _missing_ranges(received: List[List[int]], size: int) -> List[List[int]]:
+    """Half-open ranges not yet received."""
+    missing, cursor = [], 0
+    for start, end in received:
+        if start > cursor:
+            missing.append([cursor, start])
+        cursor = max(cursor, end)
+    if cursor < size:
+        missing.append([cursor, size])
+    return missing
+
+
+def _preallocate(fd: int, size: int):
+    """Reserve disk space for the whole upload up front where supported."""
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass
+    os.ftruncate(fd, size)
+
+
+def _pwrite(fd: int, data: bytes, offset: int):
+    """Write at an absolute offset, looping over short writes."""
+    view = memoryview(data)
+    while view:
+        if hasattr(os, 'pwrite'):
+            count = os.pwrite(fd, view, offset)
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            count = os.write(fd, view)
+        view = view[count:]
+        offset += count
@@ -0,0 +1,173 @@
+"""
+Checkpoints for pipeline runs.
+Each run records its inputs and every completed stage's outputs under
+RUNS_FOLDER/<run_id>/run.json, so a failed run can resume at the first
+incomplete stage instead of starting over.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from config import Config
+
+RUN_FILE = 'run.json'
+
+
+class RunStore:
+    """
+    Persists pipeline run state as one small JSON document per run.
+
+    Artifacts must already be JSON-serializable; large outputs (audio, PDFs)
+    are stored as file paths. Runs that have not been updated within the
+    retention period are deleted, together with any upload they kept alive.
+    """
+
+    CREATED = 'created'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    def __init__(self, root: str = None, retention_seconds: int = None):
+        self.root = str(root or Config.RUNS_FOLDER)
+        self.retention_seconds = retention_seconds or Config.RUN_RETENTION_SECONDS
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def create(self, job_type: str, upload_dir: str = None) -> str:
+        """
+        Register a new run.
+
+        Args:
+            job_type (str): Label for the run (e.g. 'video')
+            upload_dir (str, optional): Upload directory the run's input lives in
+
+        Returns:
+            str: The run id
+        """
+        self.purge_expired()
+        run_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.root, run_id))
+        now = time.time()
+        self._save({
+            'run_id': run_id,
+            'job_type': job_type,
+            'status': RunStore.CREATED,
+            'upload_dir': upload_dir,
+            'start_stage': None,
+            'completed_stages': [],
+            'artifacts': {},
+            'error': None,
+            'failed_stage': None,
+            'results': None,
+            'created_at': now,
+            'updated_at': now,
+        })
+        return run_id
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Get a run's state, or None if unknown or expired."""
+        if not run_id or not run_id.isalnum():
+            return None
+        with self._lock:
+            return self._load(run_id)
+
+    def start(self, run_id: str, start_stage: str, artifacts: Dict[str, Any]):
+        """
+        Mark a run as running from a stage with the given input artifacts.
+
+        Args:
+            run_id (str): Run id
+            start_stage (str): First stage of this attempt
+            artifacts (Dict[str, Any]): Inputs, merged over stored artifacts
+        """
+        with self._lock:
+            run = self._require(run_id)
+            if run['start_stage'] is None:
+                run['start_stage'] = start_stage
+            run['status'] = RunStore.RUNNING
+            run['artifacts'].update(artifacts)
+            run['error'] = None
+            run['failed_stage'] = None
+            self._save(run)
+
+    def save_stage(self, run_id: str, stage: str, outputs: Dict[str, Any]):
+        """Checkpoint the outputs of a completed stage."""
+        with self._lock:
+            run = self._require(run_id)
+            run['artifacts'].update(outputs)
+            if stage not in run['completed_stages']:
+                run['completed_stages'].append(stage)
+            self._save(run)
+
+    def finish(self, run_id: str, results: Dict[str, Any]):
+        """
+        Record the outcome of an attempt.
+
+        Args:
+            run_id (str): Run id
+            results (Dict[str, Any]): The pipeline results dict ('success',
+                                      'error' and 'failed_stage' are used)
+        """
+        with self._lock:
+            run = self._require(run_id)
+            run['status'] = RunStore.COMPLETED if results.get('success') else RunStore.FAILED
+            run['error'] = results.get('error')
+            run['failed_stage'] = results.get('failed_stage')
+            run['results'] = results
+            self._save(run)
+
+    def keeps_upload(self, run_id: str) -> bool:
+        """
+        Whether a run still needs its upload to be able to resume.
+
+        True for failed runs that have not yet checkpointed a transcript.
+        """
+        run = self.get(run_id)
+        return bool(run and run['status'] == RunStore.FAILED
+                    and 'transcript' not in run['artifacts'])
+
+    def purge_expired(self) -> int:
+        """
+        Delete runs not updated within the retention period.
+
+        Returns:
+            int: Number of runs removed
+        """
+        cutoff = time.time() - self.retention_seconds
+        removed = 0
+        with self._lock:
+            for run_id in os.listdir(self.root):
+                run = self._load(run_id)
+                if run is None or run['updated_at'] >= cutoff:
+                    continue
+                if run.get('upload_dir'):
+                    shutil.rmtree(run['upload_dir'], ignore_errors=True)
+                shutil.rmtree(os.path.join(self.root, run_id), ignore_errors=True)
+                removed += 1
+        return removed
+
+    def _require(self, run_id: str) -> Dict[str, Any]:
+        run = self._load(run_id)
+        if run is None:
+            raise KeyError(f"Run '{run_id}' not found")
+        return run
+
+    def _load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.root, run_id, RUN_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, run: Dict[str, Any]):
+        run['updated_at'] = time.time()
+        path = os.path.join(self.root, run['run_id'], RUN_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(run, f, default=str)
+        os.replace(tmp_path, path)
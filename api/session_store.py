@@ -0,0 +1,436 @@
+"""
+Storage for chat sessions.
+Sessions live either in process memory or in a local SQLite database (WAL
+mode) that every worker process on the host shares, so a chat can be served
+by any worker. Both stores expire idle sessions after SESSION_TTL_SECONDS
+and evict the least recently used sessions once SESSION_MAX_BYTES is
+exceeded.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from api.conversation_memory import ConversationMemory
+from config import Config
+from services.transcript_index import build_index
+
+
+def _serialize(session: Dict[str, Any]) -> bytes:
+    """A session as JSON bytes, with the memory via to_dict() and without the index."""
+    data = {key: value for key, value in session.items() if key not in ('memory', 'index')}
+    data['memory'] = session['memory'].to_dict() if session.get('memory') else None
+    return json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def encode_session(session: Dict[str, Any]) -> bytes:
+    """
+    Serialize a session to compressed JSON.
+
+    The conversation memory is stored via ConversationMemory.to_dict(); the
+    retrieval index is not stored, it is rebuilt from the transcript.
+    """
+    return zlib.compress(_serialize(session))
+
+
+def session_nbytes(session: Dict[str, Any], serialized: bytes = None) -> int:
+    """
+    Approximate memory held by a loaded session.
+
+    Args:
+        session (Dict[str, Any]): The session
+        serialized (bytes, optional): The session's _serialize() output, if already computed
+
+    Returns:
+        int: Size of the session's data as JSON plus its retrieval index
+    """
+    if serialized is None:
+        serialized = _serialize(session)
+    index = session.get('index')
+    return len(serialized) + (index.nbytes if index is not None else 0)
+
+
+def decode_session(blob: bytes) -> Dict[str, Any]:
+    """Inverse of encode_session(), without the retrieval index."""
+    session = json.loads(zlib.decompress(blob).decode('utf-8'))
+    if session.get('memory') is not None:
+        session['memory'] = ConversationMemory.from_dict(session['memory'])
+    return session
+
+
+class MemorySessionStore(MutableMapping):
+    """
+    Sessions held as live objects in this process (single-worker deployments).
+
+    Sessions are kept in least recently used order; reading a session counts
+    as a use.
+    """
+
+    def __init__(self, ttl_seconds: int = None, max_bytes: int = None):
+        self.ttl_seconds = Config.SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_bytes = Config.SESSION_MAX_BYTES if max_bytes is None else max_bytes
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._last_access: Dict[str, float] = {}
+        self._evictions = 0
+        self._expirations = 0
+        self._lock = threading.Lock()
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            session = self._sessions[session_id]
+            now = time.time()
+            if self._is_expired(session_id, now):
+                self._remove(session_id)
+                self._expirations += 1
+                raise KeyError(session_id)
+            self._last_access[session_id] = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def __setitem__(self, session_id: str, session: Dict[str, Any]):
+        size = session_nbytes(session)
+        with self._lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            self._sizes[session_id] = size
+            self._last_access[session_id] = time.time()
+            self._enforce_budget(keep=session_id)
+
+    def __delitem__(self, session_id: str):
+        with self._lock:
+            if session_id not in self._sessions:
+                raise KeyError(session_id)
+            self._remove(session_id)
+
+    def __iter__(self) -> Iterator[str]:
+        now = time.time()
+        with self._lock:
+            return iter([sid for sid in self._sessions if not self._is_expired(sid, now)])
+
+    def __len__(self) -> int:
+        now = time.time()
+        with self._lock:
+            return sum(1 for sid in self._sessions if not self._is_expired(sid, now))
+
+    def peek(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session without marking it as used (None if missing)."""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def purge_expired(self) -> int:
+        """
+        Remove sessions idle for longer than the TTL.
+
+        Returns:
+            int: Number of sessions removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid in self._sessions if self._is_expired(sid, now)]
+            for session_id in expired:
+                self._remove(session_id)
+            self._expirations += len(expired)
+        return len(expired)
+
+    def get_memory_usage_stats(self) -> Dict[str, Any]:
+        """
+        Get session counts, byte totals and eviction counters.
+
+        Returns:
+            Dict[str, Any]: Totals, limits, and bytes and idle seconds per session
+        """
+        now = time.time()
+        with self._lock:
+            sessions = {
+                sid: {'bytes': self._sizes[sid], 'idle_seconds': round(now - self._last_access[sid], 1)}
+                for sid in self._sessions
+            }
+            return _usage_stats('memory', sessions, self.ttl_seconds, self.max_bytes,
+                                self._evictions, self._expirations)
+
+    def _is_expired(self, session_id: str, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - self._last_access[session_id] > self.ttl_seconds
+
+    def _remove(self, session_id: str):
+        del self._sessions[session_id]
+        del self._sizes[session_id]
+        del self._last_access[session_id]
+
+    def _enforce_budget(self, keep: str):
+        """Evict least recently used sessions until under max_bytes. Caller holds the lock."""
+        if self.max_bytes <= 0:
+            return
+        total = sum(self._sizes.values())
+        for session_id in list(self._sessions):
+            if total <= self.max_bytes:
+                break
+            if session_id == keep:
+                continue
+            total -= self._sizes[session_id]
+            self._remove(session_id)
+            self._evictions += 1
+
+
+class SQLiteSessionStore(MutableMapping):
+    """
+    Sessions serialized into a SQLite database shared by worker processes.
+
+    Reads return a fresh copy of the session, so changes must be written back
+    with ``store[session_id] = session``. Concurrent writes to the same
+    session are last-writer-wins. Retrieval indexes are rebuilt on first use
+    in each process and kept in a small LRU cache.
+
+    Each row records the session's loaded size (session_nbytes()) and when it
+    was last read or written; the TTL and byte budget apply across all
+    workers sharing the database.
+    """
+
+    def __init__(self, db_path: str = None, index_cache_size: int = None,
+                 ttl_seconds: int = None, max_bytes: int = None):
+        self.db_path = Path(db_path or Config.SESSION_STORE_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.index_cache_size = index_cache_size or Config.SESSION_INDEX_CACHE_SIZE
+        self.ttl_seconds = Config.SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_bytes = Config.SESSION_MAX_BYTES if max_bytes is None else max_bytes
+        self._indexes: "OrderedDict[str, Any]" = OrderedDict()
+        self._evictions = 0
+        self._expirations = 0
+
+        self._lock = threading.Lock()
+        # Other workers may hold the write lock briefly, wait instead of failing
+        self._conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                nbytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+        self._conn.commit()
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, last_access FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is not None and self._is_expired(row[1], now):
+                self._delete([session_id])
+                self._expirations += 1
+                row = None
+            elif row is not None:
+                self._conn.execute(
+                    "UPDATE sessions SET last_access = ? WHERE session_id = ?", (now, session_id)
+                )
+                self._conn.commit()
+        if row is None:
+            raise KeyError(session_id)
+        session = decode_session(row[0])
+        session['index'] = self._index_for(session_id, session)
+        return session
+
+    def __setitem__(self, session_id: str, session: Dict[str, Any]):
+        serialized = _serialize(session)
+        blob = zlib.compress(serialized)
+        nbytes = session_nbytes(session, serialized)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO sessions (session_id, data, nbytes, created_at, updated_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    data = excluded.data, nbytes = excluded.nbytes,
+                    updated_at = excluded.updated_at, last_access = excluded.last_access
+            """, (session_id, blob, nbytes, now, now, now))
+            self._enforce_budget(keep=session_id)
+            self._conn.commit()
+            if session.get('index') is not None:
+                self._cache_index(session_id, session['index'])
+
+    def __delitem__(self, session_id: str):
+        with self._lock:
+            removed = self._delete([session_id])
+        if removed == 0:
+            raise KeyError(session_id)
+
+    def __contains__(self, session_id: object) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_access FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row is not None and not self._is_expired(row[0], time.time())
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id FROM sessions WHERE last_access >= ? ORDER BY created_at",
+                (self._expiry_cutoff(),)
+            ).fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE last_access >= ?", (self._expiry_cutoff(),)
+            ).fetchone()[0]
+
+    def peek(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session without marking it as used or building its index (None if missing)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            index = self._indexes.get(session_id)
+        if row is None:
+            return None
+        session = decode_session(row[0])
+        session['index'] = index
+        return session
+
+    def purge_expired(self) -> int:
+        """
+        Remove sessions idle for longer than the TTL.
+
+        Returns:
+            int: Number of sessions removed
+        """
+        if self.ttl_seconds <= 0:
+            return 0
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT session_id FROM sessions WHERE last_access < ?", (self._expiry_cutoff(),)
+            )]
+            removed = self._delete(expired)
+            self._expirations += removed
+        return removed
+
+    def get_memory_usage_stats(self) -> Dict[str, Any]:
+        """
+        Get session counts, byte totals and eviction counters.
+
+        Evictions and expirations are counted by this process only.
+
+        Returns:
+            Dict[str, Any]: Totals, limits, bytes stored in the database,
+                            index cache size, and bytes and idle seconds per session
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, nbytes, LENGTH(data), last_access FROM sessions ORDER BY last_access"
+            ).fetchall()
+            index_bytes = sum(index.nbytes for index in self._indexes.values() if index is not None)
+            cached_indexes = len(self._indexes)
+            evictions, expirations = self._evictions, self._expirations
+        sessions = {
+            session_id: {'bytes': nbytes, 'stored_bytes': size, 'idle_seconds': round(now - last_access, 1)}
+            for session_id, nbytes, size, last_access in rows
+        }
+        stats = _usage_stats('sqlite', sessions, self.ttl_seconds, self.max_bytes, evictions, expirations)
+        stats.update({
+            'stored_bytes': sum(size for _, _, size, _ in rows),
+            'cached_indexes': cached_indexes,
+            'index_cache_bytes': index_bytes,
+        })
+        return stats
+
+    def _is_expired(self, last_access: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - last_access > self.ttl_seconds
+
+    def _expiry_cutoff(self) -> float:
+        """Sessions last used before this time have expired (-inf without a TTL)."""
+        return time.time() - self.ttl_seconds if self.ttl_seconds > 0 else float('-inf')
+
+    def _delete(self, session_ids: List[str]) -> int:
+        """Delete sessions and their cached indexes. Caller holds the lock."""
+        if not session_ids:
+            return 0
+        cursor = self._conn.executemany(
+            "DELETE FROM sessions WHERE session_id = ?", [(sid,) for sid in session_ids]
+        )
+        self._conn.commit()
+        for session_id in session_ids:
+            self._indexes.pop(session_id, None)
+        return cursor.rowcount
+
+    def _enforce_budget(self, keep: str):
+        """
+        Evict least recently used sessions until under max_bytes.
+
+        Runs inside the write transaction of __setitem__. Caller holds the lock.
+        """
+        if self.max_bytes <= 0:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM sessions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for session_id, nbytes in self._conn.execute(
+            "SELECT session_id, nbytes FROM sessions WHERE session_id != ? ORDER BY last_access",
+            (keep,)
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append(session_id)
+            total -= nbytes
+        self._conn.executemany("DELETE FROM sessions WHERE session_id = ?", [(sid,) for sid in evicted])
+        for session_id in evicted:
+            self._indexes.pop(session_id, None)
+        self._evictions += len(evicted)
+
+    def _index_for(self, session_id: str, session: Dict[str, Any]) -> Any:
+        """Cached retrieval index for a session, rebuilt from its transcript if needed."""
+        with self._lock:
+            if session_id in self._indexes:
+                self._indexes.move_to_end(session_id)
+                return self._indexes[session_id]
+        index = build_index(session['transcript'], session.get('segments'))
+        with self._lock:
+            self._cache_index(session_id, index)
+        return index
+
+    def _cache_index(self, session_id: str, index: Any):
+        """Remember an index, evicting the least recently used. Caller holds the lock."""
+        self._indexes[session_id] = index
+        self._indexes.move_to_end(session_id)
+        while len(self._indexes) > self.index_cache_size:
+            self._indexes.popitem(last=False)
+
+
+def _usage_stats(backend: str, sessions: Dict[str, Dict[str, Any]], ttl_seconds: int,
+                 max_bytes: int, evictions: int, expirations: int) -> Dict[str, Any]:
+    """Common shape of get_memory_usage_stats() for both stores."""
+    total_bytes = sum(detail['bytes'] for detail in sessions.values())
+    return {
+        'backend': backend,
+        'total_sessions': len(sessions),
+        'total_bytes': total_bytes,
+        'average_bytes_per_session': round(total_bytes / len(sessions)) if sessions else 0,
+        'max_bytes': max_bytes,
+        'ttl_seconds': ttl_seconds,
+        'evictions': evictions,
+        'expirations': expirations,
+        'sessions': sessions,
+    }
+
+
+def create_session_store() -> MutableMapping:
+    """Create the session store selected by SESSION_STORE_BACKEND ('sqlite' or 'memory')."""
+    backend = Config.SESSION_STORE_BACKEND.lower()
+    if backend == 'memory':
+        return MemorySessionStore()
+    if backend == 'sqlite':
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown SESSION_STORE_BACKEND '{Config.SESSION_STORE_BACKEND}'")
@@ -0,0 +1,432 @@
+"""
+Streaming ingestion of multipart uploads.
+Uploaded files are written straight into the uploads folder while the request
+body is parsed, hashed on the fly and checked against their magic bytes.
+Streamable videos are also piped into ffmpeg so audio extraction overlaps
+the network transfer.
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+from typing import Optional, Tuple
+
+from flask import Request, g, has_request_context
+from werkzeug.utils import secure_filename
+
+from config import Config
+from utils import ffmpeg
+from utils.hashing import file_sha256, remember_digest
+
+# Bytes buffered before the container signature is checked
+SNIFF_BYTES = 64
+
+# Container families each extension may contain
+EXTENSION_CONTAINERS = {
+    'mp4': {'mp4'},
+    'mov': {'mp4'},
+    'm4a': {'mp4'},
+    'avi': {'avi'},
+    'mkv': {'matroska'},
+    'webm': {'matroska'},
+    'wmv': {'asf'},
+    'mp3': {'mp3'},
+    'wav': {'wav'},
+    'flac': {'flac'},
+    'ogg': {'ogg'},
+}
+
+_MP4_BOX_TYPES = {b'ftyp', b'moov', b'mdat', b'wide', b'free', b'skip', b'pnot'}
+
+# Video extensions whose audio can be extracted while the upload arrives
+PIPELINE_EXTENSIONS = {'mp4', 'mov', 'mkv'}
+
+
+class UploadRejectedError(Exception):
+    """Raised while streaming an upload whose contents do not match its file type."""
+
+
+def sniff_container(header: bytes) -> Optional[str]:
+    """
+    Identify a media container from the first bytes of a file.
+
+    Args:
+        header (bytes): At least the first 12 bytes of the file.
+
+    Returns:
+        str or None: Container family ('mp4', 'matroska', 'avi', 'wav', 'asf',
+                     'mp3', 'flac', 'ogg'), or None if unrecognized.
+    """
+    if len(header) >= 8 and header[4:8] in _MP4_BOX_TYPES:
+        return 'mp4'
+    if header.startswith(b'\x1a\x45\xdf\xa3'):
+        return 'matroska'
+    if header.startswith(b'RIFF') and header[8:12] == b'AVI ':
+        return 'avi'
+    if header.startswith(b'RIFF') and header[8:12] == b'WAVE':
+        return 'wav'
+    if header.startswith(b'\x30\x26\xb2\x75\x8e\x66\xcf\x11'):
+        return 'asf'
+    if header.startswith(b'ID3') or (len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    if header.startswith(b'fLaC'):
+        return 'flac'
+    if header.startswith(b'OggS'):
+        return 'ogg'
+    return None
+
+
+class Mp4LayoutProbe:
+    """
+    Walks top-level MP4 boxes as bytes arrive to find whether 'moov' precedes 'mdat'.
+
+    A file can only be demuxed from a pipe when its index (moov) comes first;
+    files written with the index at the end need the whole file on disk.
+    """
+
+    def __init__(self):
+        self._buffer = b''
+        self._buffer_start = 0
+        self._next_box = 0
+
+    def feed(self, data: bytes) -> Optional[bool]:
+        """
+        Consume the next bytes of the file.
+
+        Returns:
+            bool or None: True if moov comes first, False if mdat does (or the
+                          layout is invalid), None while still undecided.
+        """
+        self._buffer += data
+        while True:
+            rel = self._next_box - self._buffer_start
+            if rel >= len(self._buffer):
+                # The next box header has not arrived yet; drop skipped bytes
+                self._buffer_start += len(self._buffer)
+                self._buffer = b''
+                return None
+            if len(self._buffer) - rel < 16:
+                self._buffer_start += rel
+                self._buffer = self._buffer[rel:]
+                return None
+
+            size = int.from_bytes(self._buffer[rel:rel + 4], 'big')
+            box_type = self._buffer[rel + 4:rel + 8]
+            if box_type == b'moov':
+                return True
+            if box_type == b'mdat' or size == 0:
+                return False
+            if size == 1:
+                size = int.from_bytes(self._buffer[rel + 8:rel + 16], 'big')
+            if size < 8:
+                return False
+            self._next_box += size
+
+
+class PipelinedAudioExtractor:
+    """ffmpeg process that extracts lossless 16 kHz mono audio from bytes written to it."""
+
+    def __init__(self, output_path: str, log_path: str):
+        self.output_path = output_path
+        self.log_path = log_path
+        self.error = None
+        self._proc = ffmpeg.spawn_ffmpeg([
+            '-i', 'pipe:0', '-vn', '-map', '0:a:0',
+            '-ac', '1', '-ar', str(Config.SPEECH_SAMPLE_RATE), '-c:a', 'flac',
+            '-y', output_path
+        ], log_path)
+
+    def feed(self, data: bytes) -> bool:
+        """Write bytes to ffmpeg; returns False once ffmpeg has stopped reading."""
+        if self.error:
+            return False
+        try:
+            self._proc.stdin.write(data)
+            return True
+        except (BrokenPipeError, OSError):
+            self._proc.wait()
+            self.error = self._log_tail() or 'ffmpeg stopped reading the upload'
+            return False
+
+    def finish(self) -> bool:
+        """Close ffmpeg's input and wait for it; returns True if the audio file is complete."""
+        if not self.error:
+            try:
+                self._proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            try:
+                returncode = self._proc.wait(timeout=Config.FFMPEG_TIMEOUT)
+            except Exception:
+                self.abort()
+                returncode = -1
+            if returncode != 0:
+                self.error = self._log_tail() or f'ffmpeg exited with status {returncode}'
+        return self.error is None
+
+    def abort(self):
+        """Stop ffmpeg without waiting for the rest of the input."""
+        if self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+
+    def _log_tail(self) -> str:
+        try:
+            with open(self.log_path, 'r', encoding='utf-8', errors='replace') as f:
+                lines = [line.strip() for line in f if line.strip()]
+            return ' | '.join(lines[-3:])
+        except OSError:
+            return ''
+
+
+def new_upload_dir() -> str:
+    """Create a private directory for one upload under UPLOAD_FOLDER."""
+    upload_dir = os.path.join(str(Config.UPLOAD_FOLDER), uuid.uuid4().hex)
+    os.makedirs(upload_dir)
+    return upload_dir
+
+
+class StreamingUpload:
+    """
+    Writable file object that Werkzeug streams one uploaded file into.
+
+    Data goes directly to its final location in a per-upload directory, so the
+    file is written once and memory use stays at one parser buffer no matter
+    how large the upload is. The SHA-256 is computed as bytes arrive and the
+    container type is checked as soon as the first bytes are in.
+
+    Matroska videos, and MP4/MOV videos whose moov box precedes mdat, are also
+    piped into a PipelinedAudioExtractor. Unless PIPELINED_KEEP_VIDEO is set,
+    the video itself is then not kept. Other videos are saved and converted
+    after the upload as before.
+    """
+
+    def __init__(self, filename: str):
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        if extension not in EXTENSION_CONTAINERS:
+            raise UploadRejectedError(f"Unsupported file type: '{filename}'")
+
+        self.filename = filename
+        self.extension = extension
+        self.upload_dir = new_upload_dir()
+        self.path = os.path.join(self.upload_dir, secure_filename(filename) or f"upload.{extension}")
+        self.size = 0
+        self.container = None
+        self.sha256 = None
+        self.claimed = False
+        self.audio_path = None
+        self.video_kept = True
+
+        self._file = open(self.path, 'w+b')
+        self._hasher = hashlib.sha256()
+        self._header = b''
+        self._layout = None
+        self._extractor = None
+
+        if has_request_context():
+            g.setdefault('streaming_uploads', []).append(self)
+
+    def write(self, data: bytes) -> int:
+        if self.container is None:
+            self._header += data
+            if len(self._header) < SNIFF_BYTES:
+                return len(data)
+            self._check_header()
+            data, self._header = self._header, b''
+            self._start_pipeline_detection()
+
+        self._hasher.update(data)
+        self.size += len(data)
+        if self.video_kept:
+            self._file.write(data)
+        if self._layout is not None:
+            self._detect_layout(data)
+        elif self._extractor is not None:
+            self._feed_extractor(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        # Werkzeug seeks back to the start once the part is complete
+        if self.sha256 is None and offset == 0 and whence == 0:
+            self._finish()
+        return self._file.seek(offset, whence)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._file.readline(size)
+
+    def close(self):
+        self._file.close()
+
+    def claim(self) -> Tuple[Optional[str], str]:
+        """
+        Take ownership of the stored file so it survives the request.
+
+        Returns:
+            Tuple[str, str]: (file path, upload directory to remove when done).
+                             The path is None when only the pipelined audio was kept.
+        """
+        self.claimed = True
+        self._file.close()
+        return self.path, self.upload_dir
+
+    def discard(self):
+        """Delete the stored file and its directory."""
+        if self._extractor is not None:
+            self._extractor.abort()
+        self._file.close()
+        shutil.rmtree(self.upload_dir, ignore_errors=True)
+
+    def _start_pipeline_detection(self):
+        """Decide whether this upload can be demuxed while it streams."""
+        if not (Config.PIPELINED_EXTRACTION_ENABLED and self.extension in PIPELINE_EXTENSIONS
+                and ffmpeg.is_available()):
+            return
+        if self.container == 'matroska':
+            self._start_extractor()
+        elif self.container == 'mp4':
+            self._layout = Mp4LayoutProbe()
+
+    def _detect_layout(self, data: bytes):
+        moov_first = self._layout.feed(data)
+        if moov_first is None and self.size <= Config.PIPELINED_DECISION_BYTES:
+            return
+        self._layout = None
+        if moov_first:
+            self._start_extractor()
+
+    def _start_extractor(self):
+        """Start ffmpeg and replay what has already been written to disk."""
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        self._extractor = PipelinedAudioExtractor(
+            os.path.join(self.upload_dir, f"{stem}_audio.flac"),
+            os.path.join(self.upload_dir, 'ffmpeg.log')
+        )
+        self._file.flush()
+        with open(self.path, 'rb') as written:
+            for block in iter(lambda: written.read(1024 * 1024), b''):
+                if not self._feed_extractor(block):
+                    return
+        if not Config.PIPELINED_KEEP_VIDEO:
+            self.video_kept = False
+
+    def _feed_extractor(self, data: bytes) -> bool:
+        if self._extractor.feed(data):
+            return True
+        if not self.video_kept:
+            # Nothing to fall back to: the video was not kept on disk
+            error = self._extractor.error
+            self.discard()
+            raise UploadRejectedError(f"Could not extract audio from '{self.filename}': {error}")
+        print(f"⚠️  Pipelined audio extraction failed, converting after upload: {self._extractor.error}")
+        self._extractor = None
+        return False
+
+    def _check_header(self):
+        container = sniff_container(self._header)
+        if container not in EXTENSION_CONTAINERS[self.extension]:
+            self.discard()
+            found = container or 'unrecognized data'
+            raise UploadRejectedError(
+                f"'{self.filename}' does not look like a .{self.extension} file ({found})"
+            )
+        self.container = container
+
+    def _finish(self):
+        if self.container is None:
+            self._check_header()
+            self._hasher.update(self._header)
+            self._file.write(self._header)
+            self.size += len(self._header)
+            self._header = b''
+        self._file.flush()
+        self.sha256 = self._hasher.hexdigest()
+
+        if self._extractor is not None:
+            if self._extractor.finish():
+                self.audio_path = self._extractor.output_path
+            elif not self.video_kept:
+                error = self._extractor.error
+                self.discard()
+                raise UploadRejectedError(f"Could not extract audio from '{self.filename}': {error}")
+            else:
+                print(f"⚠️  Pipelined audio extraction failed, converting after upload: {self._extractor.error}")
+
+        if self.video_kept:
+            remember_digest(self.path, self.sha256)
+        else:
+            # Only the prefix used for layout detection was written; drop it
+            self._file.close()
+            os.remove(self.path)
+            self._file = open(os.devnull, 'rb')
+            self.path = None
+
+
+class IngestRequest(Request):
+    """Request class that streams uploaded files into the uploads folder."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not Config.STREAMING_UPLOADS_ENABLED or not filename:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return StreamingUpload(filename)
+
+
+def save_upload(file) -> Tuple[Optional[str], str]:
+    """
+    Get a stored path for an uploaded file, saving it only if it was not streamed.
+
+    Args:
+        file (FileStorage): Uploaded file from request.files
+
+    Returns:
+        Tuple[str, str]: (file path, upload directory to remove when done). The
+                         path is None for pipelined videos that were not kept.
+    """
+    if isinstance(file.stream, StreamingUpload):
+        return file.stream.claim()
+
+    upload_dir = new_upload_dir()
+    file_path = os.path.join(upload_dir, secure_filename(file.filename))
+    file.save(file_path)
+    return file_path, upload_dir
+
+
+def pipelined_audio(file) -> Optional[str]:
+    """
+    Get the audio extracted while an uploaded video was streaming.
+
+    Args:
+        file (FileStorage): Uploaded file from request.files
+
+    Returns:
+        str or None: Path to the extracted FLAC audio, if extraction ran and succeeded
+    """
+    if isinstance(file.stream, StreamingUpload):
+        return file.stream.audio_path
+    return None
+
+
+def upload_digest(file, file_path: str) -> str:
+    """
+    Get the SHA-256 of an uploaded file, reusing the digest computed while it streamed.
+
+    Args:
+        file (FileStorage): Uploaded file from request.files
+        file_path (str): Where save_upload() stored it
+
+    Returns:
+        str: Hex SHA-256 digest of the uploaded bytes
+    """
+    if isinstance(file.stream, StreamingUpload) and file.stream.sha256:
+        return file.stream.sha256
+    return file_sha256(file_path)
+
+
+def discard_unclaimed_uploads(exc=None):
+    """Remove streamed files the request handler did not claim (teardown hook)."""
+    for upload in g.pop('streaming_uploads', []):
+        if not upload.claimed:
+            upload.discard()
@@ -28,11 +28,124 @@ class Config:
     UPLOAD_FOLDER = BASE_DIR / os.getenv('UPLOAD_FOLDER', 'uploads')
     OUTPUT_FOLDER = BASE_DIR / os.getenv('OUTPUT_FOLDER', 'outputs')
     TEMP_FOLDER = BASE_DIR / os.getenv('TEMP_FOLDER', 'temp')
+    STREAMING_UPLOADS_ENABLED = os.getenv('STREAMING_UPLOADS_ENABLED', 'true').lower() == 'true'
+    RESUMABLE_CHUNK_BYTES = int(os.getenv('RESUMABLE_CHUNK_BYTES', 8 * 1024 * 1024))
+    RESUMABLE_MAX_BYTES = int(os.getenv('RESUMABLE_MAX_BYTES', 4 * 1024 * 1024 * 1024))
+    RESUMABLE_UPLOAD_TTL_SECONDS = int(os.getenv('RESUMABLE_UPLOAD_TTL_SECONDS', 24 * 3600))
+    PIPELINED_EXTRACTION_ENABLED = os.getenv('PIPELINED_EXTRACTION_ENABLED', 'true').lower() == 'true'
+    PIPELINED_KEEP_VIDEO = os.getenv('PIPELINED_KEEP_VIDEO', 'false').lower() == 'true'
+    PIPELINED_DECISION_BYTES = int(os.getenv('PIPELINED_DECISION_BYTES', 4 * 1024 * 1024))
     
     # PDF Configuration
     COMPANY_NAME = os.getenv('COMPANY_NAME', 'ConverSync AI')
     LOGO_PATH = os.getenv('LOGO_PATH')
     
+    # Media Conversion Configuration
+    MEDIA_BACKEND = os.getenv('MEDIA_BACKEND', 'auto')  # 'auto', 'ffmpeg' or 'moviepy'
+    MAX_MEDIA_DURATION_SECONDS = float(os.getenv('MAX_MEDIA_DURATION_SECONDS', 4 * 3600))
+    PROCESSING_BASE_SECONDS = float(os.getenv('PROCESSING_BASE_SECONDS', 20))
+    PROCESSING_SECONDS_PER_MEDIA_MINUTE = float(os.getenv('PROCESSING_SECONDS_PER_MEDIA_MINUTE', 3))
+    
+    # Speech Encoding Profile (audio sent for transcription)
+    SPEECH_PROFILE_ENABLED = os.getenv('SPEECH_PROFILE_ENABLED', 'true').lower() == 'true'
+    SPEECH_CODEC = os.getenv('SPEECH_CODEC', 'opus')  # 'opus' or 'flac'
+    SPEECH_SAMPLE_RATE = int(os.getenv('SPEECH_SAMPLE_RATE', 16000))
+    SPEECH_MIN_BITRATE_KBPS = int(os.getenv('SPEECH_MIN_BITRATE_KBPS', 8))
+    SPEECH_MAX_BITRATE_KBPS = int(os.getenv('SPEECH_MAX_BITRATE_KBPS', 16))
+    SPEECH_MAX_BYTES = int(os.getenv('SPEECH_MAX_BYTES', 24 * 1024 * 1024))
+    
+    # Silence Removal (energy-based voice activity detection)
+    VAD_ENABLED = os.getenv('VAD_ENABLED', 'true').lower() == 'true'
+    VAD_FRAME_MS = int(os.getenv('VAD_FRAME_MS', 30))
+    VAD_THRESHOLD_DB = float(os.getenv('VAD_THRESHOLD_DB', -50))
+    VAD_NOISE_MARGIN_DB = float(os.getenv('VAD_NOISE_MARGIN_DB', 10))
+    VAD_MIN_SILENCE_SECONDS = float(os.getenv('VAD_MIN_SILENCE_SECONDS', 2.0))
+    VAD_KEEP_SILENCE_SECONDS = float(os.getenv('VAD_KEEP_SILENCE_SECONDS', 0.3))
+    
+    # Transcription Chunking Configuration
+    TRANSCRIPTION_CHUNKING_ENABLED = os.getenv('TRANSCRIPTION_CHUNKING_ENABLED', 'true').lower() == 'true'
+    TRANSCRIPTION_MAX_UPLOAD_BYTES = int(os.getenv('TRANSCRIPTION_MAX_UPLOAD_BYTES', 25 * 1024 * 1024))
+    TRANSCRIPTION_CHUNK_SECONDS = float(os.getenv('TRANSCRIPTION_CHUNK_SECONDS', 600))
+    TRANSCRIPTION_CHUNK_SEARCH_SECONDS = float(os.getenv('TRANSCRIPTION_CHUNK_SEARCH_SECONDS', 60))
+    TRANSCRIPTION_CHUNK_OVERLAP_SECONDS = float(os.getenv('TRANSCRIPTION_CHUNK_OVERLAP_SECONDS', 2))
+    TRANSCRIPTION_SILENCE_DB = float(os.getenv('TRANSCRIPTION_SILENCE_DB', -35))
+    TRANSCRIPTION_SILENCE_MIN_SECONDS = float(os.getenv('TRANSCRIPTION_SILENCE_MIN_SECONDS', 0.5))
+    TRANSCRIPTION_MAX_WORKERS = int(os.getenv('TRANSCRIPTION_MAX_WORKERS', 4))
+    FFMPEG_TIMEOUT = int(os.getenv('FFMPEG_TIMEOUT', 1800))
+    
+    # Transcription Cache Configuration
+    TRANSCRIPTION_CACHE_ENABLED = os.getenv('TRANSCRIPTION_CACHE_ENABLED', 'true').lower() == 'true'
+    TRANSCRIPTION_CACHE_DIR = BASE_DIR / os.getenv('TRANSCRIPTION_CACHE_DIR', 'cache/transcriptions')
+    TRANSCRIPTION_CACHE_MAX_BYTES = int(os.getenv('TRANSCRIPTION_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+    
+    # LLM Response Cache Configuration
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_PATH = BASE_DIR / os.getenv('LLM_CACHE_PATH', 'cache/llm_responses.sqlite3')
+    LLM_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+    LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+    
+    # Summarization Configuration
+    SUMMARY_MODE = os.getenv('SUMMARY_MODE', 'auto')  # auto, single, fanout or mapreduce
+    SUMMARY_SINGLE_CALL_MAX_CHARS = int(os.getenv('SUMMARY_SINGLE_CALL_MAX_CHARS', 20000))
+    SUMMARY_DIRECT_MAX_TOKENS = int(os.getenv('SUMMARY_DIRECT_MAX_TOKENS', 8000))
+    SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', 4000))
+    SUMMARY_MAX_REDUCE_LEVELS = int(os.getenv('SUMMARY_MAX_REDUCE_LEVELS', 3))
+    SUMMARY_CHUNK_CACHE_SIZE = int(os.getenv('SUMMARY_CHUNK_CACHE_SIZE', 512))
+    SUMMARY_CONCURRENT = os.getenv('SUMMARY_CONCURRENT', 'true').lower() == 'true'
+    SUMMARY_MAX_WORKERS = int(os.getenv('SUMMARY_MAX_WORKERS', 6))
+    SUMMARY_SECTION_RETRIES = int(os.getenv('SUMMARY_SECTION_RETRIES', 2))
+    SUMMARY_RETRY_BACKOFF = float(os.getenv('SUMMARY_RETRY_BACKOFF', 1.0))
+    
+    # Chat Context (transcript retrieval and conversation history)
+    CHAT_RETRIEVAL_ENABLED = os.getenv('CHAT_RETRIEVAL_ENABLED', 'true').lower() == 'true'
+    CHAT_FULL_TRANSCRIPT_MAX_TOKENS = int(os.getenv('CHAT_FULL_TRANSCRIPT_MAX_TOKENS', 4000))
+    CHAT_CHUNK_TOKENS = int(os.getenv('CHAT_CHUNK_TOKENS', 300))
+    CHAT_RETRIEVAL_TOP_K = int(os.getenv('CHAT_RETRIEVAL_TOP_K', 6))
+    CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv('CHAT_HISTORY_TOKEN_BUDGET', 1500))
+    CHAT_SUMMARY_MAX_WORDS = int(os.getenv('CHAT_SUMMARY_MAX_WORDS', 200))
+    
+    # Chat Session Storage
+    SESSION_STORE_BACKEND = os.getenv('SESSION_STORE_BACKEND', 'sqlite')  # sqlite or memory
+    SESSION_STORE_PATH = BASE_DIR / os.getenv('SESSION_STORE_PATH', 'cache/chat_sessions.sqlite3')
+    SESSION_INDEX_CACHE_SIZE = int(os.getenv('SESSION_INDEX_CACHE_SIZE', 32))
+    SESSION_TTL_SECONDS = int(os.getenv('SESSION_TTL_SECONDS', 86400))  # idle time before expiry; 0 = never
+    SESSION_MAX_BYTES = int(os.getenv('SESSION_MAX_BYTES', 256 * 1024 * 1024))  # 0 = unlimited
+    SESSION_SWEEP_INTERVAL_SECONDS = int(os.getenv('SESSION_SWEEP_INTERVAL_SECONDS', 300))
+    
+    # Provider Rate Limits (per minute; 0 = unlimited)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    GROQ_REQUESTS_PER_MINUTE = float(os.getenv('GROQ_REQUESTS_PER_MINUTE', 20))
+    GROQ_TOKENS_PER_MINUTE = float(os.getenv('GROQ_TOKENS_PER_MINUTE', 0))
+    GEMINI_REQUESTS_PER_MINUTE = float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', 60))
+    GEMINI_TOKENS_PER_MINUTE = float(os.getenv('GEMINI_TOKENS_PER_MINUTE', 1000000))
+    RATE_LIMIT_MODEL_OVERRIDES = os.getenv('RATE_LIMIT_MODEL_OVERRIDES', '')  # provider:model=rpm:tpm,...
+    RATE_LIMIT_MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', 4))
+    RATE_LIMIT_BACKOFF_BASE = float(os.getenv('RATE_LIMIT_BACKOFF_BASE', 1.0))
+    RATE_LIMIT_BACKOFF_MAX = float(os.getenv('RATE_LIMIT_BACKOFF_MAX', 30.0))
+    
+    # Shared Provider HTTP Connection Pool
+    PROVIDER_MAX_CONNECTIONS = int(os.getenv('PROVIDER_MAX_CONNECTIONS', 20))
+    PROVIDER_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('PROVIDER_MAX_KEEPALIVE_CONNECTIONS', 10))
+    PROVIDER_KEEPALIVE_EXPIRY = float(os.getenv('PROVIDER_KEEPALIVE_EXPIRY', 60.0))
+    
+    # LLM Circuit Breaker and Hedged Requests
+    LLM_CIRCUIT_BREAKER_ENABLED = os.getenv('LLM_CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true'
+    LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('LLM_CIRCUIT_FAILURE_THRESHOLD', 5))
+    LLM_CIRCUIT_RECOVERY_SECONDS = float(os.getenv('LLM_CIRCUIT_RECOVERY_SECONDS', 30.0))
+    LLM_HEDGING_ENABLED = os.getenv('LLM_HEDGING_ENABLED', 'false').lower() == 'true'
+    LLM_HEDGE_PERCENTILE = float(os.getenv('LLM_HEDGE_PERCENTILE', 95))
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20))
+    LLM_HEDGE_MAX_WORKERS = int(os.getenv('LLM_HEDGE_MAX_WORKERS', 8))
+    
+    # Background Job Configuration
+    JOB_MAX_WORKERS = int(os.getenv('JOB_MAX_WORKERS', 2))
+    JOB_MAX_QUEUE_SIZE = int(os.getenv('JOB_MAX_QUEUE_SIZE', 20))
+    JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', 3600))
+    PIPELINE_MAX_WORKERS = int(os.getenv('PIPELINE_MAX_WORKERS', 2))
+    RUNS_FOLDER = BASE_DIR / os.getenv('RUNS_FOLDER', 'runs')
+    RUN_RETENTION_SECONDS = int(os.getenv('RUN_RETENTION_SECONDS', 7 * 24 * 3600))
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 24 * 3600))
+    
     # Email Templates
     DEFAULT_EMAIL_SUBJECT = "Minutes of the Meeting"
     DEFAULT_EMAIL_BODY = """
@@ -60,7 +60,7 @@ function App() {
         progress: 80,
       }));
 
-      const chatResult = await apiService.startChatSession(result.transcript || '');
+      const chatResult = await apiService.startChatSession(result.transcript || '', result.segments);
       
       if (!chatResult.success) {
         throw new Error(chatResult.error || 'Failed to start chat session');
@@ -51,17 +51,32 @@ const ChatInterface = ({ sessionId, onBackToHome }: ChatInterfaceProps) => {
     setInputText('');
     setIsTyping(true);
 
+    const botMessageId = (Date.now() + 1).toString();
+    let streamedText = '';
+
     try {
-      const response = await apiService.sendChatMessage(sessionId, messageText);
+      const response = await apiService.streamChatMessage(sessionId, messageText, (text) => {
+        streamedText += text;
+        if (streamedText === text) {
+          // First token: replace the typing indicator with the message being written
+          setIsTyping(false);
+          setMessages(prev => [...prev, {
+            id: botMessageId,
+            text: streamedText,
+            sender: 'bot',
+            timestamp: new Date(),
+          }]);
+        } else {
+          const current = streamedText;
+          setMessages(prev => prev.map(m => (m.id === botMessageId ? { ...m, text: current } : m)));
+        }
+      });
       
       if (response.success && response.response) {
-        const botMessage: Message = {
-          id: (Date.now() + 1).toString(),
-          text: response.response,
-          sender: 'bot',
-          timestamp: new Date(),
-        };
-        setMessages(prev => [...prev, botMessage]);
+        const finalText = response.response;
+        setMessages(prev => prev.some(m => m.id === botMessageId)
+          ? prev.map(m => (m.id === botMessageId ? { ...m, text: finalText } : m))
+          : [...prev, { id: botMessageId, text: finalText, sender: 'bot', timestamp: new Date() }]);
 
         // If TTS is enabled, play the response
         if (ttsEnabled) {
@@ -88,8 +103,10 @@ const ChatInterface = ({ sessionId, onBackToHome }: ChatInterfaceProps) => {
       }
     } catch (error) {
       console.error('Chat message failed:', error);
+      // Drop a partially streamed answer, it was not saved to the conversation
+      setMessages(prev => prev.filter(m => m.id !== botMessageId));
       const errorMessage: Message = {
-        id: (Date.now() + 1).toString(),
+        id: (Date.now() + 2).toString(),
         text: "I'm sorry, I'm having trouble responding right now. Please try again.",
         sender: 'bot',
         timestamp: new Date(),
@@ -23,6 +23,7 @@ interface UploadResponse {
   email_sent?: boolean;
   processing_time?: number;
   transcript?: string;
+  segments?: unknown[];
   language?: string;
   duration?: number;
   output_file?: string;
@@ -189,10 +190,10 @@ class ApiService {
   }
 
   // Chat endpoints
-  async startChatSession(transcript: string): Promise<SessionResponse> {
+  async startChatSession(transcript: string, segments?: unknown[]): Promise<SessionResponse> {
     return this.makeRequest('/chat/start', {
       method: 'POST',
-      body: JSON.stringify({ transcript }),
+      body: JSON.stringify({ transcript, segments }),
     });
   }
 
@@ -203,6 +204,49 @@ class ApiService {
     });
   }
 
+  // Streams the answer as Server-Sent Events, calling onToken for each fragment
+  async streamChatMessage(
+    sessionId: string,
+    message: string,
+    onToken: (text: string) => void
+  ): Promise<ChatResponse> {
+    const response = await fetch(`${API_BASE_URL}/chat/${sessionId}/message/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ message }),
+    });
+
+    if (!response.ok || !response.body) {
+      const errorText = await response.text();
+      throw new Error(`HTTP error! status: ${response.status} - ${errorText}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+
+        const event = block.match(/^event: (.*)$/m)?.[1];
+        const data = block.match(/^data: (.*)$/m)?.[1];
+        if (!event || !data) continue;
+        const payload = JSON.parse(data);
+        if (event === 'token') onToken(payload.text);
+        if (event === 'done') return payload as ChatResponse;
+        if (event === 'error') return { success: false, error: payload.error };
+      }
+    }
+    return { success: false, error: 'Stream ended unexpectedly' };
+  }
+
   async generateMinutes(
     sessionId: string, 
     meetingDetails: MeetingDetails
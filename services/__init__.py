@@ -1,4 +1,5 @@
-from .media_converter import MediaConverter
+from .media_converter import MediaConverter, NoAudioStreamError
+from .silence_stripper import SilenceStripper, TimeMap
 from .transcription_service import TranscriptionService
 from .summarization_service import SummarizationService
 from .pdf_service import PDFService
@@ -7,6 +8,9 @@ from .tts_service import TTSService
 
 __all__ = [
     'MediaConverter',
+    'NoAudioStreamError',
+    'SilenceStripper',
+    'TimeMap',
     'TranscriptionService', 
     'SummarizationService',
     'PDFService',
@@ -0,0 +1,170 @@
+"""
+Splitting long recordings into overlapping chunks at silence points,
+and stitching the per-chunk transcriptions back together.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from services.transcript_chunker import segment_value
+from utils.ffmpeg import detect_silences, run_ffmpeg
+
+
+def plan_chunks(duration: float, silences: List[Tuple[float, float]],
+                target_seconds: float, search_seconds: float,
+                overlap_seconds: float) -> List[Dict[str, float]]:
+    """
+    Choose chunk boundaries near the target length, preferring silences.
+
+    Each boundary is placed at the middle of the silence closest to the ideal
+    cut point within ``search_seconds``; without a nearby silence the chunk is
+    cut at the target length. Chunks are then widened by ``overlap_seconds`` on
+    each inner edge so no words are lost at a cut.
+
+    Args:
+        duration (float): Total audio duration in seconds.
+        silences (List[Tuple[float, float]]): Silent intervals (start, end).
+        target_seconds (float): Desired chunk length.
+        search_seconds (float): How far from the ideal cut to look for silence.
+        overlap_seconds (float): Extra audio added on both sides of each cut.
+
+    Returns:
+        List[Dict[str, float]]: Chunks with 'start'/'end' (nominal, non-overlapping
+                                range) and 'cut_start'/'cut_end' (audio actually sent).
+    """
+    boundaries = [0.0]
+    while duration - boundaries[-1] > target_seconds + search_seconds:
+        ideal = boundaries[-1] + target_seconds
+        candidates = [
+            (start + end) / 2 for start, end in silences
+            if abs((start + end) / 2 - ideal) <= search_seconds and (start + end) / 2 > boundaries[-1]
+        ]
+        cut = min(candidates, key=lambda point: abs(point - ideal)) if candidates else ideal
+        boundaries.append(cut)
+    boundaries.append(duration)
+
+    chunks = []
+    for i in range(len(boundaries) - 1):
+        start, end = boundaries[i], boundaries[i + 1]
+        chunks.append({
+            'index': i,
+            'start': start,
+            'end': end,
+            'cut_start': max(start - overlap_seconds, 0.0) if i > 0 else 0.0,
+            'cut_end': min(end + overlap_seconds, duration) if i < len(boundaries) - 2 else duration,
+        })
+    return chunks
+
+
+def find_silences(audio_path: str, noise_db: float, min_silence: float) -> List[Tuple[float, float]]:
+    """Detect silences, returning an empty list if detection fails."""
+    try:
+        return detect_silences(audio_path, noise_db=noise_db, min_silence=min_silence)
+    except Exception as e:
+        print(f"⚠️  Silence detection failed, cutting at fixed lengths: {e}")
+        return []
+
+
+def split_audio(audio_path: str, chunks: List[Dict[str, float]], output_dir: str) -> List[str]:
+    """
+    Cut the audio into the planned chunks without re-encoding.
+
+    Args:
+        audio_path (str): Source audio file.
+        chunks (List[Dict[str, float]]): Chunks from plan_chunks().
+        output_dir (str): Directory for the chunk files.
+
+    Returns:
+        List[str]: Chunk file paths, in chunk order.
+    """
+    suffix = Path(audio_path).suffix or '.mp3'
+    paths = []
+    for chunk in chunks:
+        chunk_path = os.path.join(output_dir, f"chunk_{chunk['index']:04d}{suffix}")
+        run_ffmpeg([
+            '-y', '-ss', f"{chunk['cut_start']:.3f}", '-i', audio_path,
+            '-t', f"{chunk['cut_end'] - chunk['cut_start']:.3f}",
+            '-vn', '-c', 'copy', chunk_path
+        ])
+        paths.append(chunk_path)
+    return paths
+
+
+def stitch_transcriptions(chunks: List[Dict[str, float]],
+                          results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk transcriptions into one result with global timestamps.
+
+    Segment times are shifted by each chunk's audio offset. In the overlap
+    between chunks, a segment is kept only by the chunk whose nominal range
+    contains the segment's midpoint, so overlapping speech appears once.
+    Chunks with no speech contribute nothing; a chunk with text but no
+    segments is joined by removing words repeated across the overlap.
+
+    Args:
+        chunks (List[Dict[str, float]]): Chunks from plan_chunks().
+        results (List[Dict[str, Any]]): Transcription results in chunk order.
+
+    Returns:
+        Dict[str, Any]: Combined result with text, segments, language and duration.
+    """
+    segments: List[Dict[str, Any]] = []
+    text = ''
+    last = len(chunks) - 1
+
+    for chunk, result in zip(chunks, results):
+        if not result.get('segments'):
+            # Without timestamps, fall back to removing words repeated across the overlap
+            text = merge_overlapping_text(text, (result.get('text') or '').strip())
+            continue
+
+        offset = chunk['cut_start']
+        chunk_texts = []
+        for seg in result['segments']:
+            start = float(segment_value(seg, 'start', 0.0)) + offset
+            end = float(segment_value(seg, 'end', 0.0)) + offset
+            midpoint = (start + end) / 2
+            if midpoint < chunk['start'] or (midpoint >= chunk['end'] and chunk['index'] != last):
+                continue
+            merged = dict(seg) if isinstance(seg, dict) else {'text': segment_value(seg, 'text', '')}
+            merged.update({'id': len(segments), 'start': round(start, 3), 'end': round(end, 3)})
+            segments.append(merged)
+            chunk_texts.append(str(merged.get('text', '')).strip())
+        text = ' '.join(filter(None, [text] + chunk_texts))
+
+    return {
+        'text': text,
+        'segments': segments or None,
+        'language': next((r.get('language') for r in results if r.get('language')), None),
+        'duration': chunks[-1]['end'] if chunks else None,
+    }
+
+
+def merge_overlapping_text(previous: str, following: str, max_words: int = 40) -> str:
+    """
+    Join two transcript texts, dropping words repeated across the overlap.
+
+    Args:
+        previous (str): Text so far.
+        following (str): Text of the next chunk.
+        max_words (int): Longest overlap to look for, in words.
+
+    Returns:
+        str: Combined text.
+    """
+    if not previous:
+        return following
+    if not following:
+        return previous
+
+    prev_words = previous.split()
+    next_words = following.split()
+    normalize = lambda words: [w.strip('.,!?;:"\'').lower() for w in words]
+    prev_norm = normalize(prev_words[-max_words:])
+    next_norm = normalize(next_words[:max_words])
+
+    for size in range(min(len(prev_norm), len(next_norm)), 0, -1):
+        if prev_norm[-size:] == next_norm[:size]:
+            return ' '.join(prev_words + next_words[size:])
+    return ' '.join(prev_words + next_words)
@@ -0,0 +1,144 @@
+"""
+Process-wide provider clients.
+Groq and Gemini clients are created once and shared by every service and
+thread, so calls reuse keep-alive connections instead of paying a TCP and
+TLS handshake each time.
+"""
+
+import threading
+from typing import Any, Dict
+
+import google.generativeai as genai
+import httpx
+from groq import Groq
+
+from config import Config
+
+
+class ConnectionStats:
+    """
+    Counts requests and new connections on an httpx client.
+
+    New connections are observed through httpcore's ``trace`` request
+    extension; every other request went out on a reused keep-alive connection.
+    """
+
+    def __init__(self):
+        self._requests = 0
+        self._connections = 0
+        self._lock = threading.Lock()
+
+    def on_request(self, request: httpx.Request):
+        """httpx request event hook."""
+        with self._lock:
+            self._requests += 1
+        request.extensions['trace'] = self._trace
+
+    def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == 'connection.connect_tcp.complete':
+            with self._lock:
+                self._connections += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests, connections = self._requests, self._connections
+        return {
+            'requests': requests,
+            'connections_opened': connections,
+            'connections_reused': max(requests - connections, 0),
+            'reuse_ratio': round(1 - connections / requests, 3) if requests else 0.0,
+        }
+
+
+class ClientRegistry:
+    """
+    Lazily creates one client per provider and shares it.
+
+    The Groq SDK client is thread-safe and wraps a single httpx connection
+    pool sized by PROVIDER_MAX_CONNECTIONS. Gemini models are cached per model
+    name; they share the google client's channel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._groq = None
+        self._http_client = None
+        self._groq_stats = ConnectionStats()
+        self._gemini_configured = False
+        self._models: Dict[str, Any] = {}
+        self._model_lookups = 0
+
+    def groq(self) -> Groq:
+        """Get the shared Groq client."""
+        with self._lock:
+            if self._groq is None:
+                self._http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=Config.PROVIDER_MAX_CONNECTIONS,
+                        max_keepalive_connections=Config.PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=Config.PROVIDER_KEEPALIVE_EXPIRY,
+                    ),
+                    follow_redirects=True,
+                    event_hooks={'request': [self._groq_stats.on_request]},
+                )
+                # Retries are handled by the shared rate limiter
+                self._groq = Groq(api_key=Config.GROQ_API_KEY, max_retries=0,
+                                  http_client=self._http_client)
+            return self._groq
+
+    def gemini_model(self, model_name: str) -> Any:
+        """
+        Get the shared GenerativeModel for a model name.
+
+        Args:
+            model_name (str): Gemini model name
+
+        Returns:
+            genai.GenerativeModel: The cached model
+        """
+        with self._lock:
+            if not self._gemini_configured:
+                genai.configure(api_key=Config.GEMINI_API_KEY)
+                self._gemini_configured = True
+            self._model_lookups += 1
+            model = self._models.get(model_name)
+            if model is None:
+                model = self._models[model_name] = genai.GenerativeModel(model_name)
+            return model
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get client and connection pool statistics.
+
+        Returns:
+            Dict[str, Any]: Groq pool limits, open connections and reuse
+                            counters, and the cached Gemini models
+        """
+        with self._lock:
+            groq_stats = {
+                'created': self._groq is not None,
+                'max_connections': Config.PROVIDER_MAX_CONNECTIONS,
+                'max_keepalive_connections': Config.PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+                'open_connections': _open_connections(self._http_client),
+                **self._groq_stats.get_stats(),
+            }
+            gemini_stats = {
+                'models': sorted(self._models),
+                'lookups': self._model_lookups,
+                'reused': self._model_lookups - len(self._models),
+            }
+        return {'groq': groq_stats, 'gemini': gemini_stats}
+
+
+def _open_connections(client: httpx.Client) -> int:
+    """Connections currently held in an httpx client's pool (0 if unknown)."""
+    pool = getattr(getattr(client, '_transport', None), '_pool', None)
+    return len(getattr(pool, 'connections', []))
+
+
+_registry = ClientRegistry()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Get the process-wide client registry."""
+    return _registry
@@ -1,13 +1,21 @@
 """
 Conversation Memory Service using LangChain's ConversationBufferMemory.
 Manages conversation history and context for chat sessions.
+Idle sessions expire after a TTL and the least recently used sessions are
+evicted once their combined size exceeds a byte budget.
 """
 
 from typing import Dict, Optional, List, Any
 from langchain.memory import ConversationBufferMemory
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from collections import OrderedDict
 from datetime import datetime
 import json
+import threading
+import time
+
+from config import Config
+from utils.sweeper import PeriodicSweeper
 
 
 class ConversationMemoryService:
@@ -16,11 +24,37 @@ class ConversationMemoryService:
     Each session maintains its own conversation buffer memory.
     """
     
-    def __init__(self):
-        """Initialize the conversation memory service."""
-        # Dictionary to store memory for each session
-        self._session_memories: Dict[str, ConversationBufferMemory] = {}
+    def __init__(self, ttl_seconds: int = None, max_bytes: int = None,
+                 sweep_interval_seconds: int = None):
+        """
+        Initialize the conversation memory service.
+        
+        Args:
+            ttl_seconds (int, optional): Idle time before a session expires (0 = never).
+                                         Defaults to Config.SESSION_TTL_SECONDS.
+            max_bytes (int, optional): Byte budget for all sessions (0 = unlimited).
+                                       Defaults to Config.SESSION_MAX_BYTES.
+            sweep_interval_seconds (int, optional): Seconds between background purges of
+                                                    expired sessions (0 = no sweeper).
+                                                    Defaults to Config.SESSION_SWEEP_INTERVAL_SECONDS.
+        """
+        self.ttl_seconds = Config.SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_bytes = Config.SESSION_MAX_BYTES if max_bytes is None else max_bytes
+        
+        # Memory for each session, least recently used first
+        self._session_memories: "OrderedDict[str, ConversationBufferMemory]" = OrderedDict()
         self._session_metadata: Dict[str, Dict[str, Any]] = {}
+        self._session_bytes: Dict[str, int] = {}
+        self._last_access: Dict[str, float] = {}
+        self._evictions = 0
+        self._expirations = 0
+        self._lock = threading.RLock()
+        
+        if sweep_interval_seconds is None:
+            sweep_interval_seconds = Config.SESSION_SWEEP_INTERVAL_SECONDS
+        self._sweeper = PeriodicSweeper('conversation memories', sweep_interval_seconds,
+                                        self.purge_expired)
+        self._sweeper.start()
     
     def create_session_memory(self, session_id: str, transcript: str = None) -> ConversationBufferMemory:
         """
@@ -41,16 +75,6 @@ class ConversationMemoryService:
             ai_prefix="Assistant"
         )
         
-        # Store the memory
-        self._session_memories[session_id] = memory
-        
-        # Store metadata
-        self._session_metadata[session_id] = {
-            'created_at': datetime.now().isoformat(),
-            'transcript': transcript,
-            'message_count': 0
-        }
-        
         # If there's a transcript, add it as system context
         if transcript:
             system_context = f"""You are a helpful AI assistant for a meeting analysis system. 
@@ -66,6 +90,18 @@ discussing meeting content."""
             # Add initial system context as an AI message
             memory.chat_memory.add_ai_message(system_context)
         
+        with self._lock:
+            # Store the memory and its metadata
+            self._session_memories[session_id] = memory
+            self._session_memories.move_to_end(session_id)
+            self._session_metadata[session_id] = {
+                'created_at': datetime.now().isoformat(),
+                'transcript': transcript,
+                'message_count': 0
+            }
+            self._last_access[session_id] = time.time()
+            self._update_size(session_id)
+        
         print(f"✅ Created conversation memory for session: {session_id}")
         if transcript:
             print(f"📝 Added transcript context ({len(transcript)} characters)")
@@ -80,9 +116,21 @@ discussing meeting content."""
             session_id (str): Session identifier
             
         Returns:
-            ConversationBufferMemory or None: The memory instance if exists
+            ConversationBufferMemory or None: The memory instance if it exists and
+                                              has not expired
         """
-        return self._session_memories.get(session_id)
+        with self._lock:
+            memory = self._session_memories.get(session_id)
+            if memory is None:
+                return None
+            now = time.time()
+            if self._is_expired(session_id, now):
+                self._remove(session_id)
+                self._expirations += 1
+                return None
+            self._last_access[session_id] = now
+            self._session_memories.move_to_end(session_id)
+            return memory
     
     def add_message_pair(self, session_id: str, human_message: str, ai_message: str) -> bool:
         """
@@ -105,9 +153,12 @@ discussing meeting content."""
         memory.chat_memory.add_user_message(human_message)
         memory.chat_memory.add_ai_message(ai_message)
         
-        # Update metadata
-        if session_id in self._session_metadata:
-            self._session_metadata[session_id]['message_count'] += 1
+        # Update metadata and size
+        with self._lock:
+            if session_id in self._session_metadata:
+                self._session_metadata[session_id]['message_count'] += 1
+            if session_id in self._session_memories:
+                self._update_size(session_id)
         
         print(f"💬 Added message pair to session {session_id}")
         return True
@@ -169,11 +220,13 @@ discussing meeting content."""
         Returns:
             bool: True if cleared successfully, False if session not found
         """
-        if session_id in self._session_memories:
+        with self._lock:
+            if session_id not in self._session_memories:
+                return False
             self._session_memories[session_id].clear()
-            print(f"🧹 Cleared memory for session: {session_id}")
-            return True
-        return False
+            self._update_size(session_id)
+        print(f"🧹 Cleared memory for session: {session_id}")
+        return True
     
     def remove_session(self, session_id: str) -> bool:
         """
@@ -185,14 +238,8 @@ discussing meeting content."""
         Returns:
             bool: True if removed successfully, False if session not found
         """
-        removed = False
-        if session_id in self._session_memories:
-            del self._session_memories[session_id]
-            removed = True
-        
-        if session_id in self._session_metadata:
-            del self._session_metadata[session_id]
-            removed = True
+        with self._lock:
+            removed = self._remove(session_id)
         
         if removed:
             print(f"🗑️ Removed session: {session_id}")
@@ -209,21 +256,24 @@ discussing meeting content."""
         Returns:
             Dict[str, Any] or None: Session information if exists
         """
-        if session_id not in self._session_memories:
-            return None
-        
-        memory = self._session_memories[session_id]
-        metadata = self._session_metadata.get(session_id, {})
-        
-        return {
-            'session_id': session_id,
-            'created_at': metadata.get('created_at'),
-            'message_count': metadata.get('message_count', 0),
-            'has_transcript': bool(metadata.get('transcript')),
-            'transcript_length': len(metadata.get('transcript', '')),
-            'memory_buffer_length': len(memory.buffer) if memory.buffer else 0,
-            'total_messages': len(memory.chat_memory.messages)
-        }
+        with self._lock:
+            if session_id not in self._session_memories:
+                return None
+            
+            memory = self._session_memories[session_id]
+            metadata = self._session_metadata.get(session_id, {})
+            
+            return {
+                'session_id': session_id,
+                'created_at': metadata.get('created_at'),
+                'message_count': metadata.get('message_count', 0),
+                'has_transcript': bool(metadata.get('transcript')),
+                'transcript_length': len(metadata.get('transcript') or ''),
+                'memory_buffer_length': len(memory.buffer) if memory.buffer else 0,
+                'total_messages': len(memory.chat_memory.messages),
+                'bytes': self._session_bytes[session_id],
+                'idle_seconds': round(time.time() - self._last_access[session_id], 1)
+            }
     
     def get_all_sessions_info(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -232,27 +282,85 @@ discussing meeting content."""
         Returns:
             Dict[str, Dict[str, Any]]: Information for all sessions
         """
-        return {
-            session_id: self.get_session_info(session_id) 
-            for session_id in self._session_memories.keys()
-        }
+        with self._lock:
+            return {
+                session_id: self.get_session_info(session_id) 
+                for session_id in self._session_memories.keys()
+            }
+    
+    def purge_expired(self) -> int:
+        """
+        Remove sessions idle for longer than the TTL.
+        
+        Returns:
+            int: Number of sessions removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid in self._session_memories if self._is_expired(sid, now)]
+            for session_id in expired:
+                self._remove(session_id)
+            self._expirations += len(expired)
+        return len(expired)
     
     def get_memory_usage_stats(self) -> Dict[str, Any]:
         """
         Get memory usage statistics.
         
         Returns:
-            Dict[str, Any]: Usage statistics
+            Dict[str, Any]: Usage statistics, including the bytes held by each
+                            session, the byte budget and eviction counters
         """
-        total_sessions = len(self._session_memories)
-        total_messages = sum(
-            len(memory.chat_memory.messages) 
-            for memory in self._session_memories.values()
+        with self._lock:
+            total_sessions = len(self._session_memories)
+            total_messages = sum(
+                len(memory.chat_memory.messages) 
+                for memory in self._session_memories.values()
+            )
+            total_bytes = sum(self._session_bytes.values())
+            
+            return {
+                'total_sessions': total_sessions,
+                'total_messages': total_messages,
+                'average_messages_per_session': total_messages / total_sessions if total_sessions > 0 else 0,
+                'active_session_ids': list(self._session_memories.keys()),
+                'total_bytes': total_bytes,
+                'average_bytes_per_session': round(total_bytes / total_sessions) if total_sessions > 0 else 0,
+                'session_bytes': dict(self._session_bytes),
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+    
+    def _is_expired(self, session_id: str, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - self._last_access[session_id] > self.ttl_seconds
+    
+    def _remove(self, session_id: str) -> bool:
+        """Drop a session and its bookkeeping. Caller holds the lock."""
+        removed = self._session_memories.pop(session_id, None) is not None
+        removed = self._session_metadata.pop(session_id, None) is not None or removed
+        self._session_bytes.pop(session_id, None)
+        self._last_access.pop(session_id, None)
+        return removed
+    
+    def _update_size(self, session_id: str):
+        """Re-measure a session, then evict others if over budget. Caller holds the lock."""
+        memory = self._session_memories[session_id]
+        transcript = self._session_metadata.get(session_id, {}).get('transcript') or ''
+        self._session_bytes[session_id] = len(transcript.encode('utf-8')) + sum(
+            len(str(message.content).encode('utf-8')) for message in memory.chat_memory.messages
         )
         
-        return {
-            'total_sessions': total_sessions,
-            'total_messages': total_messages,
-            'average_messages_per_session': total_messages / total_sessions if total_sessions > 0 else 0,
-            'active_session_ids': list(self._session_memories.keys())
-        }
+        if self.max_bytes <= 0:
+            return
+        total = sum(self._session_bytes.values())
+        for other_id in list(self._session_memories):
+            if total <= self.max_bytes:
+                break
+            if other_id == session_id:
+                continue
+            total -= self._session_bytes.get(other_id, 0)
+            self._remove(other_id)
+            self._evictions += 1
+            print(f"🗑️ Evicted least recently used session: {other_id}")
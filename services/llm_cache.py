@@ -0,0 +1,165 @@
+"""
+Persistent cache for LLM responses, stored in a local SQLite database.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import Config
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with TTL and size-based LRU eviction.
+
+    Keys combine the model name, the prompt-template version and a hash of
+    the whitespace-normalized prompt, so reformatting a prompt's indentation
+    still hits while changing a template (and bumping its version) misses.
+    """
+
+    def __init__(self, db_path: str = None, ttl_seconds: int = None, max_bytes: int = None):
+        self.db_path = Path(db_path or Config.LLM_CACHE_PATH)
+        self.ttl_seconds = ttl_seconds or Config.LLM_CACHE_TTL_SECONDS
+        self.max_bytes = max_bytes or Config.LLM_CACHE_MAX_BYTES
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, template_version: Any, prompt: str) -> str:
+        """
+        Build the cache key for a prompt.
+
+        Args:
+            model (str): Model name
+            template_version (Any): Version of the prompt templates
+            prompt (str): Rendered prompt text
+
+        Returns:
+            str: Hex cache key
+        """
+        normalized = _WHITESPACE.sub(' ', prompt).strip()
+        prompt_hash = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return f"{model}:v{template_version}:{prompt_hash}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Cache key from make_key()
+
+        Returns:
+            str or None: Cached response if present and not expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        """
+        Store a response and enforce the TTL and size budget.
+
+        Args:
+            key (str): Cache key from make_key()
+            model (str): Model that produced the response
+            response (str): Response text
+        """
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict[str, Any]: Hit/miss counters, entry count and stored bytes
+        """
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': entries,
+                'size_bytes': total,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+            }
+
+    def clear(self):
+        """Delete every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired rows, then least recently used rows over budget. Caller holds the lock."""
+        expired = self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.evictions += max(expired, 0)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.evictions += len(victims)
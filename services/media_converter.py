@@ -1,5 +1,6 @@
 import os
 import sys
+import tempfile
 from pathlib import Path
 try:
     from moviepy.editor import VideoFileClip
@@ -14,6 +15,28 @@ except ImportError:
         print("Warning: MoviePy not available. Video conversion features will be disabled.")
 
 from config import Config
+from utils import ffmpeg
+from utils.ffmpeg import FFmpegError
+from utils.media_probe import probe_media
+
+# Audio codecs the transcription API accepts as-is, with the container to copy them into
+STREAM_COPY_EXTENSIONS = {
+    'mp3': '.mp3',
+    'aac': '.m4a',
+    'opus': '.ogg',
+    'vorbis': '.ogg',
+    'flac': '.flac',
+    'pcm_s16le': '.wav',
+}
+
+
+# Container overhead and safety margin kept free when sizing the speech bitrate
+SPEECH_SIZE_MARGIN = 0.95
+
+
+class NoAudioStreamError(Exception):
+    """Raised when a video file has no audio track to extract."""
+
 
 class MediaConverter:
     """Service for converting video files to audio files."""
@@ -21,6 +44,152 @@ class MediaConverter:
     def __init__(self):
         Config.ensure_directories()
     
+    def extract_audio(self, video_path: str, output_path: str = None, timeout: float = None) -> str:
+        """
+        Extract the audio track of a video without decoding the video frames.
+
+        The audio stream is copied as-is when the transcriber accepts its codec
+        and re-encoded to MP3 otherwise. Falls back to MoviePy if ffmpeg is
+        unavailable or fails.
+
+        Args:
+            video_path (str): Path to the input video file.
+            output_path (str, optional): Output path; its extension is replaced to match
+                                         the audio codec. Defaults to OUTPUT_FOLDER/<stem>.<ext>.
+            timeout (float, optional): Seconds before ffmpeg is killed.
+
+        Returns:
+            str: Path to the extracted audio file.
+
+        Raises:
+            FileNotFoundError: If the input file doesn't exist.
+            NoAudioStreamError: If the video has no audio stream.
+            Exception: If extraction fails.
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video file not found at '{video_path}'")
+
+        if not self._use_ffmpeg():
+            return self.convert_mp4_to_mp3(video_path, self._with_suffix(video_path, output_path, '.mp3'))
+
+        try:
+            audio_stream = self._first_audio_stream(video_path)
+            extension = STREAM_COPY_EXTENSIONS.get(audio_stream['codec_name'])
+            if extension:
+                output_path = self._with_suffix(video_path, output_path, extension)
+                self._run_extraction(video_path, output_path, ['-c:a', 'copy'], timeout)
+                print(f"✅ Copied {audio_stream['codec_name']} audio stream to '{output_path}'")
+            else:
+                output_path = self._with_suffix(video_path, output_path, '.mp3')
+                self._run_extraction(video_path, output_path, ['-c:a', 'libmp3lame', '-q:a', '4'], timeout)
+                print(f"✅ Transcoded {audio_stream['codec_name']} audio to '{output_path}'")
+            return output_path
+        except NoAudioStreamError:
+            raise
+        except FFmpegError as e:
+            if not self._moviepy_fallback_allowed():
+                raise Exception(f"An error occurred during conversion: {e}")
+            print(f"⚠️  ffmpeg extraction failed, falling back to MoviePy: {e}")
+            return self._convert_with_moviepy(video_path, self._with_suffix(video_path, output_path, '.mp3'))
+    
+    def encode_for_transcription(self, media_path: str, output_path: str = None,
+                                 duration: float = None, codec: str = None,
+                                 max_bytes: int = None, timeout: float = None) -> str:
+        """
+        Encode the audio of a recording with a compact speech profile.
+
+        The audio is downmixed to mono and resampled to SPEECH_SAMPLE_RATE.
+        With Opus, the bitrate is chosen from the duration so the file fits
+        under ``max_bytes`` whenever the minimum speech bitrate allows it.
+        FLAC is lossless and cannot be sized, so oversized FLAC files are
+        left to the transcription chunker.
+
+        Args:
+            media_path (str): Path to the input audio or video file.
+            output_path (str, optional): Output path; its extension is replaced to match
+                                         the codec. Defaults to a new
+                                         OUTPUT_FOLDER/<stem>_speech_<random>.<ext>, so
+                                         concurrent jobs on uploads with the same name
+                                         don't share a file.
+            duration (float, optional): Duration in seconds if already probed.
+            codec (str, optional): 'opus' or 'flac'. Defaults to Config.SPEECH_CODEC.
+            max_bytes (int, optional): Target size ceiling. Defaults to Config.SPEECH_MAX_BYTES.
+            timeout (float, optional): Seconds before ffmpeg is killed.
+
+        Returns:
+            str: Path to the encoded audio file.
+
+        Raises:
+            FileNotFoundError: If the input file doesn't exist.
+            NoAudioStreamError: If the input has no audio stream.
+            Exception: If ffmpeg is unavailable or encoding fails.
+        """
+        if not os.path.exists(media_path):
+            raise FileNotFoundError(f"Media file not found at '{media_path}'")
+        if not self._use_ffmpeg():
+            raise Exception("ffmpeg not available. Cannot encode speech audio.")
+
+        codec = codec or Config.SPEECH_CODEC
+        if codec not in ('opus', 'flac'):
+            raise ValueError(f"Unsupported speech codec '{codec}'. Use 'opus' or 'flac'.")
+        max_bytes = max_bytes or Config.SPEECH_MAX_BYTES
+
+        audio_stream = self._first_audio_stream(media_path)
+        if duration is None:
+            duration = probe_media(media_path)['duration']
+
+        extension = '.ogg' if codec == 'opus' else '.flac'
+        if output_path is None:
+            Config.ensure_directories()
+            fd, output_path = tempfile.mkstemp(prefix=f"{Path(media_path).stem}_speech_",
+                                               suffix=extension, dir=str(Config.OUTPUT_FOLDER))
+            os.close(fd)
+        else:
+            output_path = self._with_suffix(media_path, output_path, extension)
+
+        if codec == 'opus':
+            kbps = self.speech_bitrate_kbps(duration, max_bytes)
+            codec_args = ['-c:a', 'libopus', '-b:a', f'{kbps}k', '-application', 'voip']
+            description = f"Opus {kbps} kb/s"
+        else:
+            codec_args = ['-c:a', 'flac', '-compression_level', '8']
+            description = "FLAC"
+
+        # bitexact keeps the output byte-identical for identical input, so the
+        # transcription cache still hits after re-encoding
+        try:
+            self._run_extraction(media_path, output_path, [
+                '-ac', '1', '-ar', str(Config.SPEECH_SAMPLE_RATE),
+                '-fflags', '+bitexact', '-flags:a', '+bitexact'
+            ] + codec_args, timeout)
+        except FFmpegError as e:
+            raise Exception(f"An error occurred during speech encoding: {e}")
+
+        size = os.path.getsize(output_path)
+        print(f"✅ Encoded {audio_stream['codec_name']} audio as mono "
+              f"{Config.SPEECH_SAMPLE_RATE // 1000} kHz {description}: "
+              f"{size / (1024 * 1024):.1f} MB")
+        if size > max_bytes:
+            print(f"⚠️  Speech audio is over {max_bytes / (1024 * 1024):.0f} MB and will be chunked")
+        return output_path
+    
+    @staticmethod
+    def speech_bitrate_kbps(duration: float, max_bytes: int) -> int:
+        """
+        Pick the highest speech bitrate that keeps the file under a size ceiling.
+
+        Args:
+            duration (float): Audio duration in seconds; None uses the maximum bitrate.
+            max_bytes (int): Target size ceiling.
+
+        Returns:
+            int: Bitrate in kb/s, clamped to the configured speech range.
+        """
+        if not duration:
+            return Config.SPEECH_MAX_BITRATE_KBPS
+        budget_kbps = int(max_bytes * 8 * SPEECH_SIZE_MARGIN / duration / 1000)
+        return max(Config.SPEECH_MIN_BITRATE_KBPS, min(Config.SPEECH_MAX_BITRATE_KBPS, budget_kbps))
+    
     def convert_mp4_to_mp3(self, mp4_file_path: str, mp3_file_path: str = None) -> str:
         """
         Converts an MP4 video file to an MP3 audio file.
@@ -37,9 +206,6 @@ class MediaConverter:
             FileNotFoundError: If the input MP4 file doesn't exist.
             Exception: If conversion fails.
         """
-        if not MOVIEPY_AVAILABLE:
-            raise Exception("MoviePy not available. Cannot convert video files.")
-            
         if not os.path.exists(mp4_file_path):
             raise FileNotFoundError(f"MP4 file not found at '{mp4_file_path}'")
 
@@ -48,12 +214,36 @@ class MediaConverter:
             input_path = Path(mp4_file_path)
             mp3_file_path = str(Config.OUTPUT_FOLDER / f"{input_path.stem}.mp3")
 
+        if self._use_ffmpeg():
+            try:
+                codec = self._first_audio_stream(mp4_file_path)['codec_name']
+                codec_args = ['-c:a', 'copy'] if codec == 'mp3' else ['-c:a', 'libmp3lame', '-q:a', '4']
+                self._run_extraction(mp4_file_path, mp3_file_path, codec_args)
+                print(f"Successfully converted '{mp4_file_path}' to '{mp3_file_path}'")
+                return mp3_file_path
+            except NoAudioStreamError:
+                raise
+            except FFmpegError as e:
+                if not self._moviepy_fallback_allowed():
+                    raise Exception(f"An error occurred during conversion: {e}")
+                print(f"⚠️  ffmpeg conversion failed, falling back to MoviePy: {e}")
+
+        return self._convert_with_moviepy(mp4_file_path, mp3_file_path)
+    
+    def _convert_with_moviepy(self, mp4_file_path: str, mp3_file_path: str) -> str:
+        """Decode and re-encode the audio through MoviePy."""
+        if not MOVIEPY_AVAILABLE:
+            raise Exception("MoviePy not available. Cannot convert video files.")
+
         try:
             # Load the video clip
             video_clip = VideoFileClip(mp4_file_path)
 
             # Extract the audio
             audio_clip = video_clip.audio
+            if audio_clip is None:
+                video_clip.close()
+                raise NoAudioStreamError(f"No audio stream found in '{mp4_file_path}'")
 
             # Write the audio to an MP3 file with error handling for different MoviePy versions
             try:
@@ -74,6 +264,8 @@ class MediaConverter:
             print(f"Successfully converted '{mp4_file_path}' to '{mp3_file_path}'")
             return mp3_file_path
 
+        except NoAudioStreamError:
+            raise
         except Exception as e:
             raise Exception(f"An error occurred during conversion: {e}")
     
@@ -88,18 +280,33 @@ class MediaConverter:
         Returns:
             str: Path to the converted audio file.
         """
-        if not MOVIEPY_AVAILABLE:
-            raise Exception("MoviePy not available. Cannot convert video files.")
-            
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found at '{video_path}'")
         
         input_path = Path(video_path)
         output_path = str(Config.OUTPUT_FOLDER / f"{input_path.stem}.{output_format}")
         
+        if self._use_ffmpeg():
+            try:
+                self._first_audio_stream(video_path)
+                self._run_extraction(video_path, output_path, [])
+                return output_path
+            except NoAudioStreamError:
+                raise
+            except FFmpegError as e:
+                if not self._moviepy_fallback_allowed():
+                    raise Exception(f"An error occurred during conversion: {e}")
+                print(f"⚠️  ffmpeg conversion failed, falling back to MoviePy: {e}")
+        
+        if not MOVIEPY_AVAILABLE:
+            raise Exception("MoviePy not available. Cannot convert video files.")
+        
         try:
             video_clip = VideoFileClip(video_path)
             audio_clip = video_clip.audio
+            if audio_clip is None:
+                video_clip.close()
+                raise NoAudioStreamError(f"No audio stream found in '{video_path}'")
             
             # Handle different MoviePy versions
             try:
@@ -115,6 +322,8 @@ class MediaConverter:
             
             return output_path
             
+        except NoAudioStreamError:
+            raise
         except Exception as e:
             raise Exception(f"An error occurred during conversion: {e}")
     
@@ -122,18 +331,46 @@ class MediaConverter:
         """
         Get information about a video file.
         
+        Uses a cached ffprobe/ffmpeg probe and only opens the file with MoviePy
+        when ffmpeg is unavailable.
+        
         Args:
             video_path (str): Path to the video file.
             
         Returns:
-            dict: Video information including duration, fps, size, etc.
+            dict: Video information including duration, fps, size, codecs,
+                  audio sample rate, channels and bitrate.
         """
-        if not MOVIEPY_AVAILABLE:
-            raise Exception("MoviePy not available. Cannot get video info.")
-            
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found at '{video_path}'")
         
+        if self._use_ffmpeg():
+            try:
+                info = probe_media(video_path)
+                video = info['video'] or {}
+                audio = info['audio'] or {}
+                return {
+                    'duration': info['duration'],
+                    'fps': video.get('fps'),
+                    'size': [video['width'], video['height']] if video.get('width') else None,
+                    'filename': info['filename'],
+                    'filesize': info['filesize'],
+                    'format': info['format_name'],
+                    'bit_rate': info['bit_rate'],
+                    'video_codec': video.get('codec_name'),
+                    'audio_codec': audio.get('codec_name'),
+                    'sample_rate': audio.get('sample_rate'),
+                    'channels': audio.get('channels'),
+                    'has_audio': bool(audio),
+                }
+            except FFmpegError as e:
+                if not self._moviepy_fallback_allowed():
+                    raise Exception(f"An error occurred while getting video info: {e}")
+                print(f"⚠️  ffmpeg probe failed, falling back to MoviePy: {e}")
+        
+        if not MOVIEPY_AVAILABLE:
+            raise Exception("MoviePy not available. Cannot get video info.")
+        
         try:
             video_clip = VideoFileClip(video_path)
             info = {
@@ -141,7 +378,8 @@ class MediaConverter:
                 'fps': video_clip.fps,
                 'size': video_clip.size,
                 'filename': Path(video_path).name,
-                'filesize': os.path.getsize(video_path)
+                'filesize': os.path.getsize(video_path),
+                'has_audio': video_clip.audio is not None
             }
             video_clip.close()
             return info
@@ -150,5 +388,35 @@ class MediaConverter:
             raise Exception(f"An error occurred while getting video info: {e}")
     
     def is_available(self) -> bool:
-        """Check if MoviePy is available for video processing."""
-        return MOVIEPY_AVAILABLE
+        """Check if ffmpeg or MoviePy is available for video processing."""
+        return self._use_ffmpeg() or MOVIEPY_AVAILABLE
+    
+    def _use_ffmpeg(self) -> bool:
+        """Whether the ffmpeg backend is enabled and installed."""
+        return Config.MEDIA_BACKEND != 'moviepy' and ffmpeg.is_available()
+    
+    def _moviepy_fallback_allowed(self) -> bool:
+        return Config.MEDIA_BACKEND != 'ffmpeg' and MOVIEPY_AVAILABLE
+    
+    def _first_audio_stream(self, video_path: str) -> dict:
+        """Return the first audio stream of the file, or raise NoAudioStreamError."""
+        info = probe_media(video_path)
+        if not info['audio']:
+            if not info['streams']:
+                raise FFmpegError(f"ffmpeg could not read streams from '{video_path}'")
+            raise NoAudioStreamError(f"No audio stream found in '{video_path}'")
+        return info['audio']
+    
+    def _run_extraction(self, video_path: str, output_path: str, codec_args: list, timeout: float = None):
+        """Demux the first audio stream into output_path, dropping video."""
+        ffmpeg.run_ffmpeg(
+            ['-y', '-i', video_path, '-vn', '-map', '0:a:0'] + codec_args + [output_path],
+            timeout=timeout
+        )
+    
+    @staticmethod
+    def _with_suffix(video_path: str, output_path: str, suffix: str) -> str:
+        """Resolve the output path, forcing the extension that matches the audio codec."""
+        if output_path is None:
+            return str(Config.OUTPUT_FOLDER / f"{Path(video_path).stem}{suffix}")
+        return str(Path(output_path).with_suffix(suffix))
@@ -0,0 +1,356 @@
+"""
+Client-side rate limiting and retry backoff for provider API calls.
+A process-wide limiter keeps Groq and Gemini calls within per-provider and
+per-model request and token budgets, and retries throttled or transient
+failures with jittered exponential backoff that honors Retry-After.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+# HTTP statuses worth retrying: throttling and transient server errors
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+# Exception class names for network failures that carry no status code
+RETRYABLE_ERROR_NAMES = {'APIConnectionError', 'APITimeoutError', 'ConnectError',
+                         'ReadTimeout', 'ServiceUnavailable', 'DeadlineExceeded'}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that hands out reservations instead of blocking.
+
+    A reservation may drive the balance negative; the caller then waits until
+    the debt would have been refilled, so concurrent callers queue fairly in
+    reservation order.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """
+        Take tokens from the bucket.
+
+        Args:
+            amount (float): Tokens to take
+
+        Returns:
+            float: Seconds to wait before the tokens may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def try_reserve(self, amount: float = 1.0) -> bool:
+        """
+        Take tokens only if they are available now, without going into debt.
+
+        Returns:
+            bool: Whether the tokens were taken
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._blocked_until > now or self._tokens < amount:
+                return False
+            self._tokens -= amount
+            return True
+
+    def refund(self, amount: float = 1.0):
+        """Return tokens taken by a reservation that was not used."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def block_for(self, seconds: float):
+        """Make every reservation wait at least this long (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """
+    Request and token budgets per provider and per model.
+
+    Budgets are requests and tokens per minute; 0 means unlimited. A call
+    reserves from its provider's buckets and, when the model has its own
+    budget, from the model's buckets too, then waits for the longest
+    reservation.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]] = None,
+                 max_retries: int = None, backoff_base: float = None,
+                 backoff_max: float = None):
+        self.limits = limits if limits is not None else _configured_limits()
+        self.max_retries = max_retries if max_retries is not None else Config.RATE_LIMIT_MAX_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else Config.RATE_LIMIT_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Config.RATE_LIMIT_BACKOFF_MAX
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, provider: str, model: str = None, tokens: int = 0) -> float:
+        """
+        Wait until a call fits the provider's and model's budgets.
+
+        Args:
+            provider (str): 'groq' or 'gemini'
+            model (str, optional): Model name, for per-model budgets
+            tokens (int): Estimated tokens the call consumes
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        wait = 0.0
+        for key in self._keys(provider, model):
+            requests, token_bucket = self._buckets_for(key)
+            if requests:
+                wait = max(wait, requests.reserve(1))
+            if token_bucket and tokens:
+                wait = max(wait, token_bucket.reserve(tokens))
+
+        stats = self._stats_for(provider, model)
+        with self._lock:
+            stats['requests'] += 1
+            stats['waiting'] += 1
+        if wait > 0:
+            time.sleep(wait)
+        with self._lock:
+            stats['waiting'] -= 1
+            stats['wait_seconds'] += wait
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], wait)
+        return wait
+
+    def try_acquire(self, provider: str, model: str = None, tokens: int = 0) -> bool:
+        """
+        Reserve budget for one call only if every bucket has room right now.
+
+        Used for optional extra requests such as hedges, which are skipped
+        rather than queued when the budget is spent.
+
+        Args:
+            provider (str): 'groq' or 'gemini'
+            model (str, optional): Model name, for per-model budgets
+            tokens (int): Estimated tokens the call consumes
+
+        Returns:
+            bool: Whether the call may go ahead
+        """
+        taken = []
+        for key in self._keys(provider, model):
+            requests, token_bucket = self._buckets_for(key)
+            for bucket, amount in ((requests, 1), (token_bucket, tokens)):
+                if not bucket or not amount:
+                    continue
+                if not bucket.try_reserve(amount):
+                    for reserved, reserved_amount in taken:
+                        reserved.refund(reserved_amount)
+                    return False
+                taken.append((bucket, amount))
+
+        stats = self._stats_for(provider, model)
+        with self._lock:
+            stats['requests'] += 1
+        return True
+
+    def call(self, provider: str, model: str, func: Callable[..., Any], *args,
+             tokens: int = 0, **kwargs) -> Any:
+        """
+        Run a provider call within budget, retrying throttled and transient failures.
+
+        Args:
+            provider (str): 'groq' or 'gemini'
+            model (str): Model name
+            func (Callable): The API call
+            tokens (int): Estimated tokens per attempt
+
+        Returns:
+            Any: The call's result
+
+        Raises:
+            Exception: The last error once retries are exhausted, or any
+                       non-retryable error immediately
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(provider, model, tokens)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                status = error_status(e)
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                retry_after = retry_after_seconds(e)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                stats = self._stats_for(provider, model)
+                with self._lock:
+                    stats['retries'] += 1
+                    if status == 429:
+                        stats['throttled'] += 1
+                if status == 429:
+                    # Hold back every caller of this provider, not just this thread
+                    for key in self._keys(provider, model):
+                        for bucket in self._buckets_for(key):
+                            if bucket:
+                                bucket.block_for(delay)
+                print(f"⚠️  {provider} call failed ({status or type(e).__name__}), "
+                      f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get per provider/model counters.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Requests, callers currently waiting,
+                                         total and max queue wait, average wait,
+                                         retries and 429 responses
+        """
+        with self._lock:
+            return {
+                key: {**stats,
+                      'wait_seconds': round(stats['wait_seconds'], 3),
+                      'max_wait_seconds': round(stats['max_wait_seconds'], 3),
+                      'avg_wait_seconds': round(stats['wait_seconds'] / stats['requests'], 3)
+                      if stats['requests'] else 0.0}
+                for key, stats in self._stats.items()
+            }
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _keys(self, provider: str, model: Optional[str]) -> List[str]:
+        keys = [provider]
+        if model and f"{provider}:{model}" in self.limits:
+            keys.append(f"{provider}:{model}")
+        return keys
+
+    def _buckets_for(self, key: str) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        with self._lock:
+            buckets = self._buckets.get(key)
+            if buckets is None:
+                rpm, tpm = self.limits.get(key, (0, 0))
+                buckets = (TokenBucket(rpm) if rpm else None, TokenBucket(tpm) if tpm else None)
+                self._buckets[key] = buckets
+            return buckets
+
+    def _stats_for(self, provider: str, model: Optional[str]) -> Dict[str, float]:
+        key = f"{provider}:{model}" if model else provider
+        with self._lock:
+            return self._stats.setdefault(key, {
+                'requests': 0, 'waiting': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0,
+                'retries': 0, 'throttled': 0,
+            })
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of a Groq (status_code) or Google API (code) error, if any."""
+    for attribute in ('status_code', 'code'):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an error is throttling or a transient failure worth retrying."""
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the server's requested delay from a Retry-After header.
+
+    Returns:
+        float or None: Seconds to wait, if the error carries a usable header
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _configured_limits() -> Dict[str, Tuple[float, float]]:
+    """Budgets from Config; RATE_LIMIT_MODEL_OVERRIDES is 'provider:model=rpm:tpm,...'."""
+    limits = {
+        'groq': (Config.GROQ_REQUESTS_PER_MINUTE, Config.GROQ_TOKENS_PER_MINUTE),
+        'gemini': (Config.GEMINI_REQUESTS_PER_MINUTE, Config.GEMINI_TOKENS_PER_MINUTE),
+    }
+    for item in filter(None, (part.strip() for part in Config.RATE_LIMIT_MODEL_OVERRIDES.split(','))):
+        try:
+            key, budget = item.split('=', 1)
+            rpm, tpm = budget.split(':', 1)
+            limits[key.strip()] = (float(rpm), float(tpm))
+        except ValueError:
+            print(f"⚠️  Ignoring malformed rate limit override '{item}'")
+    return limits
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter shared by all provider clients."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def try_acquire(provider: str, model: str, tokens: int = 0) -> bool:
+    """
+    Reserve budget for an optional extra call on the shared limiter without waiting.
+
+    Always True when RATE_LIMIT_ENABLED is false.
+    """
+    if not Config.RATE_LIMIT_ENABLED:
+        return True
+    return get_rate_limiter().try_acquire(provider, model, tokens)
+
+
+def rate_limited_call(provider: str, model: str, func: Callable[..., Any], *args,
+                      tokens: int = 0, **kwargs) -> Any:
+    """
+    Run a provider API call through the shared limiter.
+
+    Calls go straight through when RATE_LIMIT_ENABLED is false.
+    """
+    if not Config.RATE_LIMIT_ENABLED:
+        return func(*args, **kwargs)
+    return get_rate_limiter().call(provider, model, func, *args, tokens=tokens, **kwargs)
@@ -0,0 +1,240 @@
+"""
+Energy-based voice activity detection that removes long silences before
+transcription, with a time map back to the original recording.
+"""
+
+import bisect
+import os
+import tempfile
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from config import Config
+from services.transcript_chunker import segment_value
+from utils.ffmpeg import iter_pcm
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+# Quietest frame level treated as speech, relative to the loud (95th percentile) frames
+MAX_DYNAMIC_RANGE_DB = 30.0
+
+
+class TimeMap:
+    """
+    Maps timestamps in silence-stripped audio back to the original recording.
+
+    Holds the kept spans of the original audio in order; position ``t`` in the
+    stripped audio falls in the span whose cumulative offset precedes it.
+    """
+
+    def __init__(self, spans: List[Tuple[float, float]]):
+        self.spans = [(float(start), float(end)) for start, end in spans]
+        self._offsets = []
+        total = 0.0
+        for start, end in self.spans:
+            self._offsets.append(total)
+            total += end - start
+        self.duration = total
+
+    def to_original(self, t: float) -> float:
+        """
+        Convert a time in the stripped audio to original recording time.
+
+        Args:
+            t (float): Seconds into the stripped audio.
+
+        Returns:
+            float: Seconds into the original recording.
+        """
+        if not self.spans:
+            return t
+        index = max(bisect.bisect_right(self._offsets, t) - 1, 0)
+        start, end = self.spans[index]
+        return min(start + (t - self._offsets[index]), end)
+
+    def remap_segments(self, segments: Optional[List[Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Shift transcription segments (and their words) to original recording time.
+
+        Args:
+            segments (List, optional): Segments with 'start' and 'end' in stripped time.
+
+        Returns:
+            List[Dict[str, Any]] or None: Copies of the segments in original time.
+        """
+        if not segments:
+            return segments
+        remapped = []
+        for seg in segments:
+            item = dict(seg) if isinstance(seg, dict) else {'text': segment_value(seg, 'text', '')}
+            item['start'] = round(self.to_original(float(segment_value(seg, 'start', 0.0))), 3)
+            item['end'] = round(self.to_original(float(segment_value(seg, 'end', 0.0))), 3)
+            if isinstance(item.get('words'), list):
+                item['words'] = [
+                    dict(word, start=round(self.to_original(float(word.get('start', 0.0))), 3),
+                         end=round(self.to_original(float(word.get('end', 0.0))), 3))
+                    for word in item['words'] if isinstance(word, dict)
+                ]
+            remapped.append(item)
+        return remapped
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the map to a JSON-serializable dictionary."""
+        return {'spans': [list(span) for span in self.spans]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TimeMap':
+        """Create a map from to_dict() output."""
+        return cls([tuple(span) for span in data.get('spans', [])])
+
+
+class SilenceStripper:
+    """Service that removes long silent stretches from recordings."""
+
+    def __init__(self, frame_ms: int = None, threshold_db: float = None,
+                 noise_margin_db: float = None, min_silence: float = None,
+                 keep_silence: float = None):
+        self.frame_ms = frame_ms or Config.VAD_FRAME_MS
+        self.threshold_db = threshold_db if threshold_db is not None else Config.VAD_THRESHOLD_DB
+        self.noise_margin_db = noise_margin_db if noise_margin_db is not None else Config.VAD_NOISE_MARGIN_DB
+        self.min_silence = min_silence if min_silence is not None else Config.VAD_MIN_SILENCE_SECONDS
+        self.keep_silence = keep_silence if keep_silence is not None else Config.VAD_KEEP_SILENCE_SECONDS
+
+    def is_available(self) -> bool:
+        """Check if NumPy is available for silence detection."""
+        return NUMPY_AVAILABLE
+
+    def strip(self, media_path: str, output_path: str = None) -> Dict[str, Any]:
+        """
+        Remove silences longer than ``min_silence`` from a recording.
+
+        The audio is decoded to 16 kHz mono PCM in blocks and spooled to a
+        temporary file while per-frame energy is computed. Each removed silence
+        keeps ``keep_silence`` seconds on both sides so word edges survive.
+
+        Args:
+            media_path (str): Path to the input audio or video file.
+            output_path (str, optional): Path for the stripped WAV file. Defaults to a
+                                         new OUTPUT_FOLDER/<stem>_voiced_<random>.wav,
+                                         so concurrent uploads with the same name
+                                         don't share a file.
+
+        Returns:
+            Dict[str, Any]: 'audio_file' (stripped WAV), 'time_map' (TimeMap),
+                            'original_duration', 'processed_duration' and
+                            'seconds_removed'.
+
+        Raises:
+            FileNotFoundError: If the input file doesn't exist.
+            Exception: If NumPy is unavailable or decoding fails.
+        """
+        if not NUMPY_AVAILABLE:
+            raise Exception("NumPy not available. Cannot detect silence.")
+        if not os.path.exists(media_path):
+            raise FileNotFoundError(f"Media file not found at '{media_path}'")
+
+        Config.ensure_directories()
+        if output_path is None:
+            fd, output_path = tempfile.mkstemp(prefix=f"{Path(media_path).stem}_voiced_",
+                                               suffix='.wav', dir=str(Config.OUTPUT_FOLDER))
+            os.close(fd)
+
+        frame_samples = SAMPLE_RATE * self.frame_ms // 1000
+        frame_bytes = frame_samples * BYTES_PER_SAMPLE
+        block_bytes = frame_bytes * 1000
+
+        fd, raw_path = tempfile.mkstemp(suffix='.pcm', dir=str(Config.TEMP_FOLDER))
+        try:
+            energies = []
+            total_samples = 0
+            with os.fdopen(fd, 'wb') as raw:
+                for block in iter_pcm(media_path, SAMPLE_RATE, block_bytes):
+                    raw.write(block)
+                    samples = np.frombuffer(block[:len(block) - len(block) % BYTES_PER_SAMPLE], dtype='<i2')
+                    total_samples += len(samples)
+                    energies.append(self._frame_energies(samples, frame_samples))
+
+            if total_samples == 0:
+                raise Exception(f"No audio decoded from '{media_path}'")
+
+            energy_db = np.concatenate(energies)
+            spans = self._speech_spans(energy_db, total_samples / SAMPLE_RATE)
+
+            pcm = np.memmap(raw_path, dtype='<i2', mode='r', shape=(total_samples,))
+            with wave.open(output_path, 'wb') as out:
+                out.setnchannels(1)
+                out.setsampwidth(BYTES_PER_SAMPLE)
+                out.setframerate(SAMPLE_RATE)
+                for start, end in spans:
+                    out.writeframes(pcm[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)].tobytes())
+            del pcm
+        finally:
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+
+        time_map = TimeMap(spans)
+        original = total_samples / SAMPLE_RATE
+        removed = round(original - time_map.duration, 3)
+        print(f"✂️  Removed {removed:.1f}s of silence ({removed / original:.0%} of the recording)")
+        return {
+            'audio_file': output_path,
+            'time_map': time_map,
+            'original_duration': round(original, 3),
+            'processed_duration': round(time_map.duration, 3),
+            'seconds_removed': removed,
+        }
+
+    @staticmethod
+    def _frame_energies(samples: 'np.ndarray', frame_samples: int) -> 'np.ndarray':
+        """Per-frame RMS level in dBFS; a trailing partial frame counts as one frame."""
+        count = -(-len(samples) // frame_samples)
+        padded = np.zeros(count * frame_samples, dtype=np.float32)
+        padded[:len(samples)] = samples
+        frames = padded.reshape(count, frame_samples) / 32768.0
+        power = np.mean(frames * frames, axis=1)
+        return 10.0 * np.log10(power + 1e-10)
+
+    def _speech_spans(self, energy_db: 'np.ndarray', duration: float) -> List[Tuple[float, float]]:
+        """
+        Turn frame energies into the spans of audio to keep.
+
+        The threshold adapts to the recording: it sits ``noise_margin_db`` above
+        the noise floor (5th percentile) but never below ``threshold_db`` and
+        never more than MAX_DYNAMIC_RANGE_DB under the loud frames.
+        """
+        frame_seconds = self.frame_ms / 1000
+        noise_floor = float(np.percentile(energy_db, 5))
+        loud = float(np.percentile(energy_db, 95))
+        threshold = min(max(self.threshold_db, noise_floor + self.noise_margin_db),
+                        loud - MAX_DYNAMIC_RANGE_DB)
+
+        silent = energy_db < threshold
+        # Boundaries of runs of silent frames
+        edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+        long_runs = (run_ends - run_starts) * frame_seconds >= self.min_silence
+
+        spans = []
+        cursor = 0.0
+        for start, end in zip(run_starts[long_runs] * frame_seconds, run_ends[long_runs] * frame_seconds):
+            cut_start = start + self.keep_silence if start > 0 else 0.0
+            cut_end = min(end, duration) - self.keep_silence if end < duration else duration
+            if cut_end <= cut_start:
+                continue
+            if cut_start > cursor:
+                spans.append((cursor, cut_start))
+            cursor = cut_end
+        if cursor < duration:
+            spans.append((cursor, duration))
+        if not spans:
+            spans = [(0.0, duration)]
+        return [(round(start, 3), round(end, 3)) for start, end in spans]
@@ -1,19 +1,218 @@
-import google.generativeai as genai
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
 from config import Config
+from services.client_registry import get_client_registry
+from services.llm_cache import LLMResponseCache
+from services.rate_limiter import is_retryable, rate_limited_call, try_acquire
+from services.transcript_chunker import CHARS_PER_TOKEN, chunk_transcript, estimate_tokens, format_timestamp
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.hedging import HedgedCaller
+from utils.single_flight import SingleFlight
+
+# Version of the prompt templates in this module. Bump it whenever a template
+# changes so responses cached for the old wording are not reused.
+PROMPT_TEMPLATE_VERSION = 1
+
+# Per-section prompts in the order the sections appear in the minutes
+SECTION_PROMPTS = [
+    ("Executive Summary", """
+            Please provide a concise executive summary of the following meeting transcript.
+            Focus on the main topics discussed and overall outcomes.
+            Keep the response professional and factual.
+            
+            Transcript:
+            {transcript}
+            
+            Provide a 2-3 paragraph executive summary:
+            """),
+    ("Agenda & Timeline", """
+            Based on the following meeting transcript, extract and organize the agenda items and timeline.
+            List the main topics discussed in chronological order.
+            
+            Transcript:
+            {transcript}
+            
+            Provide a structured agenda/timeline:
+            """),
+    ("Key Speaker Points", """
+            From the following meeting transcript, identify key speakers and their main contributions.
+            Summarize the important points made by each speaker.
+            
+            Transcript:
+            {transcript}
+            
+            Provide key speaker points:
+            """),
+    ("Decisions Made", """
+            Extract all decisions that were made during this meeting from the transcript.
+            List them clearly with any relevant context.
+            
+            Transcript:
+            {transcript}
+            
+            List all decisions made:
+            """),
+    ("Action Items", """
+            Identify all action items assigned during this meeting from the transcript.
+            Include who is responsible for each action and any deadlines mentioned.
+            
+            Transcript:
+            {transcript}
+            
+            List all action items:
+            """),
+]
+
+PARTICIPANTS_KEY = "Participants"
+PARTICIPANTS_PROMPT = """
+        From the following meeting transcript, identify and list all participants/speakers.
+        
+        Transcript:
+        {transcript}
+        
+        Provide a list of participants:
+        """
+FALLBACK_PARTICIPANTS = "Participants could not be identified automatically. Please refer to the full transcript."
+
+# Keys expected in the single-call JSON response
+STRUCTURED_SUMMARY_KEYS = [name for name, _ in SECTION_PROMPTS] + [PARTICIPANTS_KEY]
+STRUCTURED_SUMMARY_PROMPT = """
+        Read the following meeting transcript and write the minutes of the meeting.
+        
+        Respond with a single JSON object and nothing else. Use exactly these keys,
+        each holding a plain-text string:
+        - "Executive Summary": a concise 2-3 paragraph summary of the main topics and outcomes
+        - "Agenda & Timeline": the agenda items and topics in chronological order
+        - "Key Speaker Points": the key speakers and their main contributions
+        - "Decisions Made": every decision made, with relevant context
+        - "Action Items": every action item with its owner and any deadline
+        - "Participants": all participants/speakers, comma-separated
+        
+        Transcript:
+        {transcript}
+        """
+
+# Map step of map-reduce summarization: condense one transcript chunk into notes.
+# Bump CHUNK_NOTES_PROMPT_VERSION whenever the prompt changes so cached notes are not reused.
+CHUNK_NOTES_PROMPT_VERSION = 1
+CHUNK_NOTES_PROMPT = """
+        The following is part {part} of {total} of a long meeting transcript{timespan}.
+        Write detailed notes for this part only, in chronological order. Keep every
+        topic discussed, who said what (with speaker names), decisions made, and action
+        items with owners and deadlines. Do not add anything that is not in the text.
+        
+        Transcript part:
+        {transcript}
+        
+        Notes:
+        """
+
+# Rolling summary of older chat turns, extended each time turns leave the prompt window
+CONVERSATION_SUMMARY_PROMPT = """
+        You are maintaining a running summary of a conversation between a user and a
+        meeting assistant. Update the summary with the new turns below. Keep every
+        decision, fact, name, number and open question the user may refer back to,
+        drop small talk, and keep it under {max_words} words.
+        
+        Current summary:
+        {summary}
+        
+        New turns:
+        {turns}
+        
+        Updated summary:
+        """
+
+# Sections whose fallback text lives under a different name in generate_fallback_summary()
+FALLBACK_SECTION_ALIASES = {
+    "Key Speaker Points": "Key Points",
+}
+
+# Identical prompts and summaries requested concurrently share one execution
+_in_flight = SingleFlight()
+
+# Gemini health is shared by every caller: once it keeps failing with
+# throttling, timeouts or server errors, calls fail fast to the fallbacks
+_breaker = CircuitBreaker('Gemini', Config.LLM_CIRCUIT_FAILURE_THRESHOLD,
+                          Config.LLM_CIRCUIT_RECOVERY_SECONDS, is_failure=is_retryable)
+_hedger = HedgedCaller(percentile=Config.LLM_HEDGE_PERCENTILE,
+                       min_samples=Config.LLM_HEDGE_MIN_SAMPLES,
+                       max_workers=Config.LLM_HEDGE_MAX_WORKERS)
 
 class SummarizationService:
     """Service for generating meeting summaries using Gemini API."""
     
     def __init__(self):
         Config.validate_config()
-        genai.configure(api_key=Config.GEMINI_API_KEY)
         self.model = Config.GEMINI_MODEL
+        self._executor = ThreadPoolExecutor(max_workers=Config.SUMMARY_MAX_WORKERS,
+                                            thread_name_prefix='summary')
+        # Per-chunk notes keyed by chunk content, so re-runs only pay for changed chunks
+        self._chunk_notes_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._chunk_cache_lock = threading.Lock()
+        self.cache = LLMResponseCache() if Config.LLM_CACHE_ENABLED else None
     
-    def _gpt(self, prompt: str) -> str:
-        """Send prompt to Gemini and return plain-text answer."""
+    def _gpt(self, prompt: str, use_cache: bool = True) -> str:
+        """
+        Send prompt to Gemini and return plain-text answer.
+        
+        Args:
+            prompt (str): Prompt text.
+            use_cache (bool): Serve and store the answer in the response cache.
+                              Pass False for prompts that must stay fresh (e.g. chat).
+        """
+        if not (self.cache and use_cache):
+            return self._generate(prompt)
+        
+        key = LLMResponseCache.make_key(self.model, PROMPT_TEMPLATE_VERSION, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        return _in_flight.do(key, self._generate_and_store, key, prompt)
+    
+    def _generate_and_store(self, key: str, prompt: str) -> str:
+        """Call Gemini and store the answer in the response cache."""
+        text = self._generate(prompt)
+        self.cache.put(key, self.model, text)
+        return text
+    
+    def get_cache_stats(self) -> dict:
+        """
+        Get LLM response cache statistics.
+        
+        Returns:
+            dict: Hit/miss counters and cache size, or {'enabled': False}, plus
+                  'in_flight' de-duplication counters.
+        """
+        if not self.cache:
+            return {'enabled': False, 'in_flight': _in_flight.get_stats()}
+        return {'enabled': True, **self.cache.get_stats(), 'in_flight': _in_flight.get_stats()}
+    
+    def get_health_stats(self) -> dict:
+        """
+        Get circuit breaker and request hedging statistics for Gemini.
+        
+        Returns:
+            dict: 'circuit' breaker state and counters, 'hedging' counters and
+                  the current hedge delay.
+        """
+        return {
+            'circuit': {'enabled': Config.LLM_CIRCUIT_BREAKER_ENABLED, **_breaker.get_stats()},
+            'hedging': {'enabled': Config.LLM_HEDGING_ENABLED, **_hedger.get_stats()},
+        }
+    
+    def _generate(self, prompt: str) -> str:
+        """Call Gemini for a prompt, bypassing the response cache."""
         try:
-            model = genai.GenerativeModel(self.model)
-            response = model.generate_content(prompt)
+            model = get_client_registry().gemini_model(self.model)
+            response = self._call_gemini(model, prompt)
             
             # Check if response has valid content
             if not hasattr(response, 'text') or not response.text:
@@ -29,92 +228,470 @@ class SummarizationService:
                 raise Exception("Gemini returned empty response")
             
             return response.text.strip()
+        except CircuitOpenError:
+            raise
         except Exception as e:
             if "finish_reason" in str(e) and "8" in str(e):
                 raise Exception(f"Content blocked by Gemini safety filters. Please try with different meeting content.")
-            raise Exception(f"Error generating content with Gemini: {e}")
+            raise Exception(f"Error generating content with Gemini: {e}") from e
     
-    def generate_meeting_summary(self, transcript: str) -> dict:
+    def _call_gemini(self, model: Any, prompt: str) -> Any:
         """
-        Generate a comprehensive meeting summary from transcript.
+        Send one generate_content request through the circuit breaker and the
+        rate limiter.
+        
+        Each attempt the limiter lets through is hedged on its own when
+        hedging is enabled, so throttling waits and retry backoff never
+        trigger a hedge or count toward its latency percentile. A hedge is a
+        second request, so it must reserve its own budget without waiting and
+        is skipped when the limiter has no room.
+        
+        Raises:
+            CircuitOpenError: If Gemini is failing and the circuit is open.
+        """
+        tokens = estimate_tokens(prompt)
+        
+        def attempt(prompt):
+            if Config.LLM_HEDGING_ENABLED:
+                return _hedger.call(model.generate_content, prompt,
+                                    hedge_permit=lambda: try_acquire('gemini', self.model, tokens))
+            return model.generate_content(prompt)
+        
+        def request():
+            return rate_limited_call('gemini', self.model, attempt, prompt, tokens=tokens)
+        
+        if Config.LLM_CIRCUIT_BREAKER_ENABLED:
+            return _breaker.call(request)
+        return request()
+    
+    def stream_generate(self, prompt: str) -> Iterator[str]:
+        """
+        Ask Gemini for a streamed answer, bypassing the response cache.
+        
+        The request is sent before this returns, so failures to start the
+        stream (open circuit, throttling, bad request) are raised here rather
+        than from the iterator.
         
         Args:
-            transcript (str): The meeting transcript text.
+            prompt (str): Prompt text.
             
         Returns:
-            dict: Dictionary containing different sections of the meeting summary.
-        """
-        try:
-            sections = {}
-            
-            # Executive Summary
-            summary_prompt = f"""
-            Please provide a concise executive summary of the following meeting transcript.
-            Focus on the main topics discussed and overall outcomes.
-            Keep the response professional and factual.
-            
-            Transcript:
-            {transcript[:2000]}...
-            
-            Provide a 2-3 paragraph executive summary:
-            """
-            sections["Executive Summary"] = self._gpt(summary_prompt)
-            
-            # Meeting Agenda & Timeline
-            agenda_prompt = f"""
-            Based on the following meeting transcript, extract and organize the agenda items and timeline.
-            List the main topics discussed in chronological order.
+            Iterator[str]: Text fragments of the answer, in order.
             
-            Transcript:
-            {transcript[:2000]}...
-            
-            Provide a structured agenda/timeline:
-            """
-            sections["Agenda & Timeline"] = self._gpt(agenda_prompt)
+        Raises:
+            CircuitOpenError: If Gemini is failing and the circuit is open.
+        """
+        model = get_client_registry().gemini_model(self.model)
+        
+        def open_stream():
+            return rate_limited_call('gemini', self.model, model.generate_content, prompt,
+                                     tokens=estimate_tokens(prompt), stream=True)
+        
+        if Config.LLM_CIRCUIT_BREAKER_ENABLED:
+            response = _breaker.call(open_stream)
+        else:
+            response = open_stream()
+        return self._stream_text(response)
+    
+    def _stream_text(self, response: Any) -> Iterator[str]:
+        """Yield the text of each chunk of a streamed Gemini response."""
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # No text parts: the stream was stopped, e.g. by the safety filters
+                raise Exception("Gemini stopped the response early, possibly due to its safety filters.")
+            if text:
+                yield text
+    
+    def _generate_section(self, section: str, prompt: str) -> str:
+        """
+        Generate one summary section, retrying transient failures.
+        
+        Throttling and transient provider errors are already retried by the
+        rate limiter, so they are only retried here when it is disabled.
+        
+        Args:
+            section (str): Section name, used for logging.
+            prompt (str): Fully rendered prompt for the section.
             
-            # Key Speaker Points
-            speakers_prompt = f"""
-            From the following meeting transcript, identify key speakers and their main contributions.
-            Summarize the important points made by each speaker.
+        Returns:
+            str: Generated section text.
             
-            Transcript:
-            {transcript[:2000]}...
+        Raises:
+            Exception: If every attempt fails.
+        """
+        attempts = Config.SUMMARY_SECTION_RETRIES + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                return self._gpt(prompt)
+            except Exception as e:
+                # Safety blocks are deterministic, an open circuit means the
+                # provider is down and the limiter has already spent its retries
+                # on retryable errors; retrying any of them only delays the fallback
+                retried_by_limiter = Config.RATE_LIMIT_ENABLED and is_retryable(e.__cause__ or e)
+                if (attempt == attempts or "safety filters" in str(e)
+                        or isinstance(e, CircuitOpenError) or retried_by_limiter):
+                    raise
+                delay = Config.SUMMARY_RETRY_BACKOFF * (2 ** (attempt - 1))
+                print(f"⚠️  {section} failed (attempt {attempt}/{attempts}): {e}. Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+    
+    def _run_prompts(self, prompts: List[Tuple[str, str]], concurrent: bool = None) -> Dict[str, Any]:
+        """
+        Run named prompts, optionally in parallel, preserving their order.
+        
+        Args:
+            prompts (List[Tuple[str, str]]): (name, prompt) pairs.
+            concurrent (bool, optional): Use the thread pool. Defaults to Config.SUMMARY_CONCURRENT.
             
-            Provide key speaker points:
-            """
-            sections["Key Speaker Points"] = self._gpt(speakers_prompt)
+        Returns:
+            Dict[str, Any]: Maps each name to its text, or to the exception that
+                            made it fail. Keys follow the input order.
+        """
+        if concurrent is None:
+            concurrent = Config.SUMMARY_CONCURRENT
+        
+        outcomes = {}
+        if concurrent and len(prompts) > 1:
+            futures = [
+                (name, self._executor.submit(self._generate_section, name, prompt))
+                for name, prompt in prompts
+            ]
+            for name, future in futures:
+                try:
+                    outcomes[name] = future.result()
+                except Exception as e:
+                    outcomes[name] = e
+        else:
+            for name, prompt in prompts:
+                try:
+                    outcomes[name] = self._generate_section(name, prompt)
+                except Exception as e:
+                    outcomes[name] = e
+        return outcomes
+    
+    def _section_prompts(self, transcript: str, sections: List[str] = None) -> List[Tuple[str, str]]:
+        """
+        Render the per-section prompts for a transcript, in section order.
+        
+        Args:
+            transcript (str): The meeting transcript text.
+            sections (List[str], optional): Only render these sections. Defaults to all.
+        """
+        return [
+            (name, template.format(transcript=transcript))
+            for name, template in SECTION_PROMPTS
+            if sections is None or name in sections
+        ]
+    
+    def _collect_sections(self, outcomes: Dict[str, Any], transcript: str) -> dict:
+        """
+        Turn prompt outcomes into summary sections, falling back per section.
+        
+        If every section failed the provider is most likely unavailable, so the
+        complete fallback summary is returned instead.
+        """
+        failed = [name for name, outcome in outcomes.items() if isinstance(outcome, Exception)]
+        if failed and len(failed) == len(outcomes):
+            print(f"⚠️  Gemini AI failed to generate summary: {outcomes[failed[0]]}")
+            print("🔄 Using fallback summary generation...")
+            return self.generate_fallback_summary(transcript)
+        
+        sections = {}
+        for name, outcome in outcomes.items():
+            if isinstance(outcome, Exception):
+                print(f"⚠️  Gemini AI failed to generate '{name}': {outcome}")
+                sections[name] = self._fallback_section(name, transcript)
+            else:
+                sections[name] = outcome
+        return sections
+    
+    def _choose_mode(self, transcript: str) -> str:
+        """
+        Pick the summary strategy for a transcript.
+        
+        Returns:
+            str: 'single' for one structured JSON call, 'fanout' for per-section
+                 prompts, or 'mapreduce' when the transcript exceeds the direct budget.
+        """
+        mode = Config.SUMMARY_MODE
+        if mode in ('single', 'fanout', 'mapreduce'):
+            return mode
+        if len(transcript) <= Config.SUMMARY_SINGLE_CALL_MAX_CHARS:
+            return 'single'
+        if estimate_tokens(transcript) <= Config.SUMMARY_DIRECT_MAX_TOKENS:
+            return 'fanout'
+        return 'mapreduce'
+    
+    def _fan_out(self, transcript: str, concurrent: bool = None,
+                 include_participants: bool = True,
+                 source_transcript: str = None) -> Tuple[dict, str]:
+        """
+        Generate the summary with one prompt per section.
+        
+        Args:
+            transcript (str): The meeting transcript text (or condensed notes).
+            concurrent (bool, optional): Run prompts in parallel.
+            include_participants (bool): Also extract the participant list.
+            source_transcript (str, optional): Original transcript to base fallback
+                                               sections on, if different.
             
-            # Decisions Made
-            decisions_prompt = f"""
-            Extract all decisions that were made during this meeting from the transcript.
-            List them clearly with any relevant context.
+        Returns:
+            Tuple[dict, str]: Summary sections and participants (None if not requested).
+        """
+        prompts = self._section_prompts(transcript)
+        if include_participants:
+            prompts.append((PARTICIPANTS_KEY, PARTICIPANTS_PROMPT.format(transcript=transcript)))
+        
+        outcomes = self._run_prompts(prompts, concurrent)
+        participants = outcomes.pop(PARTICIPANTS_KEY, None)
+        if isinstance(participants, Exception):
+            print(f"⚠️  Gemini AI failed to extract participants: {participants}")
+            participants = FALLBACK_PARTICIPANTS
+        
+        return self._collect_sections(outcomes, source_transcript or transcript), participants
+    
+    def generate_meeting_summary(self, transcript: str, concurrent: bool = None,
+                                 mode: str = None) -> dict:
+        """
+        Generate a comprehensive meeting summary from transcript.
+        
+        Args:
+            transcript (str): The meeting transcript text.
+            concurrent (bool, optional): Generate sections in parallel.
+                                         Defaults to Config.SUMMARY_CONCURRENT.
+            mode (str, optional): 'single', 'fanout' or 'mapreduce'. Chosen from
+                                  the transcript size by default.
             
-            Transcript:
-            {transcript[:2000]}...
+        Returns:
+            dict: Dictionary containing different sections of the meeting summary.
+        """
+        mode = mode or self._choose_mode(transcript)
+        if mode == 'single':
+            return self.generate_structured_summary(transcript, concurrent)[0]
+        if mode == 'mapreduce':
+            return self.generate_map_reduce_summary(transcript, concurrent, include_participants=False)[0]
+        return self._fan_out(transcript, concurrent, include_participants=False)[0]
+    
+    def summarize_meeting(self, transcript: str, concurrent: bool = None,
+                          mode: str = None, segments: List[Any] = None) -> Tuple[dict, str]:
+        """
+        Generate the summary sections and the participant list together.
+        
+        Short transcripts are summarized with a single structured call; longer
+        ones fan out to independent per-section prompts, which in concurrent
+        mode cost roughly one model round trip instead of six. Transcripts over
+        the direct token budget are condensed chunk by chunk first (map-reduce).
+        
+        Args:
+            transcript (str): The meeting transcript text.
+            concurrent (bool, optional): Run prompts in parallel.
+                                         Defaults to Config.SUMMARY_CONCURRENT.
+            mode (str, optional): 'single', 'fanout' or 'mapreduce'. Chosen from
+                                  the transcript size by default.
+            segments (List, optional): Transcription segments, used to chunk long
+                                       transcripts on segment boundaries.
             
-            List all decisions made:
-            """
-            sections["Decisions Made"] = self._gpt(decisions_prompt)
+        Returns:
+            Tuple[dict, str]: Summary sections and the list of participants.
+        """
+        mode = mode or self._choose_mode(transcript)
+        hasher = hashlib.sha256(transcript.encode('utf-8'))
+        if segments:
+            hasher.update(json.dumps(segments, sort_keys=True, default=str).encode('utf-8'))
+        key = f"summary:{self.model}:{mode}:{hasher.hexdigest()}"
+        # A concurrent request for the same transcript waits for this one's result
+        return _in_flight.do(key, self._summarize_with_mode, transcript, concurrent, mode, segments)
+    
+    def _summarize_with_mode(self, transcript: str, concurrent: Optional[bool], mode: str,
+                             segments: Optional[List[Any]]) -> Tuple[dict, str]:
+        """summarize_meeting() for an already chosen mode."""
+        if mode == 'single':
+            return self.generate_structured_summary(transcript, concurrent)
+        if mode == 'mapreduce':
+            return self.generate_map_reduce_summary(transcript, concurrent, segments=segments)
+        return self._fan_out(transcript, concurrent)
+    
+    def generate_map_reduce_summary(self, transcript: str, concurrent: bool = None,
+                                    include_participants: bool = True,
+                                    segments: List[Any] = None) -> Tuple[dict, Optional[str]]:
+        """
+        Summarize a long transcript by condensing chunks first, then sections.
+        
+        Each chunk is summarized once (map) and the section prompts run over the
+        combined chunk notes (reduce), so cost grows linearly with meeting length
+        and every part of the meeting is covered.
+        
+        Args:
+            transcript (str): The meeting transcript text.
+            concurrent (bool, optional): Run chunk and section prompts in parallel.
+            include_participants (bool): Also extract the participant list.
+            segments (List, optional): Transcription segments for chunk boundaries.
             
-            # Action Items
-            actions_prompt = f"""
-            Identify all action items assigned during this meeting from the transcript.
-            Include who is responsible for each action and any deadlines mentioned.
+        Returns:
+            Tuple[dict, str]: Summary sections and participants (None if not requested).
+        """
+        notes = self.condense_transcript(transcript, concurrent, segments)
+        # Section fallbacks describe the original meeting, not the condensed notes
+        return self._fan_out(notes, concurrent, include_participants, source_transcript=transcript)
+    
+    def condense_transcript(self, transcript: str, concurrent: bool = None,
+                            segments: List[Any] = None) -> str:
+        """
+        Condense a transcript until it fits the direct prompt budget.
+        
+        Args:
+            transcript (str): The meeting transcript text.
+            concurrent (bool, optional): Summarize chunks in parallel.
+            segments (List, optional): Transcription segments for chunk boundaries.
             
-            Transcript:
-            {transcript[:2000]}...
+        Returns:
+            str: The transcript itself if it already fits, otherwise chunk notes
+                 in chronological order.
+        """
+        text = transcript
+        for _ in range(Config.SUMMARY_MAX_REDUCE_LEVELS):
+            if estimate_tokens(text) <= Config.SUMMARY_DIRECT_MAX_TOKENS:
+                break
+            text = self._summarize_chunks(text, concurrent, segments)
+            segments = None  # Deeper levels chunk the notes, which have no timestamps
+        return text
+    
+    def _summarize_chunks(self, text: str, concurrent: bool = None,
+                          segments: List[Any] = None) -> str:
+        """
+        Map step: turn each chunk of the text into notes, reusing cached notes.
+        
+        Returns:
+            str: The notes for every chunk joined in order.
+        """
+        chunks = chunk_transcript(text, Config.SUMMARY_CHUNK_TOKENS, segments)
+        total = len(chunks)
+        
+        notes: Dict[str, Any] = {}
+        prompts = []
+        for chunk in chunks:
+            name = f"Part {chunk['index'] + 1}"
+            key = self._chunk_cache_key(chunk['text'])
+            cached = self._get_cached_notes(key)
+            if cached is not None:
+                notes[name] = cached
+                continue
+            timespan = ""
+            if chunk['start'] is not None and chunk['end'] is not None:
+                timespan = f" (from {format_timestamp(chunk['start'])} to {format_timestamp(chunk['end'])})"
+            prompts.append((name, CHUNK_NOTES_PROMPT.format(
+                part=chunk['index'] + 1, total=total, timespan=timespan, transcript=chunk['text']
+            )))
+        
+        print(f"🧩 Summarizing {len(prompts)} of {total} transcript chunks ({total - len(prompts)} cached)")
+        outcomes = self._run_prompts(prompts, concurrent) if prompts else {}
+        
+        parts = []
+        for chunk in chunks:
+            name = f"Part {chunk['index'] + 1}"
+            outcome = notes.get(name, outcomes.get(name))
+            if isinstance(outcome, Exception):
+                print(f"⚠️  Gemini AI failed to summarize {name.lower()}: {outcome}")
+                # Keep the raw text, trimmed so the reduce step stays within budget
+                budget_chars = Config.SUMMARY_DIRECT_MAX_TOKENS * CHARS_PER_TOKEN // total
+                outcome = chunk['text'][:max(budget_chars, 200)]
+            elif name in outcomes:
+                self._store_cached_notes(self._chunk_cache_key(chunk['text']), outcome)
+            parts.append(f"[{name} of {total}]\n{outcome}")
+        
+        return "\n\n".join(parts)
+    
+    def _chunk_cache_key(self, chunk_text: str) -> str:
+        """Cache key for a chunk's notes: model, prompt version and content hash."""
+        digest = hashlib.sha256(chunk_text.encode('utf-8')).hexdigest()
+        return f"{self.model}:{CHUNK_NOTES_PROMPT_VERSION}:{digest}"
+    
+    def _get_cached_notes(self, key: str) -> Optional[str]:
+        """Look up cached chunk notes, marking them as recently used."""
+        with self._chunk_cache_lock:
+            notes = self._chunk_notes_cache.get(key)
+            if notes is not None:
+                self._chunk_notes_cache.move_to_end(key)
+            return notes
+    
+    def _store_cached_notes(self, key: str, notes: str):
+        """Cache chunk notes, evicting the least recently used entries."""
+        with self._chunk_cache_lock:
+            self._chunk_notes_cache[key] = notes
+            self._chunk_notes_cache.move_to_end(key)
+            while len(self._chunk_notes_cache) > Config.SUMMARY_CHUNK_CACHE_SIZE:
+                self._chunk_notes_cache.popitem(last=False)
+    
+    def generate_structured_summary(self, transcript: str, concurrent: bool = None) -> Tuple[dict, str]:
+        """
+        Generate every section and the participant list with one JSON request.
+        
+        Keys that are missing or fail validation are regenerated with their
+        individual prompts, so a partially valid response still saves calls.
+        
+        Args:
+            transcript (str): The meeting transcript text.
+            concurrent (bool, optional): Run any per-section retries in parallel.
             
-            List all action items:
-            """
-            sections["Action Items"] = self._gpt(actions_prompt)
+        Returns:
+            Tuple[dict, str]: Summary sections and the list of participants.
+        """
+        valid = {}
+        try:
+            response = self._gpt(STRUCTURED_SUMMARY_PROMPT.format(transcript=transcript))
+            valid = self._parse_structured_summary(response)
+        except Exception as e:
+            print(f"⚠️  Structured summary failed: {e}")
+        
+        missing = [key for key in STRUCTURED_SUMMARY_KEYS if key not in valid]
+        if missing:
+            print(f"🔄 Regenerating {len(missing)} section(s) individually: {', '.join(missing)}")
+            prompts = self._section_prompts(transcript, missing)
+            if PARTICIPANTS_KEY in missing:
+                prompts.append((PARTICIPANTS_KEY, PARTICIPANTS_PROMPT.format(transcript=transcript)))
+            valid.update(self._run_prompts(prompts, concurrent))
+        
+        participants = valid.pop(PARTICIPANTS_KEY)
+        if isinstance(participants, Exception):
+            print(f"⚠️  Gemini AI failed to extract participants: {participants}")
+            participants = FALLBACK_PARTICIPANTS
+        
+        outcomes = {name: valid[name] for name, _ in SECTION_PROMPTS}
+        return self._collect_sections(outcomes, transcript), participants
+    
+    def _parse_structured_summary(self, response: str) -> Dict[str, str]:
+        """
+        Parse and validate the JSON returned for a structured summary.
+        
+        Args:
+            response (str): Raw model output, possibly wrapped in a code fence.
             
-            return sections
+        Returns:
+            Dict[str, str]: Only the keys whose values passed validation.
             
-        except Exception as e:
-            print(f"⚠️  Gemini AI failed to generate summary: {e}")
-            print("🔄 Using fallback summary generation...")
-            return self.generate_fallback_summary(transcript)
+        Raises:
+            ValueError: If the response does not contain a JSON object.
+        """
+        start = response.find('{')
+        end = response.rfind('}')
+        if start == -1 or end <= start:
+            raise ValueError("Response did not contain a JSON object")
+        
+        data = json.loads(response[start:end + 1])
+        if not isinstance(data, dict):
+            raise ValueError("Response JSON is not an object")
         
+        valid = {}
+        for key in STRUCTURED_SUMMARY_KEYS:
+            value = data.get(key)
+            if isinstance(value, list) and all(isinstance(item, str) for item in value):
+                separator = ", " if key == PARTICIPANTS_KEY else "\n"
+                value = separator.join(item.strip() for item in value if item.strip())
+            if isinstance(value, str) and value.strip():
+                valid[key] = value.strip()
+        return valid
     
     def generate_custom_summary(self, transcript: str, custom_prompt: str) -> str:
         """
@@ -135,6 +712,21 @@ class SummarizationService:
         """
         return self._gpt(full_prompt)
     
+    def summarize_conversation(self, summary: str, turns: str) -> str:
+        """
+        Fold chat turns into a conversation's rolling summary.
+        
+        Args:
+            summary (str): The current summary (empty for the first fold).
+            turns (str): Turns to add, as Human/Assistant lines.
+            
+        Returns:
+            str: The updated summary.
+        """
+        return self._gpt(CONVERSATION_SUMMARY_PROMPT.format(
+            max_words=Config.CHAT_SUMMARY_MAX_WORDS, summary=summary or "(none yet)", turns=turns
+        ))
+    
     def extract_participants(self, transcript: str) -> str:
         """
         Extract list of meeting participants from transcript.
@@ -145,15 +737,7 @@ class SummarizationService:
         Returns:
             str: List of identified participants.
         """
-        prompt = f"""
-        From the following meeting transcript, identify and list all participants/speakers.
-        
-        Transcript:
-        {transcript}
-        
-        Provide a list of participants:
-        """
-        return self._gpt(prompt)
+        return self._gpt(PARTICIPANTS_PROMPT.format(transcript=self.condense_transcript(transcript)))
     
     def analyze_sentiment(self, transcript: str) -> str:
         """
@@ -165,6 +749,7 @@ class SummarizationService:
         Returns:
             str: Sentiment analysis of the meeting.
         """
+        transcript = self.condense_transcript(transcript)
         prompt = f"""
         Analyze the overall sentiment and tone of the following meeting transcript.
         Consider the mood, level of agreement/disagreement, and overall atmosphere.
@@ -237,3 +822,24 @@ For detailed action item extraction, please try generating the summary again.
         }
         
         return sections
+    
+    def _fallback_section(self, section: str, transcript: str) -> str:
+        """
+        Build the fallback text for a single section that could not be generated.
+        
+        Args:
+            section (str): Name of the failed section.
+            transcript (str): The meeting transcript text.
+            
+        Returns:
+            str: Basic, non-AI text for that section.
+        """
+        fallback = self.generate_fallback_summary(transcript)
+        key = FALLBACK_SECTION_ALIASES.get(section, section)
+        if key in fallback:
+            return fallback[key]
+        return f"""
+{section}:
+This section could not be generated automatically due to content processing limitations.
+Please review the full meeting transcript for details, or try generating the summary again.
+        """.strip()
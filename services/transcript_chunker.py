@@ -0,0 +1,122 @@
+"""
+Transcript chunking helpers.
+Splits transcripts on segment or sentence boundaries under a token budget.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# Rough characters-per-token ratio for English text with Gemini/Whisper tokenizers
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Approximate token count.
+    """
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def segment_value(segment: Any, key: str, default: Any = None) -> Any:
+    """Read a field from a transcription segment given as a dict or an object."""
+    if isinstance(segment, dict):
+        return segment.get(key, default)
+    return getattr(segment, key, default)
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as H:MM:SS."""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def chunk_transcript(transcript: str, max_tokens: int,
+                     segments: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Split a transcript into chunks that each fit within a token budget.
+
+    Segment boundaries are used when transcription segments are available so
+    each chunk keeps its start/end timestamps; otherwise the text is split on
+    sentence and line boundaries. Units longer than the budget are split on
+    word boundaries.
+
+    Args:
+        transcript (str): The meeting transcript text.
+        max_tokens (int): Maximum estimated tokens per chunk.
+        segments (List, optional): Transcription segments with 'text', 'start' and 'end'.
+
+    Returns:
+        List[Dict[str, Any]]: Chunks with 'index', 'text', 'start' and 'end'
+                              ('start'/'end' are None without segments).
+    """
+    if segments:
+        units = [
+            (str(segment_value(seg, 'text', '')).strip(),
+             segment_value(seg, 'start'), segment_value(seg, 'end'))
+            for seg in segments
+        ]
+        separator = ' '
+    else:
+        units = [(part.strip(), None, None) for part in _SENTENCE_BOUNDARY.split(transcript or '')]
+        separator = '\n' if '\n' in (transcript or '') else ' '
+
+    chunks: List[Dict[str, Any]] = []
+    current: List[str] = []
+    current_tokens = 0
+    current_start = None
+    current_end = None
+
+    def flush():
+        nonlocal current, current_tokens, current_start, current_end
+        if current:
+            chunks.append({
+                'index': len(chunks),
+                'text': separator.join(current),
+                'start': current_start,
+                'end': current_end,
+            })
+        current, current_tokens, current_start, current_end = [], 0, None, None
+
+    for text, start, end in units:
+        if not text:
+            continue
+        for piece in _split_oversized(text, max_tokens):
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                flush()
+            if not current:
+                current_start = start
+            current.append(piece)
+            current_tokens += piece_tokens
+            current_end = end if end is not None else current_end
+    flush()
+
+    return chunks
+
+
+def _split_oversized(text: str, max_tokens: int) -> List[str]:
+    """Split a single sentence or segment that exceeds the budget on word boundaries."""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    max_chars = max(max_tokens * CHARS_PER_TOKEN, 1)
+    pieces, current = [], ''
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
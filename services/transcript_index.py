@@ -0,0 +1,176 @@
+"""
+BM25 retrieval over transcript chunks for chat.
+Each chat question is answered from the transcript chunks most relevant to
+it instead of the whole transcript, so prompt size stays flat as meetings
+get longer.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from config import Config
+from services.transcript_chunker import chunk_transcript, estimate_tokens, format_timestamp
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Frequent words that carry no meaning for retrieval
+STOP_WORDS = frozenset("""
+a an and are as at be but by can could did do does for from had has have he her him his how i
+if in into is it its i'm me my no not of on or our she so that the their them then there these
+they this to us was we were what when where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of a text, without stop words and possessive endings."""
+    terms = []
+    for word in _WORD.findall((text or '').lower()):
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word not in STOP_WORDS:
+            terms.append(word)
+    return terms
+
+
+class TranscriptIndex:
+    """
+    Okapi BM25 index over the chunks of one transcript.
+
+    Postings are stored term by term in flat NumPy arrays (CSC layout) with
+    each posting's BM25 weight precomputed, so scoring a question is a sum of
+    array slices for its terms.
+    """
+
+    def __init__(self, transcript: str, segments: List[Any] = None,
+                 chunk_tokens: int = None, k1: float = 1.5, b: float = 0.75):
+        """
+        Chunk and index a transcript.
+
+        Args:
+            transcript (str): The meeting transcript text.
+            segments (List, optional): Transcription segments, so chunks keep timestamps.
+            chunk_tokens (int, optional): Tokens per chunk. Defaults to Config.CHAT_CHUNK_TOKENS.
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 document length normalization.
+        """
+        if not NUMPY_AVAILABLE:
+            raise Exception("numpy is required for transcript retrieval")
+
+        self.chunks = chunk_transcript(transcript, chunk_tokens or Config.CHAT_CHUNK_TOKENS, segments)
+        self.vocabulary: Dict[str, int] = {}
+        doc_ids, term_ids, counts = [], [], []
+        for chunk in self.chunks:
+            for term, count in Counter(tokenize(chunk['text'])).items():
+                doc_ids.append(chunk['index'])
+                term_ids.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        counts = np.asarray(counts, dtype=np.float32)
+        num_docs = len(self.chunks)
+
+        doc_lengths = np.bincount(doc_ids, weights=counts, minlength=num_docs)
+        avg_length = doc_lengths.mean() if num_docs else 0.0
+        doc_freq = np.bincount(term_ids, minlength=len(self.vocabulary))
+        idf = np.log(1 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+        norm = k1 * (1 - b + b * doc_lengths[doc_ids] / max(avg_length, 1e-9))
+        weights = idf[term_ids] * counts * (k1 + 1) / (counts + norm)
+
+        order = np.argsort(term_ids, kind='stable')
+        self._doc_ids = doc_ids[order]
+        self._weights = weights[order].astype(np.float32)
+        self._indptr = np.concatenate(([0], np.cumsum(doc_freq))).astype(np.int64)
+
+    def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """
+        Find the chunks most relevant to a query.
+
+        Args:
+            query (str): The question.
+            top_k (int): Maximum number of chunks.
+
+        Returns:
+            List[Dict[str, Any]]: Matching chunks with a 'score', best first.
+        """
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for term, query_count in Counter(tokenize(query)).items():
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self._indptr[term_id], self._indptr[term_id + 1]
+            # A term has at most one posting per chunk, so plain fancy indexing adds correctly
+            scores[self._doc_ids[start:end]] += query_count * self._weights[start:end]
+
+        best = np.argsort(-scores, kind='stable')[:top_k]
+        return [{**self.chunks[i], 'score': float(scores[i])} for i in best if scores[i] > 0]
+
+    def spread(self, count: int) -> List[Dict[str, Any]]:
+        """Evenly spaced chunks across the meeting, for questions that match nothing."""
+        if not self.chunks:
+            return []
+        count = min(count, len(self.chunks))
+        step = len(self.chunks) / count
+        return [self.chunks[math.floor(i * step)] for i in range(count)]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index arrays and chunk texts."""
+        return (self._doc_ids.nbytes + self._weights.nbytes + self._indptr.nbytes
+                + sum(len(chunk['text']) for chunk in self.chunks))
+
+
+def build_index(transcript: str, segments: List[Any] = None) -> Optional[TranscriptIndex]:
+    """
+    Index a chat transcript if retrieval is enabled and worthwhile.
+
+    Returns:
+        TranscriptIndex or None: None when retrieval is disabled, numpy is
+                                 missing, or the transcript is small enough
+                                 to send in full.
+    """
+    if not (Config.CHAT_RETRIEVAL_ENABLED and NUMPY_AVAILABLE):
+        return None
+    if estimate_tokens(transcript) <= Config.CHAT_FULL_TRANSCRIPT_MAX_TOKENS:
+        return None
+    return TranscriptIndex(transcript, segments)
+
+
+def build_context(transcript: str, index: Optional[TranscriptIndex], question: str,
+                  top_k: int = None) -> str:
+    """
+    The transcript text to put into a chat prompt for a question.
+
+    Args:
+        transcript (str): Full transcript, used when there is no index.
+        index (TranscriptIndex, optional): The session's index.
+        question (str): Retrieval query (the user's message).
+        top_k (int, optional): Chunks to include. Defaults to Config.CHAT_RETRIEVAL_TOP_K.
+
+    Returns:
+        str: The full transcript, or the most relevant excerpts in meeting
+             order, each labelled with its part number and timestamps.
+    """
+    if index is None:
+        return transcript
+
+    top_k = top_k or Config.CHAT_RETRIEVAL_TOP_K
+    chunks = index.search(question, top_k) or index.spread(top_k)
+    excerpts = []
+    for chunk in sorted(chunks, key=lambda c: c['index']):
+        label = f"Part {chunk['index'] + 1} of {len(index.chunks)}"
+        if chunk['start'] is not None and chunk['end'] is not None:
+            label += f", {format_timestamp(chunk['start'])}-{format_timestamp(chunk['end'])}"
+        excerpts.append(f"[{label}]\n{chunk['text']}")
+    return ("(Excerpts of the transcript most relevant to the question, in meeting order)\n\n"
+            + "\n\n".join(excerpts))
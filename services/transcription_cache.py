@@ -0,0 +1,152 @@
+"""
+Content-addressed cache for transcription results.
+Entries are keyed on the audio hash, model and response format.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import Config
+
+
+class TranscriptionCache:
+    """
+    Persistent, size-bounded LRU cache of transcription results.
+
+    Each entry is a JSON file named after its key. Hits refresh the file's
+    modification time, and the least recently used entries are deleted once
+    the directory grows beyond ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir or Config.TRANSCRIPTION_CACHE_DIR)
+        self.max_bytes = max_bytes or Config.TRANSCRIPTION_CACHE_MAX_BYTES
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(audio_sha256: str, model: str, response_format: str) -> str:
+        """
+        Build the cache key for a transcription request.
+
+        Args:
+            audio_sha256 (str): SHA-256 of the audio file contents
+            model (str): Transcription model name
+            response_format (str): Requested response format
+
+        Returns:
+            str: Hex cache key
+        """
+        raw = f"{audio_sha256}:{model}:{response_format}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached transcription.
+
+        Args:
+            key (str): Cache key from make_key()
+
+        Returns:
+            Dict[str, Any] or None: Cached result with text, segments, language and duration
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """
+        Store a transcription result and evict old entries if over budget.
+
+        Args:
+            key (str): Cache key from make_key()
+            result (Dict[str, Any]): JSON-serializable transcription result
+        """
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️  Could not cache transcription: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        self._evict()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict[str, Any]: Hit/miss counters, entry count and size on disk
+        """
+        entries = list(self.cache_dir.glob('*.json'))
+        total_bytes = sum(_safe_size(p) for p in entries)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(entries),
+                'size_bytes': total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        """Delete every cached entry."""
+        for path in self.cache_dir.glob('*.json'):
+            path.unlink(missing_ok=True)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits its budget."""
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob('*.json'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+
+            for _, size, path in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                self.evictions += 1
+
+
+def _safe_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
@@ -1,17 +1,35 @@
 import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from groq import Groq
+from typing import Any
 from config import Config
+from services.client_registry import get_client_registry
+from services.rate_limiter import rate_limited_call
+from services.audio_splitter import find_silences, plan_chunks, split_audio, stitch_transcriptions
+from services.transcription_cache import TranscriptionCache
+from utils.media_probe import probe_media
+from utils.hashing import file_sha256
+from utils.single_flight import SingleFlight
+
+RESPONSE_FORMAT = "verbose_json"
+
+# Concurrent requests for the same audio share one API transcription
+_in_flight = SingleFlight()
 
 class TranscriptionService:
     """Service for transcribing audio files using Groq API."""
     
     def __init__(self):
         Config.validate_config()
-        self.client = Groq(api_key=Config.GROQ_API_KEY)
+        self.client = get_client_registry().groq()
         Config.ensure_directories()
+        self.cache = TranscriptionCache() if Config.TRANSCRIPTION_CACHE_ENABLED else None
     
-    def transcribe_audio(self, audio_file_path: str, output_file_path: str = None) -> dict:
+    def transcribe_audio(self, audio_file_path: str, output_file_path: str = None,
+                         use_cache: bool = True, chunked: bool = None,
+                         duration: float = None, time_map: Any = None) -> dict:
         """
         Transcribe an audio file to text.
         
@@ -19,9 +37,16 @@ class TranscriptionService:
             audio_file_path (str): Path to the audio file.
             output_file_path (str, optional): Path to save the transcription text file.
                                             If not provided, will be generated automatically.
+            use_cache (bool): Reuse a cached result for identical audio. Defaults to True.
+            chunked (bool, optional): Split the audio and transcribe chunks in parallel.
+                                      By default long or large files are chunked.
+            duration (float, optional): Audio duration in seconds if already probed.
+            time_map (TimeMap, optional): Map from silence-stripped to original time;
+                                          segment timestamps are returned in original time.
         
         Returns:
-            dict: Transcription result with text and metadata.
+            dict: Transcription result with text and metadata. 'cached' is True when
+                  the result came from the transcription cache.
             
         Raises:
             FileNotFoundError: If the audio file doesn't exist.
@@ -31,12 +56,21 @@ class TranscriptionService:
             raise FileNotFoundError(f"Audio file not found at '{audio_file_path}'")
         
         try:
-            with open(audio_file_path, "rb") as file:
-                transcription = self.client.audio.transcriptions.create(
-                    file=(os.path.basename(audio_file_path), file.read()),
-                    model=Config.GROQ_MODEL,
-                    response_format="verbose_json",
-                )
+            content_key = TranscriptionCache.make_key(
+                file_sha256(audio_file_path), Config.GROQ_MODEL, RESPONSE_FORMAT
+            )
+            cache_key = None
+            result = None
+            if self.cache and use_cache:
+                cache_key = content_key
+                result = self.cache.get(cache_key)
+                if result is not None:
+                    print(f"♻️  Using cached transcription for '{audio_file_path}'")
+            
+            cached = result is not None
+            if not cached:
+                result = _in_flight.do(content_key, self._fetch_transcription,
+                                       audio_file_path, chunked, duration, cache_key)
             
             # Generate output path if not provided
             if output_file_path is None:
@@ -45,21 +79,121 @@ class TranscriptionService:
             
             # Save transcription to file
             with open(output_file_path, 'w', encoding='utf-8') as f:
-                f.write(transcription.text)
+                f.write(result['text'])
             
             print(f"Transcription saved to '{output_file_path}'")
             
+            segments = result.get('segments')
+            duration = result.get('duration')
+            if time_map is not None:
+                segments = time_map.remap_segments(segments)
+                if duration is not None:
+                    duration = time_map.to_original(float(duration))
+            
             return {
-                'text': transcription.text,
-                'language': getattr(transcription, 'language', None),
-                'duration': getattr(transcription, 'duration', None),
+                'text': result['text'],
+                'language': result.get('language'),
+                'duration': duration,
                 'output_file': output_file_path,
-                'segments': getattr(transcription, 'segments', None)
+                'segments': segments,
+                'cached': cached
             }
             
         except Exception as e:
             raise Exception(f"An error occurred during transcription: {e}")
     
+    def _fetch_transcription(self, audio_file_path: str, chunked: bool = None,
+                             duration: float = None, cache_key: str = None) -> dict:
+        """Transcribe via the API (chunked if needed) and store the result in the cache."""
+        if chunked is None:
+            duration = duration or self._get_duration(audio_file_path)
+            chunked = self._should_chunk(audio_file_path, duration)
+        if chunked:
+            result = self._transcribe_chunked(audio_file_path, duration)
+        else:
+            result = self._request_transcription(audio_file_path)
+        if cache_key:
+            self.cache.put(cache_key, result)
+        return result
+    
+    def _request_transcription(self, audio_file_path: str) -> dict:
+        """
+        Send one audio file to the Groq API.
+        
+        Returns:
+            dict: Plain result with text, language, duration and segments.
+        """
+        def request():
+            # Pass the open file so the HTTP client streams it instead of loading it into memory;
+            # it is reopened for each retry
+            with open(audio_file_path, "rb") as file:
+                return self.client.audio.transcriptions.create(
+                    file=(os.path.basename(audio_file_path), file),
+                    model=Config.GROQ_MODEL,
+                    response_format=RESPONSE_FORMAT,
+                )
+        
+        transcription = rate_limited_call('groq', Config.GROQ_MODEL, request)
+        return {
+            'text': transcription.text,
+            'language': getattr(transcription, 'language', None),
+            'duration': getattr(transcription, 'duration', None),
+            'segments': _to_plain(getattr(transcription, 'segments', None))
+        }
+    
+    def _get_duration(self, audio_file_path: str) -> float:
+        """Read the audio duration, or None if it cannot be determined."""
+        try:
+            return probe_media(audio_file_path)['duration']
+        except Exception as e:
+            print(f"⚠️  Could not read audio duration: {e}")
+            return None
+    
+    def _should_chunk(self, audio_file_path: str, duration: float = None) -> bool:
+        """Decide whether a file is too large or too long for a single request."""
+        if not Config.TRANSCRIPTION_CHUNKING_ENABLED:
+            return False
+        if os.path.getsize(audio_file_path) > Config.TRANSCRIPTION_MAX_UPLOAD_BYTES:
+            return True
+        max_single = Config.TRANSCRIPTION_CHUNK_SECONDS + Config.TRANSCRIPTION_CHUNK_SEARCH_SECONDS
+        return bool(duration and duration > max_single)
+    
+    def _transcribe_chunked(self, audio_file_path: str, duration: float = None) -> dict:
+        """
+        Transcribe a long recording as overlapping chunks in parallel.
+        
+        The audio is cut at silences near TRANSCRIPTION_CHUNK_SECONDS, chunks are
+        sent concurrently, and the results are stitched with global timestamps.
+        
+        Returns:
+            dict: Combined result with text, language, duration and segments.
+        """
+        duration = duration or self._get_duration(audio_file_path)
+        if not duration:
+            print("⚠️  Unknown audio duration, transcribing in a single request")
+            return self._request_transcription(audio_file_path)
+        
+        silences = find_silences(audio_file_path, Config.TRANSCRIPTION_SILENCE_DB,
+                                 Config.TRANSCRIPTION_SILENCE_MIN_SECONDS)
+        chunks = plan_chunks(duration, silences,
+                             target_seconds=Config.TRANSCRIPTION_CHUNK_SECONDS,
+                             search_seconds=Config.TRANSCRIPTION_CHUNK_SEARCH_SECONDS,
+                             overlap_seconds=Config.TRANSCRIPTION_CHUNK_OVERLAP_SECONDS)
+        if len(chunks) == 1:
+            return self._request_transcription(audio_file_path)
+        
+        chunk_dir = tempfile.mkdtemp(prefix='chunks_', dir=str(Config.TEMP_FOLDER))
+        try:
+            chunk_paths = split_audio(audio_file_path, chunks, chunk_dir)
+            print(f"🧩 Transcribing {len(chunks)} chunks of ~{Config.TRANSCRIPTION_CHUNK_SECONDS}s in parallel...")
+            workers = min(Config.TRANSCRIPTION_MAX_WORKERS, len(chunk_paths))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='transcribe') as pool:
+                results = list(pool.map(self._request_transcription, chunk_paths))
+        finally:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+        
+        return stitch_transcriptions(chunks, results)
+    
     def transcribe_from_file(self, file_path: str) -> str:
         """
         Simple transcription that returns only the text.
@@ -101,6 +235,18 @@ class TranscriptionService:
         
         return results
     
+    def get_cache_stats(self) -> dict:
+        """
+        Get transcription cache statistics.
+        
+        Returns:
+            dict: Hit/miss counters and cache size, or {'enabled': False}, plus
+                  'in_flight' de-duplication counters.
+        """
+        if not self.cache:
+            return {'enabled': False, 'in_flight': _in_flight.get_stats()}
+        return {'enabled': True, **self.cache.get_stats(), 'in_flight': _in_flight.get_stats()}
+    
     def get_supported_formats(self) -> list:
         """
         Get list of supported audio formats.
@@ -109,3 +255,16 @@ class TranscriptionService:
             list: Supported audio formats.
         """
         return ['mp3', 'wav', 'flac', 'm4a', 'ogg', 'webm']
+
+
+def _to_plain(value: Any) -> Any:
+    """Convert API response objects (e.g. pydantic segments) to JSON-friendly types."""
+    if isinstance(value, dict):
+        return {k: _to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(v) for v in value]
+    if hasattr(value, 'model_dump'):
+        return _to_plain(value.model_dump())
+    if hasattr(value, '__dict__') and not isinstance(value, type):
+        return _to_plain(vars(value))
+    return value
@@ -1,14 +1,15 @@
 import os
 import tempfile
 from pathlib import Path
-from groq import Groq
 from config import Config
+from services.client_registry import get_client_registry
+from services.rate_limiter import rate_limited_call
 
 class TTSService:
     """Text-to-Speech service using Groq API."""
     
     def __init__(self):
-        self.client = Groq(api_key=Config.GROQ_API_KEY)
+        self.client = get_client_registry().groq()
         self.model = "playai-tts"
         self.voice = "Celeste-PlayAI"
         self.response_format = "wav"
@@ -34,13 +35,16 @@ class TTSService:
                 temp_dir.mkdir(exist_ok=True)
                 output_file = temp_dir / f"tts_{hash(text) % 1000000}.wav"
             
-            # Create TTS request
-            response = self.client.audio.speech.create(
-                model=self.model,
-                voice=self.voice,
-                input=text,
-                response_format=self.response_format
-            )
+            # Create TTS request; the closure keeps model= out of rate_limited_call's own arguments
+            def request():
+                return self.client.audio.speech.create(
+                    model=self.model,
+                    voice=self.voice,
+                    input=text,
+                    response_format=self.response_format
+                )
+            
+            response = rate_limited_call('groq', self.model, request)
             
             # Write response to file
             response.write_to_file(str(output_file))
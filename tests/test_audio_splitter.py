@@ -0,0 +1,97 @@
+"""
+Test chunk planning and transcript stitching for long recordings
+"""
+import pytest
+from services.audio_splitter import plan_chunks, stitch_transcriptions, merge_overlapping_text
+
+class TestAudioSplitter:
+    """Test silence-aware chunking and overlap de-duplication."""
+
+    def test_short_audio_is_single_chunk(self):
+        """Test that audio within the target length is not split."""
+        chunks = plan_chunks(300, [], target_seconds=600, search_seconds=60, overlap_seconds=2)
+
+        assert len(chunks) == 1
+        assert chunks[0]['cut_start'] == 0.0
+        assert chunks[0]['cut_end'] == 300
+
+    def test_cuts_prefer_nearby_silence(self):
+        """Test that boundaries move to the closest silence and chunks overlap."""
+        silences = [(580.0, 582.0), (1230.0, 1234.0)]
+        chunks = plan_chunks(1800, silences, target_seconds=600, search_seconds=60, overlap_seconds=2)
+
+        assert [round(c['start'], 1) for c in chunks] == [0.0, 581.0, 1232.0]
+        assert chunks[1]['cut_start'] == pytest.approx(579.0)
+        assert chunks[0]['cut_end'] == pytest.approx(583.0)
+        assert chunks[-1]['end'] == 1800
+
+    def test_falls_back_to_fixed_cut_without_silence(self):
+        """Test that a fixed cut is used when no silence is close enough."""
+        chunks = plan_chunks(1500, [(100.0, 101.0)], target_seconds=600, search_seconds=60, overlap_seconds=1)
+
+        assert chunks[1]['start'] == 600
+
+    def test_stitch_offsets_and_deduplicates_segments(self):
+        """Test that segment times become global and overlap segments appear once."""
+        chunks = [
+            {'index': 0, 'start': 0.0, 'end': 10.0, 'cut_start': 0.0, 'cut_end': 12.0},
+            {'index': 1, 'start': 10.0, 'end': 20.0, 'cut_start': 8.0, 'cut_end': 20.0},
+        ]
+        results = [
+            {'language': 'en', 'segments': [
+                {'start': 0.0, 'end': 5.0, 'text': ' Welcome everyone.'},
+                {'start': 5.0, 'end': 9.5, 'text': ' First topic.'},
+                {'start': 10.2, 'end': 11.8, 'text': ' Second topic.'},
+            ]},
+            {'language': 'en', 'segments': [
+                {'start': 2.2, 'end': 3.8, 'text': ' Second topic.'},
+                {'start': 4.0, 'end': 11.0, 'text': ' Wrap up.'},
+            ]},
+        ]
+
+        merged = stitch_transcriptions(chunks, results)
+
+        assert merged['text'] == "Welcome everyone. First topic. Second topic. Wrap up."
+        assert [s['start'] for s in merged['segments']] == [0.0, 5.0, 10.2, 12.0]
+        assert merged['duration'] == 20.0
+        assert merged['language'] == 'en'
+
+    def test_silent_chunk_keeps_the_other_timestamps(self):
+        """Test that a chunk without speech doesn't drop every segment."""
+        chunks = [
+            {'index': 0, 'start': 0.0, 'end': 10.0, 'cut_start': 0.0, 'cut_end': 11.0},
+            {'index': 1, 'start': 10.0, 'end': 20.0, 'cut_start': 9.0, 'cut_end': 21.0},
+            {'index': 2, 'start': 20.0, 'end': 30.0, 'cut_start': 19.0, 'cut_end': 30.0},
+        ]
+        results = [
+            {'text': 'Welcome everyone.', 'segments': [{'start': 1.0, 'end': 4.0, 'text': ' Welcome everyone.'}]},
+            {'text': '', 'segments': []},
+            {'text': 'Wrap up.', 'segments': [{'start': 3.0, 'end': 6.0, 'text': ' Wrap up.'}]},
+        ]
+
+        merged = stitch_transcriptions(chunks, results)
+
+        assert merged['text'] == "Welcome everyone. Wrap up."
+        assert [s['start'] for s in merged['segments']] == [1.0, 22.0]
+
+    def test_chunk_without_segments_falls_back_to_text(self):
+        """Test that only a chunk with text but no segments uses the text merge."""
+        chunks = [
+            {'index': 0, 'start': 0.0, 'end': 10.0, 'cut_start': 0.0, 'cut_end': 12.0},
+            {'index': 1, 'start': 10.0, 'end': 20.0, 'cut_start': 8.0, 'cut_end': 20.0},
+        ]
+        results = [
+            {'text': 'We ship on Friday.', 'segments': [{'start': 1.0, 'end': 9.0, 'text': ' We ship on Friday.'}]},
+            {'text': 'on Friday. Next item.', 'segments': None},
+        ]
+
+        merged = stitch_transcriptions(chunks, results)
+
+        assert merged['text'] == "We ship on Friday. Next item."
+        assert [s['start'] for s in merged['segments']] == [1.0]
+
+    def test_merge_text_removes_repeated_overlap(self):
+        """Test that words repeated at a chunk boundary are dropped."""
+        merged = merge_overlapping_text("we agreed to ship on Friday.", "Ship on Friday. Next item.")
+
+        assert merged == "we agreed to ship on Friday. Next item."
@@ -0,0 +1,173 @@
+"""
+Test the circuit breaker and hedged calls around provider requests
+"""
+import threading
+import time
+import pytest
+
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.hedging import HedgedCaller, LatencyTracker
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+def fail(error):
+    raise error
+
+
+class TestCircuitBreaker:
+    """Test opening, failing fast and probing for recovery."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.breaker = CircuitBreaker('Gemini', failure_threshold=2, recovery_seconds=0.1,
+                                      is_failure=lambda e: getattr(e, 'status_code', 0) >= 500)
+
+    def trip(self):
+        for _ in range(2):
+            with pytest.raises(ServerError):
+                self.breaker.call(fail, ServerError())
+
+    def test_opens_after_consecutive_failures_and_fails_fast(self):
+        """Test that an open circuit rejects calls without running them."""
+        self.trip()
+        calls = []
+
+        with pytest.raises(CircuitOpenError):
+            self.breaker.call(calls.append, 'x')
+
+        assert calls == []
+        assert self.breaker.state == CircuitBreaker.OPEN
+        assert self.breaker.get_stats()['rejected'] == 1
+
+    def test_ignored_errors_and_successes_keep_it_closed(self):
+        """Test that client errors don't count and a success resets the streak."""
+        with pytest.raises(ServerError):
+            self.breaker.call(fail, ServerError())
+        assert self.breaker.call(lambda: 'ok') == 'ok'
+        for _ in range(3):
+            with pytest.raises(BadRequestError):
+                self.breaker.call(fail, BadRequestError())
+        with pytest.raises(ServerError):
+            self.breaker.call(fail, ServerError())
+
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def test_probe_closes_or_reopens_the_circuit(self):
+        """Test that after the recovery period one probe decides the state."""
+        self.trip()
+        time.sleep(0.15)
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(ServerError):
+            self.breaker.call(fail, ServerError())
+        assert self.breaker.state == CircuitBreaker.OPEN
+
+        time.sleep(0.15)
+        assert self.breaker.call(lambda: 'ok') == 'ok'
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def test_only_one_probe_at_a_time(self):
+        """Test that calls arriving during a probe still fail fast."""
+        self.trip()
+        time.sleep(0.15)
+        release = threading.Event()
+        probe = threading.Thread(target=self.breaker.call, args=(release.wait, 2))
+        probe.start()
+        time.sleep(0.05)
+
+        with pytest.raises(CircuitOpenError):
+            self.breaker.call(lambda: 'ok')
+        release.set()
+        probe.join()
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+
+class TestHedgedCaller:
+    """Test duplicating calls that run past the latency percentile."""
+
+    def test_percentile(self):
+        """Test the nearest-rank percentile over the window."""
+        tracker = LatencyTracker(window=100)
+        for value in range(1, 101):
+            tracker.record(value / 100)
+
+        assert tracker.percentile(95) == pytest.approx(0.95)
+        assert LatencyTracker().percentile(95) is None
+
+    def test_no_hedging_without_enough_samples(self):
+        """Test that calls run once until the threshold is known."""
+        hedger = HedgedCaller(min_samples=5)
+        assert hedger.call(lambda: 'ok') == 'ok'
+        assert hedger.hedge_delay() is None
+        assert hedger.get_stats()['hedged'] == 0
+
+    def test_slow_call_is_hedged_and_fastest_copy_wins(self):
+        """Test that a call stuck past p95 is answered by its duplicate."""
+        hedger = HedgedCaller(min_samples=3)
+        for _ in range(3):
+            hedger.latencies.record(0.02)
+        attempts = []
+        lock = threading.Lock()
+
+        def request():
+            with lock:
+                attempts.append(1)
+                first = len(attempts) == 1
+            time.sleep(1.0 if first else 0.01)
+            return 'slow' if first else 'fast'
+
+        started = time.monotonic()
+        assert hedger.call(request) == 'fast'
+        assert time.monotonic() - started < 0.5
+        stats = hedger.get_stats()
+        assert stats['hedged'] == 1
+        assert stats['hedge_wins'] == 1
+
+    def test_hedge_is_skipped_without_permit(self):
+        """Test that a slow call is not duplicated when the hedge is refused budget."""
+        hedger = HedgedCaller(min_samples=1)
+        hedger.latencies.record(0.01)
+        attempts = []
+
+        def request():
+            attempts.append(1)
+            time.sleep(0.1)
+            return 'ok'
+
+        assert hedger.call(request, hedge_permit=lambda: False) == 'ok'
+        assert len(attempts) == 1
+        stats = hedger.get_stats()
+        assert stats['hedged'] == 0
+        assert stats['hedges_skipped'] == 1
+
+    def test_busy_pool_does_not_delay_the_primary(self):
+        """Test that the primary runs at once even when every hedge worker is busy."""
+        hedger = HedgedCaller(min_samples=1, max_workers=1)
+        hedger.latencies.record(0.05)
+        release = threading.Event()
+        hedger._executor.submit(release.wait, 2)
+        try:
+            started = time.monotonic()
+            assert hedger.call(lambda: 'ok') == 'ok'
+            assert time.monotonic() - started < 0.05
+            assert hedger.get_stats()['hedged'] == 0
+        finally:
+            release.set()
+
+    def test_failure_of_both_copies_raises(self):
+        """Test that an error surfaces once every copy has failed."""
+        hedger = HedgedCaller(min_samples=1)
+        hedger.latencies.record(0.01)
+
+        def request():
+            time.sleep(0.05)
+            raise ServerError('down')
+
+        with pytest.raises(ServerError):
+            hedger.call(request)
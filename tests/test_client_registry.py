@@ -0,0 +1,81 @@
+"""
+Test the shared provider client registry
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+
+from services.client_registry import ClientRegistry, ConnectionStats
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConnectionStats:
+    """Test counting new versus reused connections."""
+
+    def setup_method(self):
+        """Start a local keep-alive HTTP server."""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def teardown_method(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_sequential_requests_reuse_one_connection(self):
+        """Test that a shared client opens one connection for many requests."""
+        stats = ConnectionStats()
+        with httpx.Client(event_hooks={'request': [stats.on_request]}) as client:
+            for _ in range(5):
+                assert client.get(self.url).text == 'ok'
+
+        assert stats.get_stats() == {
+            'requests': 5, 'connections_opened': 1, 'connections_reused': 4, 'reuse_ratio': 0.8,
+        }
+
+
+class TestClientRegistry:
+    """Test that clients are created once per process."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.registry = ClientRegistry()
+
+    def test_groq_client_is_shared(self):
+        """Test that every caller gets the same Groq client and pool."""
+        with patch('services.client_registry.Config.GROQ_API_KEY', 'test-key'):
+            first = self.registry.groq()
+            second = self.registry.groq()
+
+        assert first is second
+        assert first.max_retries == 0
+        assert self.registry.get_stats()['groq']['created'] is True
+
+    def test_gemini_models_are_cached_per_name(self):
+        """Test that a GenerativeModel is built once per model name."""
+        with patch('services.client_registry.genai.configure') as configure, \
+             patch('services.client_registry.genai.GenerativeModel', side_effect=lambda name: object()) as factory:
+            model = self.registry.gemini_model('gemini-a')
+            assert self.registry.gemini_model('gemini-a') is model
+            self.registry.gemini_model('gemini-b')
+
+        assert configure.call_count == 1
+        assert factory.call_count == 2
+        assert self.registry.get_stats()['gemini'] == {
+            'models': ['gemini-a', 'gemini-b'], 'lookups': 3, 'reused': 1,
+        }
@@ -0,0 +1,87 @@
+"""
+Test the token-budgeted chat memory and its rolling summary
+"""
+from api.conversation_memory import ConversationMemory
+from services.transcript_chunker import estimate_tokens
+
+
+def fake_summarize(summary, turns):
+    """Summarizer that records what it was asked to fold."""
+    fake_summarize.calls.append(turns)
+    return f"{summary} | {len(turns.splitlines())} turns".strip(' |')
+
+
+class TestConversationMemory:
+    """Test budgeted context windows and summary folding."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        fake_summarize.calls = []
+        self.memory = ConversationMemory(max_messages=100)
+
+    def chat(self, turns, first=0, size=40):
+        for i in range(first, first + turns):
+            self.memory.add_user_message(f"question {i} " + "x" * size)
+            self.memory.add_ai_message(f"answer {i} " + "y" * size)
+
+    def test_small_history_is_sent_verbatim(self):
+        """Test that a history under budget is included without summarizing."""
+        self.chat(2)
+        context = self.memory.get_budgeted_context(1000, summarize=fake_summarize)
+
+        assert fake_summarize.calls == []
+        assert context.startswith("Human: question 0")
+        assert context.count("\n") == 3
+
+    def test_long_history_folds_older_turns(self):
+        """Test that older turns move into the summary and the window fits the budget."""
+        self.chat(20)
+        context = self.memory.get_budgeted_context(200, summarize=fake_summarize)
+
+        assert len(fake_summarize.calls) == 1
+        assert "question 0 " in fake_summarize.calls[0]
+        assert context.startswith("Summary of the earlier conversation:")
+        assert "answer 19" in context
+        assert sum(estimate_tokens(m['content']) for m in self.memory.messages) <= 100
+        assert self.memory.summarized_messages + len(self.memory.messages) == 40
+
+    def test_summary_is_updated_incrementally(self):
+        """Test that later folds extend the cached summary instead of redoing it."""
+        self.chat(20)
+        self.memory.get_budgeted_context(200, summarize=fake_summarize)
+        self.memory.get_budgeted_context(200, summarize=fake_summarize)
+        assert len(fake_summarize.calls) == 1
+
+        self.chat(10, first=20)
+        self.memory.get_budgeted_context(200, summarize=fake_summarize)
+        assert len(fake_summarize.calls) == 2
+        assert "question 0 " not in fake_summarize.calls[1]
+        assert self.memory.summary.count("turns") == 2
+
+    def test_failed_summary_keeps_window_in_budget(self):
+        """Test that a summarizer error still returns a bounded window and keeps old turns."""
+        self.chat(20)
+
+        def broken(summary, turns):
+            raise Exception("Gemini is unavailable")
+
+        context = self.memory.get_budgeted_context(200, summarize=broken)
+
+        assert "question 0 " not in context
+        assert "answer 19" in context
+        assert len(self.memory.messages) == 40
+
+    def test_trimmed_messages_are_summarized_and_round_trip(self):
+        """Test that messages over max_messages are queued for the summary and serialized."""
+        memory = ConversationMemory(max_messages=4)
+        for i in range(3):
+            memory.add_user_message(f"q{i}")
+            memory.add_ai_message(f"a{i}")
+        assert [m['content'] for m in memory.unsummarized] == ['q0', 'a0']
+
+        memory.get_budgeted_context(1000, summarize=fake_summarize)
+        restored = ConversationMemory.from_dict(memory.to_dict())
+
+        assert "Human: q0" in fake_summarize.calls[0]
+        assert restored.summary == memory.summary
+        assert restored.unsummarized == []
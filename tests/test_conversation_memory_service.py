@@ -0,0 +1,54 @@
+"""
+Test session expiry and eviction in the LangChain conversation memory service
+"""
+import time
+import pytest
+
+pytest.importorskip('langchain')
+
+from services.conversation_memory_service import ConversationMemoryService
+
+
+class TestConversationMemoryServiceLimits:
+    """Test TTLs, the byte budget and usage statistics."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.service = ConversationMemoryService(ttl_seconds=0, max_bytes=0, sweep_interval_seconds=0)
+
+    def test_usage_stats_count_bytes_per_session(self):
+        """Test that transcripts and messages are counted in each session's bytes."""
+        self.service.create_session_memory('abc', 'x' * 1000)
+        before = self.service.get_memory_usage_stats()['session_bytes']['abc']
+        self.service.add_message_pair('abc', 'q' * 100, 'a' * 200)
+
+        stats = self.service.get_memory_usage_stats()
+        assert before > 2000  # transcript plus the system message quoting it
+        assert stats['session_bytes']['abc'] == before + 300
+        assert stats['total_bytes'] == stats['session_bytes']['abc']
+        assert self.service.get_session_info('abc')['bytes'] == before + 300
+
+    def test_least_recently_used_session_is_evicted(self):
+        """Test that going over the budget evicts the session unused the longest."""
+        self.service.create_session_memory('a', 'x' * 1000)
+        size = self.service.get_memory_usage_stats()['total_bytes']
+        self.service.max_bytes = size * 2
+        self.service.create_session_memory('b', 'x' * 1000)
+        self.service.get_session_memory('a')
+        self.service.create_session_memory('c', 'x' * 1000)
+
+        stats = self.service.get_memory_usage_stats()
+        assert stats['active_session_ids'] == ['a', 'c']
+        assert stats['evictions'] == 1
+
+    def test_idle_sessions_expire(self):
+        """Test that expired sessions are gone on read and purged by the sweep."""
+        self.service.ttl_seconds = 0.1
+        self.service.create_session_memory('a')
+        self.service.create_session_memory('b')
+        time.sleep(0.15)
+
+        assert self.service.get_session_memory('a') is None
+        assert self.service.add_message_pair('a', 'hi', 'hello') is False
+        assert self.service.purge_expired() == 1
+        assert self.service.get_memory_usage_stats()['expirations'] == 2
@@ -0,0 +1,98 @@
+"""
+Test idempotent submission and single-flight de-duplication
+"""
+import threading
+import time
+import pytest
+
+from api.idempotency import IdempotencyConflictError, IdempotencyRegistry, request_fingerprint
+from utils.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test that concurrent identical calls share one execution."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that callers arriving mid-flight get a copy of the leader's result."""
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'text': 'hello'}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do('k', slow)))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(flight.do('k', slow)))
+        follower.start()
+        while flight.get_stats()['shared'] == 0:
+            time.sleep(0.01)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        assert len(calls) == 1
+        assert results == [{'text': 'hello'}, {'text': 'hello'}]
+        assert results[0] is not results[1]
+        assert flight.get_stats() == {'in_flight': 0, 'shared': 1}
+
+    def test_errors_propagate_and_key_is_released(self):
+        """Test that a failure is raised and the next call runs again."""
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError('provider down')
+
+        with pytest.raises(RuntimeError):
+            flight.do('k', fail)
+        assert flight.do('k', lambda: 42) == 42
+
+
+class TestIdempotencyRegistry:
+    """Test replay by key and by request fingerprint."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.registry = IdempotencyRegistry(ttl_seconds=3600)
+        self.submitted = 0
+
+    def submit(self):
+        self.submitted += 1
+        return {'job_id': f'job-{self.submitted}'}
+
+    def test_same_key_replays_original_response(self):
+        """Test that a retry with the same key does not submit again."""
+        fingerprint = request_fingerprint('video', 'abc', recipients=['a@example.com'])
+
+        first, replayed_first = self.registry.submit_once('key-1', fingerprint, self.submit)
+        second, replayed_second = self.registry.submit_once('key-1', fingerprint, self.submit)
+
+        assert first == second == {'job_id': 'job-1'}
+        assert (replayed_first, replayed_second) == (False, True)
+        assert self.submitted == 1
+
+    def test_key_reused_for_different_request_conflicts(self):
+        """Test that one key cannot be used for two different requests."""
+        self.registry.submit_once('key-1', request_fingerprint('video', 'abc'), self.submit)
+        with pytest.raises(IdempotencyConflictError):
+            self.registry.submit_once('key-1', request_fingerprint('video', 'xyz'), self.submit)
+
+    def test_identical_request_attaches_only_while_reusable(self):
+        """Test that fingerprint matches reuse live jobs but not failed ones."""
+        fingerprint = request_fingerprint('transcript', 'abc', meeting_title='Sync')
+
+        self.registry.submit_once(None, fingerprint, self.submit)
+        body, replayed = self.registry.submit_once(None, fingerprint, self.submit,
+                                                   reusable=lambda previous: True)
+        assert replayed and body['job_id'] == 'job-1'
+
+        body, replayed = self.registry.submit_once(None, fingerprint, self.submit,
+                                                   reusable=lambda previous: False)
+        assert not replayed and body['job_id'] == 'job-2'
+        assert request_fingerprint('transcript', 'abc', meeting_title='Other') != fingerprint
@@ -0,0 +1,68 @@
+"""
+Test the background job manager
+"""
+import threading
+import pytest
+from api.job_manager import JobManager, Job, JobQueueFullError
+
+class TestJobManager:
+    """Test bounded background job execution."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.manager = JobManager(max_workers=1, max_queue_size=1, retention_seconds=60)
+
+    def teardown_method(self):
+        """Release worker threads."""
+        self.manager.shutdown(wait=True)
+
+    def test_job_records_stages_and_artifacts(self):
+        """Test that a completed job reports stage timings and artifact paths."""
+        def target(stage_callback, value):
+            stage_callback('transcribe', 'started')
+            stage_callback('transcribe', 'completed')
+            return {'success': True, 'pdf_file': f'/tmp/{value}.pdf', 'email_sent': True}
+
+        job = self.manager.submit('transcript', target, value='minutes')
+        self.manager.shutdown(wait=True)
+
+        info = job.to_dict()
+        assert info['status'] == Job.COMPLETED
+        assert info['stages']['transcribe']['status'] == Job.COMPLETED
+        assert info['stages']['transcribe']['duration'] is not None
+        assert info['artifacts'] == {'pdf_file': '/tmp/minutes.pdf'}
+
+    def test_failed_result_marks_job_failed(self):
+        """Test that an unsuccessful result marks the job as failed."""
+        cleaned = []
+
+        def target(stage_callback):
+            return {'success': False, 'error': 'transcription failed'}
+
+        job = self.manager.submit('audio', target, cleanup=lambda: cleaned.append(True))
+        self.manager.shutdown(wait=True)
+
+        assert job.status == Job.FAILED
+        assert job.error == 'transcription failed'
+        assert cleaned == [True]
+
+    def test_queue_capacity_is_enforced(self):
+        """Test that submissions beyond the queue size are rejected."""
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking(stage_callback):
+            started.set()
+            release.wait(5)
+            return {'success': True}
+
+        self.manager.submit('video', blocking)
+        started.wait(5)
+        self.manager.submit('video', blocking)
+
+        assert self.manager.get_stats()['running'] == 1
+        assert self.manager.queue_depth == 1
+        with pytest.raises(JobQueueFullError):
+            self.manager.submit('video', blocking)
+
+        release.set()
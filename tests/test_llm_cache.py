@@ -0,0 +1,72 @@
+"""
+Test the persistent LLM response cache
+"""
+import os
+import time
+import tempfile
+import pytest
+from unittest.mock import patch
+from services.llm_cache import LLMResponseCache
+from services.summarization_service import SummarizationService
+
+class TestLLMResponseCache:
+    """Test SQLite-backed prompt caching."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = LLMResponseCache(db_path=os.path.join(self.temp_dir.name, 'llm.sqlite3'),
+                                      ttl_seconds=60, max_bytes=1000)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.cache._conn.close()
+        self.temp_dir.cleanup()
+
+    def test_key_normalizes_whitespace_and_tracks_version(self):
+        """Test that indentation changes hit but template versions miss."""
+        key = LLMResponseCache.make_key('gemini', 1, "Summarize:\n    the meeting")
+
+        assert key == LLMResponseCache.make_key('gemini', 1, "Summarize: the meeting  ")
+        assert key != LLMResponseCache.make_key('gemini', 2, "Summarize: the meeting")
+        assert key != LLMResponseCache.make_key('other-model', 1, "Summarize: the meeting")
+
+    def test_expired_entries_miss(self):
+        """Test that entries older than the TTL are not returned."""
+        self.cache.put('key', 'gemini', 'answer')
+        assert self.cache.get('key') == 'answer'
+
+        with patch('services.llm_cache.time.time', return_value=time.time() + 120):
+            assert self.cache.get('key') is None
+
+        stats = self.cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_size_budget_evicts_least_recently_used(self):
+        """Test that the oldest accessed entries are evicted over budget."""
+        self.cache.put('a', 'gemini', 'x' * 400)
+        time.sleep(0.01)
+        self.cache.put('b', 'gemini', 'y' * 400)
+        time.sleep(0.01)
+        self.cache.get('a')
+        self.cache.put('c', 'gemini', 'z' * 400)
+
+        assert self.cache.get('b') is None
+        assert self.cache.get('a') is not None
+        assert self.cache.get_stats()['size_bytes'] <= 1000
+
+    def test_gpt_uses_cache_unless_opted_out(self):
+        """Test that repeated prompts skip Gemini unless caching is disabled."""
+        with patch('services.summarization_service.Config.validate_config'), \
+             patch('services.summarization_service.Config.LLM_CACHE_ENABLED', False):
+            service = SummarizationService()
+        service.cache = self.cache
+
+        with patch.object(service, '_generate', return_value='minutes') as generate:
+            assert service._gpt('prompt') == 'minutes'
+            assert service._gpt('prompt') == 'minutes'
+            assert generate.call_count == 1
+
+            service._gpt('prompt', use_cache=False)
+            assert generate.call_count == 2
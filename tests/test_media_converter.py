@@ -0,0 +1,130 @@
+"""
+Test ffmpeg-based audio extraction
+"""
+import os
+import pytest
+from unittest.mock import patch
+
+from services.media_converter import MediaConverter, NoAudioStreamError
+from utils import ffmpeg
+from utils.media_probe import clear_probe_cache, probe_media
+
+pytestmark = pytest.mark.skipif(not ffmpeg.is_available(), reason="ffmpeg not available")
+
+
+def make_video(path, audio_codec=None):
+    """Render a two-second test video, optionally with a sine-wave audio track."""
+    args = ['-y', '-f', 'lavfi', '-i', 'testsrc=size=64x64:rate=5:duration=2']
+    if audio_codec:
+        args += ['-f', 'lavfi', '-i', 'sine=frequency=440:duration=2', '-c:a', audio_codec]
+    args += ['-c:v', 'mpeg4', '-shortest', path]
+    ffmpeg.run_ffmpeg(args)
+    return path
+
+
+class TestMediaConverter:
+    """Test audio-stream extraction with the ffmpeg backend."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.converter = MediaConverter()
+        clear_probe_cache()
+
+    def test_stream_copies_acceptable_codec(self, tmp_path):
+        """Test that an AAC track is copied into an .m4a without re-encoding."""
+        video = make_video(str(tmp_path / 'meeting.mp4'), audio_codec='aac')
+
+        with patch('utils.ffmpeg.run_ffmpeg', wraps=ffmpeg.run_ffmpeg) as run:
+            output = self.converter.extract_audio(video, str(tmp_path / 'meeting_audio.mp3'))
+
+        assert output.endswith('meeting_audio.m4a')
+        assert os.path.getsize(output) > 0
+        assert any('copy' in call.args[0] for call in run.call_args_list)
+        streams = ffmpeg.get_streams(output)
+        assert [s['codec_type'] for s in streams] == ['audio']
+
+    def test_transcodes_unsupported_codec(self, tmp_path):
+        """Test that codecs the transcriber rejects are re-encoded to MP3."""
+        video = make_video(str(tmp_path / 'meeting.mkv'), audio_codec='pcm_s24le')
+
+        output = self.converter.extract_audio(video, str(tmp_path / 'meeting_audio'))
+
+        assert output.endswith('.mp3')
+        assert ffmpeg.get_streams(output)[0]['codec_name'] == 'mp3'
+
+    def test_video_without_audio_raises(self, tmp_path):
+        """Test that a clear error is raised when there is no audio stream."""
+        video = make_video(str(tmp_path / 'silent.mp4'))
+
+        with pytest.raises(NoAudioStreamError):
+            self.converter.extract_audio(video, str(tmp_path / 'silent_audio.mp3'))
+
+    def test_convert_mp4_to_mp3_produces_mp3(self, tmp_path):
+        """Test that the legacy MP3 conversion goes through ffmpeg."""
+        video = make_video(str(tmp_path / 'meeting.mp4'), audio_codec='aac')
+        output = str(tmp_path / 'meeting.mp3')
+
+        assert self.converter.convert_mp4_to_mp3(video, output) == output
+        assert ffmpeg.get_streams(output)[0]['codec_name'] == 'mp3'
+
+    def test_get_video_info_reads_streams(self, tmp_path):
+        """Test that video info includes container and audio stream details."""
+        video = make_video(str(tmp_path / 'meeting.mp4'), audio_codec='aac')
+
+        info = self.converter.get_video_info(video)
+
+        assert info['duration'] == pytest.approx(2.0, abs=0.2)
+        assert info['size'] == [64, 64]
+        assert info['fps'] == pytest.approx(5.0)
+        assert info['audio_codec'] == 'aac'
+        assert info['channels'] == 1
+        assert info['has_audio'] is True
+
+    def test_probe_is_cached_per_content(self, tmp_path):
+        """Test that identical files are probed only once."""
+        video = make_video(str(tmp_path / 'meeting.mp4'), audio_codec='aac')
+        copy = tmp_path / 'reupload.mp4'
+        copy.write_bytes(open(video, 'rb').read())
+
+        with patch('utils.media_probe.probe', wraps=ffmpeg.probe) as probe:
+            first = probe_media(video)
+            second = probe_media(str(copy))
+
+        assert probe.call_count == 1
+        assert second['filename'] == 'reupload.mp4'
+        assert first['sha256'] == second['sha256']
+
+    def test_speech_profile_is_mono_16k_opus(self, tmp_path):
+        """Test that the speech profile downmixes, resamples and shrinks the audio."""
+        video = make_video(str(tmp_path / 'meeting.mp4'), audio_codec='pcm_s16le')
+
+        output = self.converter.encode_for_transcription(video, str(tmp_path / 'speech'))
+
+        audio = ffmpeg.get_streams(output)[0]
+        assert output.endswith('.ogg')
+        assert audio['codec_name'] == 'opus'
+        assert audio['channels'] == 1
+        assert os.path.getsize(output) < os.path.getsize(video)
+
+    def test_speech_outputs_of_same_named_uploads_do_not_collide(self, tmp_path):
+        """Test that default speech paths are unique per call, not per file name."""
+        first = make_video(str(tmp_path / 'meeting.mp4'), audio_codec='pcm_s16le')
+        os.makedirs(tmp_path / 'other')
+        second = make_video(str(tmp_path / 'other' / 'meeting.mp4'), audio_codec='aac')
+
+        with patch('services.media_converter.Config.OUTPUT_FOLDER', tmp_path):
+            outputs = [self.converter.encode_for_transcription(video) for video in (first, second)]
+
+        assert outputs[0] != outputs[1]
+        assert all(os.path.basename(path).startswith('meeting_speech_') for path in outputs)
+        assert all(os.path.getsize(path) > 0 for path in outputs)
+
+    def test_speech_bitrate_fits_size_ceiling(self):
+        """Test that the bitrate shrinks with duration within the configured range."""
+        five_hours = MediaConverter.speech_bitrate_kbps(5 * 3600, 24 * 1024 * 1024)
+        eight_hours = MediaConverter.speech_bitrate_kbps(8 * 3600, 24 * 1024 * 1024)
+
+        assert five_hours * 1000 / 8 * 5 * 3600 <= 24 * 1024 * 1024
+        assert eight_hours < five_hours
+        assert MediaConverter.speech_bitrate_kbps(60, 24 * 1024 * 1024) == 16
+        assert MediaConverter.speech_bitrate_kbps(100 * 3600, 24 * 1024 * 1024) == 8
@@ -0,0 +1,76 @@
+"""
+Test the stage pipeline engine
+"""
+import threading
+import pytest
+
+from api.pipeline import Pipeline, Stage, StageFailedError
+
+
+class TestPipeline:
+    """Test dependency ordering, concurrency, partial runs and failures."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.calls = []
+        self.barrier = threading.Barrier(2, timeout=5)
+
+        def record(name, value):
+            self.calls.append(name)
+            return value
+
+        self.pipeline = Pipeline([
+            Stage('convert', lambda media: record('convert', f'{media}.ogg'), ['media'], ['audio']),
+            Stage('transcribe', lambda audio: record('transcribe', f'text of {audio}'),
+                  ['audio'], ['transcript']),
+            # Independent of each other: both must be running for the barrier to release
+            Stage('summarize', lambda text: (self.barrier.wait(), 'summary')[1],
+                  ['transcript'], ['sections']),
+            Stage('participants', lambda text: (self.barrier.wait(), 'Alice')[1],
+                  ['transcript'], ['participants']),
+            Stage('pdf', lambda sections, people: record('pdf', f'{sections}/{people}.pdf'),
+                  ['sections', 'participants'], ['pdf_file']),
+        ], max_workers=2)
+
+    def test_runs_all_stages_in_dependency_order(self):
+        """Test a full run, including independent stages running concurrently."""
+        timings = {}
+        events = []
+
+        artifacts = self.pipeline.run({'media': 'meeting'}, timings=timings,
+                                      stage_callback=lambda stage, event: events.append((stage, event)))
+
+        assert artifacts['pdf_file'] == 'summary/Alice.pdf'
+        assert self.calls == ['convert', 'transcribe', 'pdf']
+        assert set(timings) == {'convert', 'transcribe', 'summarize', 'participants', 'pdf'}
+        assert events[0] == ('convert', 'started')
+        assert events[-1] == ('pdf', 'completed')
+
+    def test_start_at_later_stage_with_existing_artifacts(self):
+        """Test that earlier stages are skipped when their artifacts are supplied."""
+        artifacts = self.pipeline.run({'transcript': 'hello'}, start_at='summarize')
+
+        assert artifacts['pdf_file'] == 'summary/Alice.pdf'
+        assert self.calls == ['pdf']
+
+    def test_missing_artifact_is_rejected_before_running(self):
+        """Test that a partial run without the needed inputs fails up front."""
+        with pytest.raises(ValueError, match='transcript'):
+            self.pipeline.run({'media': 'meeting'}, start_at='summarize')
+        assert self.calls == []
+
+    def test_failed_stage_stops_dependents(self):
+        """Test that a failure names the stage and later stages do not run."""
+        def fail(audio):
+            raise RuntimeError('transcription service down')
+
+        self.pipeline.stages[1] = Stage('transcribe', fail, ['audio'], ['transcript'])
+        timings = {}
+
+        with pytest.raises(StageFailedError) as excinfo:
+            self.pipeline.run({'media': 'meeting'}, timings=timings)
+
+        assert excinfo.value.stage == 'transcribe'
+        assert str(excinfo.value) == 'transcription service down'
+        assert 'transcribe' in timings
+        assert self.calls == ['convert']
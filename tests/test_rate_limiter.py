@@ -0,0 +1,128 @@
+"""
+Test the provider rate limiter and retry backoff
+"""
+import pytest
+from unittest.mock import patch
+
+from services.rate_limiter import RateLimiter, TokenBucket, is_retryable, retry_after_seconds
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class ThrottledError(Exception):
+    """Stand-in for a provider 429 error."""
+
+    def __init__(self, retry_after=None):
+        super().__init__('rate limited')
+        self.status_code = 429
+        self.response = FakeResponse({'retry-after': retry_after} if retry_after else {})
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+class TestTokenBucket:
+    """Test reservations against the refill rate."""
+
+    def test_reservations_beyond_capacity_wait_for_refill(self):
+        """Test that the bucket is free up to capacity, then charges wait time."""
+        bucket = TokenBucket(rate_per_minute=60, capacity=2)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(1.0, abs=0.05)
+        assert bucket.reserve() == pytest.approx(2.0, abs=0.05)
+
+    def test_block_for_delays_every_reservation(self):
+        """Test that a server-requested pause applies to later callers."""
+        bucket = TokenBucket(rate_per_minute=600)
+        bucket.block_for(5)
+        assert bucket.reserve() == pytest.approx(5.0, abs=0.05)
+
+
+class TestRateLimiter:
+    """Test budgets, retries and metrics."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.limiter = RateLimiter(limits={'gemini': (60, 1000), 'gemini:flash': (1, 0)},
+                                   max_retries=2, backoff_base=1.0, backoff_max=8.0)
+
+    def test_model_budget_applies_on_top_of_provider_budget(self):
+        """Test that the stricter per-model budget decides the wait."""
+        with patch('services.rate_limiter.time.sleep') as sleep:
+            assert self.limiter.acquire('gemini', 'flash') == 0
+            waited = self.limiter.acquire('gemini', 'flash')
+
+        assert waited == pytest.approx(60.0, abs=0.1)
+        sleep.assert_called_once()
+        stats = self.limiter.get_stats()['gemini:flash']
+        assert stats['requests'] == 2
+        assert stats['max_wait_seconds'] == pytest.approx(60.0, abs=0.1)
+
+    def test_token_budget(self):
+        """Test that large prompts wait for the token bucket."""
+        with patch('services.rate_limiter.time.sleep'):
+            assert self.limiter.acquire('gemini', tokens=1000) == 0
+            assert self.limiter.acquire('gemini', tokens=500) == pytest.approx(30.0, abs=0.1)
+
+    def test_try_acquire_never_queues(self):
+        """Test that optional calls get budget only when it is free right now."""
+        assert self.limiter.try_acquire('gemini', 'flash')
+        assert not self.limiter.try_acquire('gemini', 'flash')
+
+        # The per-model bucket refused, so the provider's reservation was refunded
+        with patch('services.rate_limiter.time.sleep'):
+            assert self.limiter.acquire('gemini', tokens=1000) == 0
+        assert not self.limiter.try_acquire('gemini', tokens=100)
+        assert self.limiter.get_stats()['gemini:flash']['requests'] == 1
+
+    def test_retries_honor_retry_after(self):
+        """Test that a 429 is retried after the server's Retry-After delay."""
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ThrottledError(retry_after='3')
+            return 'ok'
+
+        with patch('services.rate_limiter.time.sleep') as sleep:
+            assert self.limiter.call('gemini', None, flaky) == 'ok'
+
+        assert len(attempts) == 2
+        assert 3.0 in [call.args[0] for call in sleep.call_args_list]
+        stats = self.limiter.get_stats()['gemini']
+        assert stats['throttled'] == 1 and stats['retries'] == 1
+
+    def test_non_retryable_errors_raise_immediately(self):
+        """Test that client errors are not retried."""
+        def bad():
+            raise BadRequestError('invalid prompt')
+
+        with patch('services.rate_limiter.time.sleep'):
+            with pytest.raises(BadRequestError):
+                self.limiter.call('gemini', None, bad)
+        assert self.limiter.get_stats()['gemini']['retries'] == 0
+
+    def test_gives_up_after_max_retries(self):
+        """Test that persistent throttling eventually surfaces the error."""
+        def always_throttled():
+            raise ThrottledError()
+
+        with patch('services.rate_limiter.time.sleep'):
+            with pytest.raises(ThrottledError):
+                self.limiter.call('gemini', None, always_throttled)
+        assert self.limiter.get_stats()['gemini']['retries'] == 2
+
+    def test_error_classification(self):
+        """Test retryable detection and Retry-After parsing."""
+        assert is_retryable(ThrottledError())
+        assert not is_retryable(BadRequestError())
+        assert not is_retryable(ValueError('bug'))
+        assert retry_after_seconds(ThrottledError(retry_after='2.5')) == 2.5
+        assert retry_after_seconds(ThrottledError()) is None
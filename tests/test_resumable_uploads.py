@@ -0,0 +1,101 @@
+"""
+Test resumable chunked uploads
+"""
+import hashlib
+import io
+import os
+import pytest
+
+from api.resumable_uploads import ResumableUploadManager, UploadError, parse_content_range
+
+DATA = os.urandom(10 * 1024 + 123)
+CHUNK = 4096
+
+
+def sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class TestResumableUploads:
+    """Test ranged writes, resume offsets and finalization."""
+
+    def make_manager(self, root):
+        return ResumableUploadManager(root=str(root), chunk_size=CHUNK,
+                                      max_size=1024 * 1024, ttl_seconds=3600)
+
+    def put(self, manager, upload_id, start, checksum=True):
+        chunk = DATA[start:start + CHUNK]
+        end = start + len(chunk) - 1
+        return manager.write_chunk(upload_id, start, end, len(DATA), io.BytesIO(chunk),
+                                   checksum=sha(chunk) if checksum else None)
+
+    def test_out_of_order_chunks_and_resume_offset(self, tmp_path):
+        """Test that the offset is the first missing byte and survives a restart."""
+        manager = self.make_manager(tmp_path)
+        upload_id = manager.create('meeting.mp4', len(DATA), sha(DATA))['upload_id']
+
+        self.put(manager, upload_id, 0)
+        status = self.put(manager, upload_id, 2 * CHUNK)
+        assert status['offset'] == CHUNK
+        assert status['missing'] == [[CHUNK, 2 * CHUNK]]
+        assert not status['complete']
+
+        restarted = self.make_manager(tmp_path)
+        status = self.put(restarted, upload_id, CHUNK)
+        assert status['complete']
+        assert status['offset'] == len(DATA)
+
+        file_path, upload_dir = restarted.finalize(upload_id)
+        assert file_path.endswith('meeting.mp4')
+        assert open(file_path, 'rb').read() == DATA
+
+    def test_checksum_mismatch_is_not_recorded(self, tmp_path):
+        """Test that a corrupted chunk is rejected and must be resent."""
+        manager = self.make_manager(tmp_path)
+        upload_id = manager.create('meeting.mp4', len(DATA))['upload_id']
+
+        with pytest.raises(UploadError) as excinfo:
+            manager.write_chunk(upload_id, 0, CHUNK - 1, len(DATA),
+                                io.BytesIO(DATA[:CHUNK]), checksum=sha(b'other'))
+
+        assert excinfo.value.status == 422
+        assert manager.status(upload_id)['received_bytes'] == 0
+
+    def test_rejected_resend_keeps_the_received_bytes(self, tmp_path):
+        """Test that an overlapping resend with a bad checksum doesn't overwrite data."""
+        manager = self.make_manager(tmp_path)
+        upload_id = manager.create('meeting.mp4', len(DATA))['upload_id']
+        self.put(manager, upload_id, 0)
+
+        with pytest.raises(UploadError) as excinfo:
+            manager.write_chunk(upload_id, 0, CHUNK - 1, len(DATA),
+                                io.BytesIO(b'x' * CHUNK), checksum=sha(DATA[:CHUNK]))
+        assert excinfo.value.status == 422
+
+        self.put(manager, upload_id, CHUNK)
+        self.put(manager, upload_id, 2 * CHUNK)
+        file_path, upload_dir = manager.finalize(upload_id)
+        assert open(file_path, 'rb').read() == DATA
+
+    def test_finalize_requires_every_byte(self, tmp_path):
+        """Test that an incomplete upload cannot be finalized."""
+        manager = self.make_manager(tmp_path)
+        upload_id = manager.create('meeting.mp4', len(DATA))['upload_id']
+        self.put(manager, upload_id, 0, checksum=False)
+
+        with pytest.raises(UploadError) as excinfo:
+            manager.finalize(upload_id)
+        assert excinfo.value.status == 409
+
+    def test_rejects_invalid_ranges(self, tmp_path):
+        """Test range validation against the declared size and chunk limit."""
+        manager = self.make_manager(tmp_path)
+        upload_id = manager.create('meeting.mp4', len(DATA))['upload_id']
+
+        with pytest.raises(UploadError):
+            manager.write_chunk(upload_id, 0, 9, len(DATA) + 1, io.BytesIO(b'x' * 10))
+        with pytest.raises(UploadError):
+            manager.write_chunk(upload_id, 0, CHUNK * 2, len(DATA), io.BytesIO(DATA))
+        assert parse_content_range('bytes 0-99/1000') == (0, 99, 1000)
+        with pytest.raises(UploadError):
+            parse_content_range('0-99')
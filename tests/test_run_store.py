@@ -0,0 +1,114 @@
+"""
+Test checkpointed pipeline runs
+"""
+import json
+import os
+import pytest
+from unittest.mock import MagicMock
+
+from api.meeting_assistant import MeetingAssistant
+from api.run_store import RunStore
+
+
+def make_assistant(run_root):
+    """Build a MeetingAssistant with mocked services and a temporary run store."""
+    assistant = MeetingAssistant.__new__(MeetingAssistant)
+    assistant.summarization_service = MagicMock()
+    assistant.summarization_service.summarize_meeting.return_value = ({'summary': 'Agreed'}, 'Alice')
+    assistant.pdf_service = MagicMock()
+    assistant.email_service = MagicMock()
+    assistant.run_store = RunStore(root=str(run_root), retention_seconds=3600)
+    assistant.pipeline = assistant.build_pipeline()
+    return assistant
+
+
+class TestRunStore:
+    """Test run persistence and retention."""
+
+    def test_checkpoints_survive_a_new_store(self, tmp_path):
+        """Test that stage outputs are read back by a fresh store instance."""
+        store = RunStore(root=str(tmp_path), retention_seconds=3600)
+        run_id = store.create('transcript')
+        store.start(run_id, 'summarize', {'transcript': 'hello'})
+        store.save_stage(run_id, 'summarize', {'sections': {'summary': 'x'}, 'participants': 'Bob'})
+        store.finish(run_id, {'success': False, 'error': 'smtp down', 'failed_stage': 'pdf'})
+
+        run = RunStore(root=str(tmp_path)).get(run_id)
+
+        assert run['status'] == RunStore.FAILED
+        assert run['completed_stages'] == ['summarize']
+        assert run['artifacts']['participants'] == 'Bob'
+        assert run['failed_stage'] == 'pdf'
+        assert RunStore(root=str(tmp_path)).get('../etc') is None
+
+    def test_keeps_upload_only_until_transcript_exists(self, tmp_path):
+        """Test that failed runs without a transcript hold on to their upload."""
+        store = RunStore(root=str(tmp_path), retention_seconds=3600)
+        run_id = store.create('video', upload_dir=str(tmp_path / 'upload'))
+        store.start(run_id, 'probe', {'media_file': 'meeting.mp4'})
+        store.finish(run_id, {'success': False})
+        assert store.keeps_upload(run_id)
+
+        store.save_stage(run_id, 'transcribe', {'transcript': 'hello'})
+        assert not store.keeps_upload(run_id)
+
+    def test_purges_expired_runs_and_their_uploads(self, tmp_path):
+        """Test that stale runs are deleted along with a kept upload."""
+        upload_dir = tmp_path / 'upload'
+        upload_dir.mkdir()
+        store = RunStore(root=str(tmp_path / 'runs'), retention_seconds=1)
+        run_id = store.create('video', upload_dir=str(upload_dir))
+        run = store.get(run_id)
+        run['updated_at'] -= 10
+        with open(os.path.join(store.root, run_id, 'run.json'), 'w') as f:
+            json.dump(run, f)
+
+        assert store.purge_expired() == 1
+        assert store.get(run_id) is None
+        assert not upload_dir.exists()
+
+
+class TestResumeRun:
+    """Test resuming a run at its first incomplete stage."""
+
+    def test_failed_email_resumes_without_resummarizing(self, tmp_path):
+        """Test that only the email stage runs again after an email failure."""
+        assistant = make_assistant(tmp_path / 'runs')
+        pdf_path = tmp_path / 'minutes.pdf'
+        pdf_path.write_bytes(b'%PDF-1.4')
+        assistant.pdf_service.create_minutes_pdf.return_value = str(pdf_path)
+        assistant.email_service.send_meeting_summary.return_value = False
+
+        first = assistant.process_transcript_text('We agreed.', ['a@example.com'])
+        assert first['success'] is False
+        assert first['failed_stage'] == 'email'
+
+        assistant.email_service.send_meeting_summary.return_value = True
+        resumed = assistant.resume_run(first['run_id'])
+
+        assert resumed['success'] is True
+        assert resumed['resumed_from'] == 'email'
+        assert set(resumed['stage_timings']) == {'email'}
+        assert resumed['pdf_file'] == str(pdf_path)
+        assert assistant.summarization_service.summarize_meeting.call_count == 1
+        assert assistant.pdf_service.create_minutes_pdf.call_count == 1
+
+    def test_missing_output_file_reruns_its_stage(self, tmp_path):
+        """Test that a deleted PDF is rendered again before retrying the email."""
+        assistant = make_assistant(tmp_path / 'runs')
+        assistant.pdf_service.create_minutes_pdf.return_value = str(tmp_path / 'gone.pdf')
+        assistant.email_service.send_meeting_summary.return_value = False
+
+        first = assistant.process_transcript_text('We agreed.', ['a@example.com'])
+        assistant.email_service.send_meeting_summary.return_value = True
+        resumed = assistant.resume_run(first['run_id'])
+
+        assert resumed['resumed_from'] == 'pdf'
+        assert assistant.summarization_service.summarize_meeting.call_count == 1
+        assert assistant.pdf_service.create_minutes_pdf.call_count == 2
+
+    def test_unknown_run(self, tmp_path):
+        """Test that resuming an unknown run raises KeyError."""
+        assistant = make_assistant(tmp_path / 'runs')
+        with pytest.raises(KeyError):
+            assistant.resume_run('missing')
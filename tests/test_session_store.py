@@ -0,0 +1,224 @@
+"""
+Test chat session storage backends
+"""
+import time
+import pytest
+from unittest.mock import patch
+
+from api.conversation_memory import ConversationMemory
+from api.session_store import (
+    MemorySessionStore, SQLiteSessionStore, create_session_store, session_nbytes
+)
+from services.transcript_index import NUMPY_AVAILABLE
+from utils.sweeper import PeriodicSweeper
+
+
+def make_session(transcript='Alice: We ship on Friday.'):
+    """A session shaped like the ones /chat/start creates."""
+    memory = ConversationMemory(max_messages=30)
+    memory.add_user_message('When do we ship?')
+    memory.add_ai_message('On Friday.')
+    return {
+        'transcript': transcript,
+        'created_at': '2024-01-15T10:00:00',
+        'memory': memory,
+        'segments': None,
+        'index': None,
+        'messages': [{'user': 'When do we ship?', 'bot': 'On Friday.'}],
+    }
+
+
+class TestSQLiteSessionStore:
+    """Test the SQLite backend shared between worker processes."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.session = make_session()
+
+    def test_sessions_are_shared_between_store_instances(self, tmp_path):
+        """Test that a session written by one worker is readable by another."""
+        db_path = tmp_path / 'sessions.sqlite3'
+        SQLiteSessionStore(db_path)['abc'] = self.session
+
+        other = SQLiteSessionStore(db_path)
+        session = other['abc']
+
+        assert 'abc' in other and len(other) == 1
+        assert session['transcript'] == self.session['transcript']
+        assert session['messages'] == self.session['messages']
+        assert isinstance(session['memory'], ConversationMemory)
+        assert session['memory'].get_recent_context() == self.session['memory'].get_recent_context()
+
+    def test_changes_must_be_written_back(self, tmp_path):
+        """Test that reads are copies and assignment persists changes."""
+        store = SQLiteSessionStore(tmp_path / 'sessions.sqlite3')
+        store['abc'] = self.session
+
+        session = store['abc']
+        session['memory'].add_user_message('Who owns the docs?')
+        assert len(store['abc']['memory'].messages) == 2
+
+        store['abc'] = session
+        assert len(store['abc']['memory'].messages) == 3
+
+    def test_delete_and_missing_sessions(self, tmp_path):
+        """Test that deleted or unknown sessions raise KeyError and get() returns None."""
+        store = SQLiteSessionStore(tmp_path / 'sessions.sqlite3')
+        store['abc'] = self.session
+        del store['abc']
+
+        assert store.get('abc') is None
+        assert list(store) == []
+        with pytest.raises(KeyError):
+            del store['abc']
+
+    @pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not available")
+    def test_index_is_rebuilt_from_the_transcript(self, tmp_path):
+        """Test that a worker without a cached index rebuilds it on read."""
+        transcript = ' '.join(f"Speaker {i}: item {i} on the roadmap." for i in range(400))
+        db_path = tmp_path / 'sessions.sqlite3'
+        with patch('services.transcript_index.Config.CHAT_FULL_TRANSCRIPT_MAX_TOKENS', 100):
+            SQLiteSessionStore(db_path)['abc'] = make_session(transcript)
+            index = SQLiteSessionStore(db_path)['abc']['index']
+
+        assert index is not None
+        assert 'item 399' in index.search('item 399', top_k=1)[0]['text']
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    """Build either backend with the given TTL and byte budget."""
+    def factory(ttl_seconds=0, max_bytes=0):
+        if request.param == 'memory':
+            return MemorySessionStore(ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+        return SQLiteSessionStore(tmp_path / 'sessions.sqlite3', ttl_seconds=ttl_seconds,
+                                  max_bytes=max_bytes)
+    return factory
+
+
+class TestSessionLimits:
+    """Test idle expiry, LRU eviction and byte accounting on both backends."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.session = make_session('Alice: We ship on Friday. ' * 40)
+        self.size = session_nbytes(self.session)
+
+    def test_idle_sessions_expire(self, make_store):
+        """Test that sessions unused for longer than the TTL are gone."""
+        store = make_store(ttl_seconds=0.2)
+        store['idle'] = self.session
+        store['busy'] = self.session
+
+        for _ in range(3):
+            time.sleep(0.1)
+            store['busy']
+
+        assert store.get('idle') is None
+        assert store.get('busy') is not None
+        assert store.get_memory_usage_stats()['expirations'] == 1
+
+    def test_expired_sessions_are_not_counted(self, make_store):
+        """Test that len() and iteration skip sessions a read would reject."""
+        store = make_store(ttl_seconds=0.1)
+        store['old'] = self.session
+        time.sleep(0.15)
+        store['new'] = self.session
+
+        assert len(store) == 1
+        assert list(store) == ['new']
+
+    def test_purge_expired_removes_unread_sessions(self, make_store):
+        """Test that the sweeper's purge drops sessions nobody reads again."""
+        store = make_store(ttl_seconds=0.1)
+        store['a'] = self.session
+        store['b'] = self.session
+        time.sleep(0.15)
+        store['c'] = self.session
+
+        assert store.purge_expired() == 2
+        assert list(store) == ['c']
+
+    def test_least_recently_used_sessions_are_evicted_over_budget(self, make_store):
+        """Test that writes past the byte budget evict the least recently used sessions."""
+        store = make_store(max_bytes=self.size * 3)
+        for session_id in ('a', 'b', 'c'):
+            store[session_id] = self.session
+            time.sleep(0.01)
+        store['a']
+        store['d'] = self.session
+
+        assert sorted(store) == ['a', 'c', 'd']
+        stats = store.get_memory_usage_stats()
+        assert stats['evictions'] == 1
+        assert stats['total_bytes'] <= self.size * 3
+
+    def test_session_over_budget_on_its_own_is_kept(self, make_store):
+        """Test that the session just written is never the one evicted."""
+        store = make_store(max_bytes=self.size // 2)
+        store['a'] = self.session
+        store['b'] = self.session
+
+        assert list(store) == ['b']
+
+    def test_byte_accounting_follows_updates(self, make_store):
+        """Test that per-session bytes are re-measured on every write."""
+        store = make_store()
+        store['abc'] = self.session
+        before = store.get_memory_usage_stats()['sessions']['abc']['bytes']
+
+        session = store['abc']
+        session['memory'].add_user_message('x' * 1000)
+        store['abc'] = session
+
+        stats = store.get_memory_usage_stats()
+        assert before == self.size
+        assert stats['sessions']['abc']['bytes'] >= before + 1000
+        assert stats['total_bytes'] == stats['sessions']['abc']['bytes']
+
+    def test_peek_does_not_refresh_a_session(self, make_store):
+        """Test that inspecting a session leaves its idle time running."""
+        store = make_store(ttl_seconds=0.15)
+        store['abc'] = self.session
+        time.sleep(0.1)
+        assert store.peek('abc')['transcript'] == self.session['transcript']
+        time.sleep(0.1)
+
+        assert store.get('abc') is None
+        assert store.peek('missing') is None
+
+
+class TestCreateSessionStore:
+    """Test backend selection."""
+
+    def test_backend_from_config(self, tmp_path):
+        """Test that SESSION_STORE_BACKEND picks the store."""
+        with patch('api.session_store.Config.SESSION_STORE_BACKEND', 'memory'):
+            store = create_session_store()
+        assert isinstance(store, MemorySessionStore)
+
+        session = make_session()
+        store['abc'] = session
+        assert store['abc'] is session
+
+        with patch('api.session_store.Config.SESSION_STORE_BACKEND', 'redis'):
+            with pytest.raises(ValueError):
+                create_session_store()
+
+
+class TestPeriodicSweeper:
+    """Test the background purge of expired sessions."""
+
+    def test_sweeper_purges_in_the_background(self):
+        """Test that the sweeper removes expired sessions without any reads."""
+        store = MemorySessionStore(ttl_seconds=0.05)
+        store['abc'] = make_session()
+        sweeper = PeriodicSweeper('chat sessions', 0.05, store.purge_expired)
+        sweeper.start()
+        try:
+            time.sleep(0.3)
+        finally:
+            sweeper.stop()
+
+        assert store.peek('abc') is None
+        assert store.get_memory_usage_stats()['expirations'] == 1
@@ -0,0 +1,102 @@
+"""
+Test silence removal and the stripped-to-original time map
+"""
+import os
+import pytest
+from unittest.mock import patch
+
+from services.silence_stripper import NUMPY_AVAILABLE, SilenceStripper, TimeMap
+from utils import ffmpeg
+
+class TestTimeMap:
+    """Test mapping stripped timestamps back to recording time."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        # Kept 0-10s and 25-40s; 10-25s was removed
+        self.time_map = TimeMap([(0.0, 10.0), (25.0, 40.0)])
+
+    def test_to_original_skips_removed_span(self):
+        """Test that times after a cut are shifted by the removed silence."""
+        assert self.time_map.duration == 25.0
+        assert self.time_map.to_original(5.0) == 5.0
+        assert self.time_map.to_original(12.0) == 27.0
+        assert self.time_map.to_original(99.0) == 40.0
+
+    def test_remap_segments_and_words(self):
+        """Test that segment and word timestamps are remapped."""
+        segments = [{'text': 'Hello', 'start': 9.0, 'end': 11.0,
+                     'words': [{'word': 'Hello', 'start': 10.5, 'end': 11.0}]}]
+
+        remapped = self.time_map.remap_segments(segments)
+
+        assert remapped[0]['start'] == 9.0
+        assert remapped[0]['end'] == 26.0
+        assert remapped[0]['words'][0]['start'] == 25.5
+        assert segments[0]['end'] == 11.0
+
+    def test_round_trips_through_dict(self):
+        """Test serialization for storing the map with job results."""
+        restored = TimeMap.from_dict(self.time_map.to_dict())
+        assert restored.spans == self.time_map.spans
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not available")
+class TestSilenceStripper:
+    """Test energy-based silence detection."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.stripper = SilenceStripper(frame_ms=30, threshold_db=-50, noise_margin_db=10,
+                                        min_silence=2.0, keep_silence=0.3)
+
+    def test_speech_spans_compress_long_silence(self):
+        """Test that only silences over the minimum are cut, keeping padding."""
+        import numpy as np
+        frames_per_second = 1000 / 30
+        loud = np.full(int(3 * frames_per_second), -10.0)
+        short_gap = np.full(int(1 * frames_per_second), -90.0)
+        long_gap = np.full(int(6 * frames_per_second), -90.0)
+        energy = np.concatenate([loud, short_gap, loud, long_gap, loud])
+        duration = len(energy) * 0.03
+
+        spans = self.stripper._speech_spans(energy, duration)
+
+        assert len(spans) == 2
+        removed = duration - sum(end - start for start, end in spans)
+        assert removed == pytest.approx(6.0 - 0.6, abs=0.1)
+
+    @pytest.mark.skipif(not ffmpeg.is_available(), reason="ffmpeg not available")
+    def test_strip_removes_silence_from_file(self, tmp_path):
+        """Test decoding, stripping and the reported seconds removed."""
+        source = str(tmp_path / 'meeting.wav')
+        ffmpeg.run_ffmpeg([
+            '-y', '-f', 'lavfi',
+            '-i', "aevalsrc='if(between(t,2,7),0,0.5*sin(2*PI*440*t))':s=16000:d=9",
+            source
+        ])
+
+        result = self.stripper.strip(source, str(tmp_path / 'voiced.wav'))
+
+        assert result['original_duration'] == pytest.approx(9.0, abs=0.05)
+        assert result['seconds_removed'] == pytest.approx(4.4, abs=0.1)
+        assert ffmpeg.get_duration(result['audio_file']) == pytest.approx(4.6, abs=0.1)
+        assert result['time_map'].to_original(2.5) == pytest.approx(6.9, abs=0.1)
+
+    @pytest.mark.skipif(not ffmpeg.is_available(), reason="ffmpeg not available")
+    def test_default_output_is_unique_per_call(self, tmp_path):
+        """Test that concurrent uploads with the same name get separate stripped files."""
+        source = str(tmp_path / 'meeting.wav')
+        ffmpeg.run_ffmpeg([
+            '-y', '-f', 'lavfi',
+            '-i', "aevalsrc='if(between(t,1,4),0,0.5*sin(2*PI*440*t))':s=16000:d=5",
+            source
+        ])
+
+        with patch('services.silence_stripper.Config.OUTPUT_FOLDER', tmp_path):
+            first = self.stripper.strip(source)['audio_file']
+            second = self.stripper.strip(source)['audio_file']
+
+        assert first != second
+        assert os.path.basename(first).startswith('meeting_voiced_')
+        assert os.path.exists(first) and os.path.exists(second)
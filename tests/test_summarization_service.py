@@ -0,0 +1,199 @@
+"""
+Test the summarization service orchestration (Gemini calls are mocked)
+"""
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from services.summarization_service import (
+    SummarizationService, SECTION_PROMPTS, FALLBACK_PARTICIPANTS, STRUCTURED_SUMMARY_PROMPT
+)
+from services.rate_limiter import RateLimiter
+from utils.circuit_breaker import CircuitOpenError
+
+class ServerError(Exception):
+    status_code = 503
+
+TRANSCRIPT = "Alice: Let's ship on Friday.\nBob: Agreed, I'll update the docs."
+
+def make_service():
+    """Create a service without touching real configuration or the network."""
+    with patch('services.summarization_service.Config.validate_config'), \
+         patch('services.summarization_service.Config.LLM_CACHE_ENABLED', False):
+        return SummarizationService()
+
+class TestSummarizationService:
+    """Test section generation, ordering and fallbacks."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.service = make_service()
+        self.section_names = [name for name, _ in SECTION_PROMPTS]
+
+    def answer_by_section(self, prompt):
+        """Fake Gemini: echo which section the prompt asks for."""
+        for name, template in SECTION_PROMPTS:
+            if template.split('\n')[1].strip() in prompt:
+                return f"{name} text"
+        return "Alice, Bob"
+
+    def test_concurrent_summary_keeps_section_order(self):
+        """Test that concurrent generation returns sections in the fixed order."""
+        with patch.object(self.service, '_gpt', side_effect=self.answer_by_section):
+            sections = self.service.generate_meeting_summary(TRANSCRIPT, concurrent=True, mode='fanout')
+
+        assert list(sections.keys()) == self.section_names
+        assert sections["Action Items"] == "Action Items text"
+
+    def test_failed_section_falls_back_individually(self):
+        """Test that one failing prompt only replaces its own section."""
+        def flaky(prompt):
+            if "decisions" in prompt:
+                raise Exception("Error generating content with Gemini: 500")
+            return self.answer_by_section(prompt)
+
+        with patch.object(self.service, '_gpt', side_effect=flaky), \
+             patch('services.summarization_service.Config.SUMMARY_SECTION_RETRIES', 0):
+            sections = self.service.generate_meeting_summary(TRANSCRIPT, concurrent=True, mode='fanout')
+
+        assert list(sections.keys()) == self.section_names
+        assert sections["Executive Summary"] == "Executive Summary text"
+        assert "could not be generated automatically" in sections["Decisions Made"]
+
+    def test_section_is_retried(self):
+        """Test that a transient failure is retried before falling back."""
+        calls = []
+        def transient(prompt):
+            calls.append(prompt)
+            if len(calls) == 1:
+                raise Exception("Error generating content with Gemini: 503")
+            return "recovered"
+
+        with patch.object(self.service, '_gpt', side_effect=transient), \
+             patch('services.summarization_service.Config.SUMMARY_RETRY_BACKOFF', 0):
+            result = self.service._generate_section("Executive Summary", "prompt")
+
+        assert result == "recovered"
+        assert len(calls) == 2
+
+    def test_errors_retried_by_the_rate_limiter_are_not_retried_again(self):
+        """Test that a section gives up once the limiter has exhausted its retries."""
+        model = MagicMock()
+        model.generate_content.side_effect = ServerError("unavailable")
+
+        with patch('services.summarization_service.get_client_registry') as registry, \
+             patch('services.summarization_service.Config.LLM_CIRCUIT_BREAKER_ENABLED', False), \
+             patch('services.summarization_service.Config.LLM_HEDGING_ENABLED', False), \
+             patch('services.summarization_service.Config.RATE_LIMIT_ENABLED', True), \
+             patch('services.rate_limiter.get_rate_limiter', return_value=RateLimiter(
+                 limits={}, max_retries=2, backoff_base=0, backoff_max=0)), \
+             patch('services.summarization_service.Config.SUMMARY_RETRY_BACKOFF', 0):
+            registry.return_value.gemini_model.return_value = model
+            with pytest.raises(Exception, match="Error generating content"):
+                self.service._generate_section("Executive Summary", "prompt")
+
+        assert model.generate_content.call_count == 3
+
+    def test_all_sections_failing_uses_full_fallback(self):
+        """Test that a complete outage falls back to the basic summary."""
+        with patch.object(self.service, '_gpt', side_effect=Exception("unavailable")), \
+             patch('services.summarization_service.Config.SUMMARY_SECTION_RETRIES', 0):
+            sections, participants = self.service.summarize_meeting(TRANSCRIPT, concurrent=True, mode='fanout')
+
+        assert sections == self.service.generate_fallback_summary(TRANSCRIPT)
+        assert participants == FALLBACK_PARTICIPANTS
+
+    def test_open_circuit_falls_back_without_retrying(self):
+        """Test that an open circuit goes straight to the fallback summary."""
+        with patch.object(self.service, '_gpt', side_effect=CircuitOpenError('Gemini', 30)) as gpt, \
+             patch('services.summarization_service.Config.SUMMARY_RETRY_BACKOFF', 5):
+            sections, participants = self.service.summarize_meeting(TRANSCRIPT, concurrent=True, mode='fanout')
+
+        assert gpt.call_count == len(SECTION_PROMPTS) + 1
+        assert sections == self.service.generate_fallback_summary(TRANSCRIPT)
+        assert participants == FALLBACK_PARTICIPANTS
+
+    def test_summarize_meeting_includes_participants(self):
+        """Test that participants are extracted alongside the sections."""
+        with patch.object(self.service, '_gpt', side_effect=self.answer_by_section):
+            sections, participants = self.service.summarize_meeting(TRANSCRIPT, concurrent=True, mode='fanout')
+
+        assert participants == "Alice, Bob"
+        assert "Participants" not in sections
+
+    def test_structured_summary_uses_one_call(self):
+        """Test that a valid JSON response covers every section in one call."""
+        payload = {name: f"{name} text" for name, _ in SECTION_PROMPTS}
+        payload["Participants"] = ["Alice", "Bob"]
+        response = "```json\n" + json.dumps(payload) + "\n```"
+
+        with patch.object(self.service, '_gpt', return_value=response) as gpt:
+            sections, participants = self.service.summarize_meeting(TRANSCRIPT, mode='single')
+
+        assert gpt.call_count == 1
+        assert list(sections.keys()) == self.section_names
+        assert participants == "Alice, Bob"
+
+    def test_structured_summary_regenerates_invalid_keys(self):
+        """Test that only missing or invalid keys fall back to their own prompts."""
+        payload = {name: f"{name} text" for name, _ in SECTION_PROMPTS}
+        payload["Decisions Made"] = ""
+        del payload["Action Items"]
+        payload["Participants"] = "Alice, Bob"
+
+        def fake(prompt):
+            if prompt == STRUCTURED_SUMMARY_PROMPT.format(transcript=TRANSCRIPT):
+                return json.dumps(payload)
+            return "regenerated"
+
+        with patch.object(self.service, '_gpt', side_effect=fake) as gpt:
+            sections, participants = self.service.summarize_meeting(TRANSCRIPT, mode='single')
+
+        assert gpt.call_count == 3
+        assert sections["Decisions Made"] == "regenerated"
+        assert sections["Action Items"] == "regenerated"
+        assert sections["Executive Summary"] == "Executive Summary text"
+        assert participants == "Alice, Bob"
+
+    def test_mode_follows_transcript_size(self):
+        """Test that short transcripts use a single call and long ones fan out."""
+        with patch('services.summarization_service.Config.SUMMARY_MODE', 'auto'), \
+             patch('services.summarization_service.Config.SUMMARY_SINGLE_CALL_MAX_CHARS', 100):
+            assert self.service._choose_mode("short") == 'single'
+            assert self.service._choose_mode("x" * 101) == 'fanout'
+
+    def test_map_reduce_covers_whole_transcript_and_caches_chunks(self):
+        """Test that long transcripts are condensed per chunk and chunk notes are reused."""
+        transcript = "\n".join(f"Speaker {i}: point number {i} about the roadmap." for i in range(200))
+        prompts = []
+
+        def fake(prompt):
+            prompts.append(prompt)
+            return "notes" if "Transcript part:" in prompt else "section"
+
+        with patch.object(self.service, '_gpt', side_effect=fake), \
+             patch('services.summarization_service.Config.SUMMARY_DIRECT_MAX_TOKENS', 500), \
+             patch('services.summarization_service.Config.SUMMARY_CHUNK_TOKENS', 400):
+            sections, _ = self.service.summarize_meeting(transcript, mode='mapreduce')
+            first_run = sum("Transcript part:" in p for p in prompts)
+            self.service.summarize_meeting(transcript, mode='mapreduce')
+            second_run = sum("Transcript part:" in p for p in prompts) - first_run
+
+        assert first_run > 1
+        assert second_run == 0
+        assert any("point number 199" in p for p in prompts)
+        assert sections["Executive Summary"] == "section"
+
+    def test_stream_generate_yields_text_chunks(self):
+        """Test that streamed chunks are forwarded in order and empty chunks skipped."""
+        model = MagicMock()
+        model.generate_content.return_value = iter([
+            SimpleNamespace(text='Ship '), SimpleNamespace(text=''), SimpleNamespace(text='on Friday.')
+        ])
+        with patch('services.summarization_service.get_client_registry') as registry, \
+             patch('services.summarization_service.Config.RATE_LIMIT_ENABLED', False):
+            registry.return_value.gemini_model.return_value = model
+            chunks = self.service.stream_generate("When do we ship?")
+
+        assert model.generate_content.call_args.kwargs['stream'] is True
+        assert list(chunks) == ['Ship ', 'on Friday.']
@@ -0,0 +1,47 @@
+"""
+Test transcript chunking
+"""
+import pytest
+from services.transcript_chunker import chunk_transcript, estimate_tokens
+
+class TestTranscriptChunker:
+    """Test splitting transcripts under a token budget."""
+
+    def test_short_transcript_is_one_chunk(self):
+        """Test that a transcript within budget is not split."""
+        chunks = chunk_transcript("Alice: Hello.\nBob: Hi there.", max_tokens=100)
+
+        assert len(chunks) == 1
+        assert chunks[0]['text'] == "Alice: Hello.\nBob: Hi there."
+
+    def test_chunks_respect_budget_and_keep_all_text(self):
+        """Test that chunks stay under budget and split on sentence boundaries."""
+        sentences = [f"Sentence number {i} is about topic {i}." for i in range(50)]
+        transcript = " ".join(sentences)
+
+        chunks = chunk_transcript(transcript, max_tokens=40)
+
+        assert len(chunks) > 1
+        assert all(estimate_tokens(chunk['text']) <= 40 for chunk in chunks)
+        rejoined = " ".join(chunk['text'] for chunk in chunks)
+        assert rejoined == transcript
+
+    def test_segments_provide_timestamps(self):
+        """Test that segment boundaries carry start and end times into chunks."""
+        segments = [
+            {'text': ' First part of the meeting.', 'start': 0.0, 'end': 30.0},
+            {'text': ' Second part of the meeting.', 'start': 30.0, 'end': 60.0},
+            {'text': ' Third part of the meeting.', 'start': 60.0, 'end': 90.0},
+        ]
+
+        chunks = chunk_transcript("", max_tokens=10, segments=segments)
+
+        assert [chunk['start'] for chunk in chunks] == [0.0, 30.0, 60.0]
+        assert chunks[-1]['end'] == 90.0
+
+    def test_oversized_sentence_is_split_on_words(self):
+        """Test that a single sentence longer than the budget is still split."""
+        chunks = chunk_transcript("word " * 200, max_tokens=20)
+
+        assert len(chunks) > 1
+        assert all(len(chunk['text']) <= 80 for chunk in chunks)
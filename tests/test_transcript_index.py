@@ -0,0 +1,64 @@
+"""
+Test BM25 retrieval over transcript chunks
+"""
+import pytest
+from unittest.mock import patch
+
+from services.transcript_index import NUMPY_AVAILABLE, TranscriptIndex, build_context, build_index, tokenize
+
+TOPICS = [
+    "Alice: The marketing budget for the spring campaign is forty thousand dollars.",
+    "Bob: Hiring two backend engineers is approved, interviews start next week.",
+    "Carol: The database migration to Postgres finishes on Friday.",
+    "Dave: Customer churn dropped after the onboarding redesign.",
+]
+
+
+def make_segments():
+    """One segment per topic sentence, each 60 seconds long."""
+    return [{'text': text, 'start': i * 60.0, 'end': i * 60.0 + 55} for i, text in enumerate(TOPICS * 5)]
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not available")
+class TestTranscriptIndex:
+    """Test indexing, ranking and prompt context."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.segments = make_segments()
+        self.transcript = ' '.join(seg['text'] for seg in self.segments)
+        self.index = TranscriptIndex(self.transcript, self.segments, chunk_tokens=20)
+
+    def test_tokenize_drops_stop_words(self):
+        """Test that stop words and possessives are removed."""
+        assert tokenize("What is Alice's budget for the campaign?") == ['alice', 'budget', 'campaign']
+
+    def test_search_ranks_relevant_chunks_first(self):
+        """Test that the best chunks contain the queried topic."""
+        hits = self.index.search("When does the Postgres migration finish?", top_k=3)
+
+        assert hits
+        assert all('Postgres' in hit['text'] for hit in hits)
+        assert hits[0]['score'] >= hits[-1]['score']
+
+    def test_unknown_terms_match_nothing(self):
+        """Test that a query with no indexed terms returns no chunks."""
+        assert self.index.search("quantum entanglement", top_k=3) == []
+        assert len(self.index.spread(3)) == 3
+
+    def test_context_uses_excerpts_with_timestamps(self):
+        """Test that the context holds top chunks in meeting order with timestamps."""
+        context = build_context(self.transcript, self.index, "hiring backend engineers", top_k=2)
+
+        assert context.count('[Part ') == 2
+        assert 'interviews start next week' in context
+        assert '0:01:00-' in context
+        assert 'forty thousand' not in context
+
+    def test_small_transcripts_are_sent_in_full(self):
+        """Test that no index is built when the whole transcript fits the budget."""
+        with patch('services.transcript_index.Config.CHAT_FULL_TRANSCRIPT_MAX_TOKENS', 10000):
+            assert build_index(self.transcript, self.segments) is None
+        with patch('services.transcript_index.Config.CHAT_FULL_TRANSCRIPT_MAX_TOKENS', 10):
+            assert build_index(self.transcript, self.segments) is not None
+        assert build_context(self.transcript, None, "anything") == self.transcript
@@ -0,0 +1,83 @@
+"""
+Test the transcription result cache
+"""
+import os
+import time
+import tempfile
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from services.transcription_cache import TranscriptionCache
+from services.transcription_service import TranscriptionService
+
+class TestTranscriptionCache:
+    """Test content-addressed caching of transcriptions."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = TranscriptionCache(cache_dir=os.path.join(self.temp_dir.name, 'cache'),
+                                        max_bytes=10_000)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.temp_dir.cleanup()
+
+    def test_key_depends_on_model_and_format(self):
+        """Test that the same audio with another model gets another key."""
+        key = TranscriptionCache.make_key('abc', 'whisper-large-v3', 'verbose_json')
+
+        assert key != TranscriptionCache.make_key('abc', 'whisper-large-v3-turbo', 'verbose_json')
+        assert key != TranscriptionCache.make_key('abc', 'whisper-large-v3', 'json')
+        assert key == TranscriptionCache.make_key('abc', 'whisper-large-v3', 'verbose_json')
+
+    def test_round_trip_counts_hits_and_misses(self):
+        """Test storing and loading a result updates the counters."""
+        assert self.cache.get('missing') is None
+        self.cache.put('key', {'text': 'hello', 'segments': [{'start': 0.0, 'end': 1.0, 'text': 'hello'}]})
+
+        assert self.cache.get('key')['segments'][0]['text'] == 'hello'
+        stats = self.cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that eviction keeps the cache under its byte budget."""
+        payload = {'text': 'x' * 4000}
+        self.cache.put('first', payload)
+        self.cache.put('second', payload)
+        past = time.time() - 60
+        os.utime(self.cache._entry_path('first'), (past, past))
+        self.cache.get('first')  # Refresh 'first', so 'second' is now least recently used
+        self.cache.put('third', payload)
+
+        assert self.cache.get('second') is None
+        assert self.cache.get('first') is not None
+        assert self.cache.get_stats()['size_bytes'] <= 10_000
+
+    def test_service_skips_api_on_cache_hit(self):
+        """Test that transcribing the same audio twice calls the API once."""
+        audio_path = os.path.join(self.temp_dir.name, 'meeting.mp3')
+        with open(audio_path, 'wb') as f:
+            f.write(b'ID3' + os.urandom(1024))
+
+        with patch('services.transcription_service.Config.validate_config'), \
+             patch('services.transcription_service.get_client_registry'):
+            service = TranscriptionService()
+        service.cache = self.cache
+        service.client = MagicMock()
+        service.client.audio.transcriptions.create.return_value = SimpleNamespace(
+            text='hello team', language='en', duration=1.5,
+            segments=[{'start': 0.0, 'end': 1.5, 'text': 'hello team'}]
+        )
+
+        output = os.path.join(self.temp_dir.name, 'out.txt')
+        first = service.transcribe_audio(audio_path, output)
+        second = service.transcribe_audio(audio_path, output)
+
+        assert service.client.audio.transcriptions.create.call_count == 1
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert second['text'] == 'hello team'
+        assert second['segments'] == first['segments']
@@ -0,0 +1,50 @@
+"""
+Test text-to-speech requests through the provider rate limiter (Groq is mocked)
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+
+from services.rate_limiter import RateLimiter
+from services.tts_service import TTSService
+
+
+class ThrottledError(Exception):
+    """Stand-in for a provider 429 error."""
+    status_code = 429
+
+
+class TestTTSService:
+    """Test speech generation with a fake Groq client."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.client = MagicMock()
+        with patch('services.tts_service.get_client_registry') as registry:
+            registry.return_value.groq.return_value = self.client
+            self.service = TTSService()
+
+    def test_speech_request_goes_through_the_limiter(self, tmp_path):
+        """Test that a throttled request is retried and the audio is written."""
+        response = MagicMock()
+        self.client.audio.speech.create.side_effect = [ThrottledError(), response]
+        limiter = RateLimiter(limits={}, max_retries=2, backoff_base=0, backoff_max=0)
+        output_file = tmp_path / 'answer.wav'
+
+        with patch('services.rate_limiter.Config.RATE_LIMIT_ENABLED', True), \
+             patch('services.rate_limiter.get_rate_limiter', return_value=limiter):
+            path = self.service.generate_speech('We ship on Friday.', output_file)
+
+        assert path == str(output_file)
+        assert self.client.audio.speech.create.call_count == 2
+        assert self.client.audio.speech.create.call_args.kwargs == {
+            'model': 'playai-tts', 'voice': 'Celeste-PlayAI',
+            'input': 'We ship on Friday.', 'response_format': 'wav',
+        }
+        response.write_to_file.assert_called_once_with(str(output_file))
+        assert limiter.get_stats()['groq:playai-tts']['retries'] == 1
+
+    def test_empty_text_is_rejected(self):
+        """Test that no request is sent for empty text."""
+        with pytest.raises(Exception, match="Text cannot be empty"):
+            self.service.generate_speech('  ')
+        self.client.audio.speech.create.assert_not_called()
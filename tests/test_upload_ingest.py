@@ -0,0 +1,167 @@
+"""
+Test streaming upload ingestion
+"""
+import hashlib
+import io
+import os
+import pytest
+from unittest.mock import patch
+from flask import Flask, jsonify, request
+
+from api.upload_ingest import (
+    IngestRequest, Mp4LayoutProbe, StreamingUpload, UploadRejectedError,
+    discard_unclaimed_uploads, pipelined_audio, save_upload, sniff_container
+)
+from utils import ffmpeg
+from utils.hashing import file_sha256
+
+MP3_BYTES = b'ID3\x04\x00\x00\x00\x00\x00\x00' + os.urandom(200 * 1024)
+
+
+def make_app():
+    """Build a minimal app that uses the streaming request class."""
+    app = Flask(__name__)
+    app.request_class = IngestRequest
+    app.teardown_request(discard_unclaimed_uploads)
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        try:
+            file = request.files[request.form.get('field', 'audio_file')]
+        except UploadRejectedError as e:
+            return jsonify({'error': str(e)}), 400
+        if request.form.get('claim') != 'yes':
+            return jsonify({'claimed': False})
+        streamed = isinstance(file.stream, StreamingUpload)
+        file_path, upload_dir = save_upload(file)
+        return jsonify({'path': file_path, 'dir': upload_dir, 'streamed': streamed,
+                        'audio': pipelined_audio(file)})
+
+    return app
+
+
+class TestUploadIngest:
+    """Test that uploads are streamed to disk, hashed and sniffed."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.client = make_app().test_client()
+
+    def post(self, data, filename, claim='yes'):
+        return self.client.post('/upload', content_type='multipart/form-data', data={
+            'claim': claim,
+            'audio_file': (io.BytesIO(data), filename),
+        })
+
+    def test_streams_upload_into_upload_folder(self, tmp_path):
+        """Test that the file lands in UPLOAD_FOLDER with its digest remembered."""
+        with patch('config.Config.UPLOAD_FOLDER', tmp_path):
+            response = self.post(MP3_BYTES, 'meeting.mp3')
+
+        body = response.get_json()
+        assert response.status_code == 200
+        assert body['streamed'] is True
+        assert body['path'].startswith(str(tmp_path))
+        assert open(body['path'], 'rb').read() == MP3_BYTES
+        expected = hashlib.sha256(MP3_BYTES).hexdigest()
+        with patch('utils.hashing.hashlib.sha256', side_effect=AssertionError('re-hashed')):
+            assert file_sha256(body['path']) == expected
+
+    def test_rejects_mismatched_magic_bytes(self, tmp_path):
+        """Test that a file whose contents don't match its extension is rejected."""
+        with patch('config.Config.UPLOAD_FOLDER', tmp_path):
+            response = self.post(b'<html>' + b'x' * 4096, 'meeting.mp3')
+
+        assert response.status_code == 400
+        assert 'does not look like a .mp3 file' in response.get_json()['error']
+        assert list(tmp_path.iterdir()) == []
+
+    def test_unclaimed_upload_is_removed(self, tmp_path):
+        """Test that uploads the handler did not keep are deleted after the request."""
+        with patch('config.Config.UPLOAD_FOLDER', tmp_path):
+            response = self.post(MP3_BYTES, 'meeting.mp3', claim='no')
+
+        assert response.status_code == 200
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sniff_container(self):
+        """Test container detection from magic bytes."""
+        assert sniff_container(b'\x00\x00\x00\x20ftypisom') == 'mp4'
+        assert sniff_container(b'RIFF\x00\x00\x00\x00WAVEfmt ') == 'wav'
+        assert sniff_container(b'\x1a\x45\xdf\xa3\x01\x00') == 'matroska'
+        assert sniff_container(b'\xff\xfb\x90\x00') == 'mp3'
+        assert sniff_container(b'hello world!') is None
+
+
+def make_video(path, *extra_args):
+    """Render a two-second test video with a sine-wave audio track."""
+    ffmpeg.run_ffmpeg([
+        '-y', '-f', 'lavfi', '-i', 'testsrc=size=64x64:rate=5:duration=2',
+        '-f', 'lavfi', '-i', 'sine=frequency=440:duration=2',
+        '-c:v', 'mpeg4', '-c:a', 'aac', '-shortest', *extra_args, path
+    ])
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.skipif(not ffmpeg.is_available(), reason="ffmpeg not available")
+class TestPipelinedExtraction:
+    """Test audio extraction while a video upload is still arriving."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.client = make_app().test_client()
+
+    def post(self, data, filename):
+        return self.client.post('/upload', content_type='multipart/form-data', data={
+            'claim': 'yes',
+            'field': 'video_file',
+            'video_file': (io.BytesIO(data), filename),
+        })
+
+    def layout(self, data, block=1000):
+        probe = Mp4LayoutProbe()
+        for start in range(0, len(data), block):
+            decision = probe.feed(data[start:start + block])
+            if decision is not None:
+                return decision
+        return None
+
+    def test_mp4_layout_probe(self, tmp_path):
+        """Test that only MP4s with the index before the media data are streamable."""
+        faststart = make_video(str(tmp_path / 'fast.mp4'), '-movflags', '+faststart')
+        moov_last = make_video(str(tmp_path / 'slow.mp4'))
+
+        assert self.layout(faststart) is True
+        assert self.layout(moov_last) is False
+
+    def test_streamable_video_is_extracted_and_not_kept(self, tmp_path):
+        """Test that a Matroska upload yields audio without keeping the video."""
+        data = make_video(str(tmp_path / 'source.mkv'))
+        upload_root = tmp_path / 'uploads'
+        upload_root.mkdir()
+
+        with patch('config.Config.UPLOAD_FOLDER', upload_root), \
+                patch('config.Config.PIPELINED_KEEP_VIDEO', False):
+            response = self.post(data, 'meeting.mkv')
+
+        body = response.get_json()
+        assert response.status_code == 200
+        assert body['path'] is None
+        assert body['audio'].endswith('.flac')
+        assert ffmpeg.get_duration(body['audio']) == pytest.approx(2.0, abs=0.1)
+        assert not os.path.exists(os.path.join(body['dir'], 'meeting.mkv'))
+
+    def test_moov_last_mp4_falls_back_to_saved_file(self, tmp_path):
+        """Test that an MP4 with its index at the end is saved whole and not piped."""
+        data = make_video(str(tmp_path / 'source.mp4'))
+        upload_root = tmp_path / 'uploads'
+        upload_root.mkdir()
+
+        with patch('config.Config.UPLOAD_FOLDER', upload_root):
+            response = self.post(data, 'meeting.mp4')
+
+        body = response.get_json()
+        assert response.status_code == 200
+        assert body['audio'] is None
+        assert open(body['path'], 'rb').read() == data
@@ -0,0 +1,130 @@
+"""
+Circuit breaker for calls to an external provider.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider that keeps failing, and probes for recovery.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately with CircuitOpenError. Once ``recovery_seconds``
+    have passed it is half-open: a single probe call goes through, closing the
+    circuit on success or re-opening it on failure. Only errors for which
+    ``is_failure`` returns True count; others (bad requests, blocked content)
+    say nothing about the provider's health.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float,
+                 is_failure: Callable[[Exception], bool] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.is_failure = is_failure or (lambda error: True)
+        self._state = CircuitBreaker.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._rejected = 0
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state, reporting an expired open circuit as half-open."""
+        with self._lock:
+            if self._state == CircuitBreaker.OPEN and self._retry_after() <= 0:
+                return CircuitBreaker.HALF_OPEN
+            return self._state
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call func(*args, **kwargs) if the circuit allows it.
+
+        Args:
+            func (Callable): The provider call
+
+        Returns:
+            Any: The call's result
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a probe is already running
+        """
+        probe = self._admit()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record(probe, failed=self.is_failure(e))
+            raise
+        self._record(probe, failed=False)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker statistics.
+
+        Returns:
+            Dict[str, Any]: State, consecutive failures, times opened and
+                            calls rejected while open
+        """
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'opened': self._opened,
+                'rejected': self._rejected,
+            }
+
+    def _admit(self) -> bool:
+        """Let a call through or raise. Returns True if the call is the recovery probe."""
+        with self._lock:
+            if self._state == CircuitBreaker.CLOSED:
+                return False
+            retry_after = self._retry_after()
+            if retry_after <= 0 and not self._probing:
+                self._state = CircuitBreaker.HALF_OPEN
+                self._probing = True
+                return True
+            self._rejected += 1
+            raise CircuitOpenError(self.name, max(retry_after, 0.0))
+
+    def _record(self, probe: bool, failed: bool):
+        with self._lock:
+            if probe:
+                self._probing = False
+            if not failed:
+                if self._state != CircuitBreaker.CLOSED:
+                    print(f"✅ {self.name} recovered, closing circuit")
+                self._state = CircuitBreaker.CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if probe or (self._state == CircuitBreaker.CLOSED
+                         and self._failures >= self.failure_threshold):
+                if self._state == CircuitBreaker.CLOSED:
+                    print(f"⚠️  {self.name} failed {self._failures} times in a row, "
+                          f"opening circuit for {self.recovery_seconds:.0f}s")
+                self._state = CircuitBreaker.OPEN
+                self._opened_at = time.monotonic()
+                self._opened += 1
+
+    def _retry_after(self) -> float:
+        """Seconds until an open circuit allows a probe. Caller holds the lock."""
+        return self._opened_at + self.recovery_seconds - time.monotonic()
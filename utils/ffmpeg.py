@@ -0,0 +1,416 @@
+"""
+Thin helpers around the ffmpeg command-line tool.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+
+_DURATION_PATTERN = re.compile(r'Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)')
+_SILENCE_START_PATTERN = re.compile(r'silence_start:\s*(-?\d+(?:\.\d+)?)')
+_SILENCE_END_PATTERN = re.compile(r'silence_end:\s*(-?\d+(?:\.\d+)?)')
+_STREAM_PATTERN = re.compile(r'Stream #\d+:\d+\S*:\s*(Audio|Video):\s*(\w+)(.*)')
+_SAMPLE_RATE_PATTERN = re.compile(r'(\d+)\s*Hz')
+_BITRATE_PATTERN = re.compile(r'(\d+)\s*kb/s')
+_RESOLUTION_PATTERN = re.compile(r'\b(\d{2,5})x(\d{2,5})\b')
+_FPS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*fps')
+_CHANNEL_LAYOUTS = {'mono': 1, 'stereo': 2, '2.1': 3, 'quad': 4, '4.0': 4, '5.0': 5, '5.1': 6, '7.1': 8}
+
+_ffmpeg_exe: Optional[str] = None
+_ffprobe_exe: Optional[str] = None
+
+
+class FFmpegError(Exception):
+    """Raised when ffmpeg is unavailable, fails or times out."""
+
+
+def get_ffmpeg_exe() -> str:
+    """
+    Locate the ffmpeg binary.
+
+    Prefers ffmpeg on PATH and falls back to the binary bundled with
+    imageio-ffmpeg, which MoviePy already depends on.
+
+    Returns:
+        str: Path to the ffmpeg executable.
+
+    Raises:
+        FFmpegError: If no ffmpeg binary can be found.
+    """
+    global _ffmpeg_exe
+    if _ffmpeg_exe:
+        return _ffmpeg_exe
+
+    exe = shutil.which('ffmpeg')
+    if not exe:
+        try:
+            import imageio_ffmpeg
+            exe = imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            exe = None
+    if not exe:
+        raise FFmpegError("ffmpeg not found. Install ffmpeg or imageio-ffmpeg.")
+
+    _ffmpeg_exe = exe
+    return exe
+
+
+def get_ffprobe_exe() -> Optional[str]:
+    """
+    Locate the ffprobe binary on PATH or next to the ffmpeg binary.
+
+    Returns:
+        str or None: Path to ffprobe, or None if it is not installed.
+    """
+    global _ffprobe_exe
+    if _ffprobe_exe:
+        return _ffprobe_exe
+
+    exe = shutil.which('ffprobe')
+    if not exe and is_available():
+        sibling = os.path.join(os.path.dirname(get_ffmpeg_exe()), 'ffprobe')
+        if os.path.isfile(sibling) and os.access(sibling, os.X_OK):
+            exe = sibling
+
+    _ffprobe_exe = exe
+    return exe
+
+
+def is_available() -> bool:
+    """Check whether an ffmpeg binary can be found."""
+    try:
+        get_ffmpeg_exe()
+        return True
+    except FFmpegError:
+        return False
+
+
+def run_ffmpeg(args: List[str], timeout: float = None, check: bool = True) -> subprocess.CompletedProcess:
+    """
+    Run ffmpeg with the given arguments.
+
+    Args:
+        args (List[str]): Arguments after the executable name.
+        timeout (float, optional): Seconds before the process is killed.
+                                   Defaults to Config.FFMPEG_TIMEOUT.
+        check (bool): Raise FFmpegError on a non-zero exit status.
+
+    Returns:
+        subprocess.CompletedProcess: Finished process with text stderr.
+
+    Raises:
+        FFmpegError: If ffmpeg times out or (with check) exits with an error.
+    """
+    cmd = [get_ffmpeg_exe(), '-hide_banner', '-nostdin'] + args
+    try:
+        proc = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=timeout or Config.FFMPEG_TIMEOUT,
+        )
+    except subprocess.TimeoutExpired:
+        raise FFmpegError(f"ffmpeg timed out after {timeout or Config.FFMPEG_TIMEOUT} seconds")
+
+    proc.stderr = proc.stderr.decode('utf-8', errors='replace')
+    if check and proc.returncode != 0:
+        raise FFmpegError(f"ffmpeg failed: {_last_lines(proc.stderr)}")
+    return proc
+
+
+def spawn_ffmpeg(args: List[str], stderr_path: str) -> subprocess.Popen:
+    """
+    Start ffmpeg reading its input from stdin.
+
+    Args:
+        args (List[str]): Arguments after the executable name; use 'pipe:0' as the input.
+        stderr_path (str): File that receives ffmpeg's log output.
+
+    Returns:
+        subprocess.Popen: Running process with a writable stdin.
+    """
+    with open(stderr_path, 'wb') as stderr:
+        return subprocess.Popen(
+            [get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error'] + args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+
+
+def iter_pcm(media_path: str, sample_rate: int = 16000, block_bytes: int = 1024 * 1024,
+             timeout: float = None) -> Iterator[bytes]:
+    """
+    Decode a media file to mono signed 16-bit PCM and yield it in blocks.
+
+    Args:
+        media_path (str): Path to the media file.
+        sample_rate (int): Output sample rate in Hz.
+        block_bytes (int): Bytes per yielded block (the last block may be shorter).
+        timeout (float, optional): Seconds before decoding is aborted.
+                                   Defaults to Config.FFMPEG_TIMEOUT.
+
+    Yields:
+        bytes: Little-endian int16 samples.
+
+    Raises:
+        FFmpegError: If ffmpeg fails or times out.
+    """
+    timeout = timeout or Config.FFMPEG_TIMEOUT
+    cmd = [get_ffmpeg_exe(), '-hide_banner', '-nostdin', '-loglevel', 'error',
+           '-i', media_path, '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-']
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            block = proc.stdout.read(block_bytes)
+            if not block:
+                break
+            if time.monotonic() > deadline:
+                raise FFmpegError(f"ffmpeg timed out after {timeout} seconds")
+            yield block
+        stderr = proc.stderr.read().decode('utf-8', errors='replace')
+        if proc.wait() != 0:
+            raise FFmpegError(f"ffmpeg failed: {_last_lines(stderr)}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
+
+def get_duration(media_path: str) -> Optional[float]:
+    """
+    Read a media file's duration from ffmpeg's input summary.
+
+    Args:
+        media_path (str): Path to the media file.
+
+    Returns:
+        float or None: Duration in seconds, or None if ffmpeg does not report it.
+    """
+    proc = run_ffmpeg(['-i', media_path], check=False)
+    match = _DURATION_PATTERN.search(proc.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def probe(media_path: str, timeout: float = 60) -> Dict[str, Any]:
+    """
+    Read container and stream metadata, preferring ffprobe's JSON output.
+
+    Falls back to parsing ffmpeg's input summary when ffprobe is not installed.
+
+    Args:
+        media_path (str): Path to the media file.
+        timeout (float): Seconds before the probe is killed.
+
+    Returns:
+        Dict[str, Any]: 'duration' (seconds), 'bit_rate' (bits per second),
+                        'format_name', 'streams' and 'backend'. Each stream has
+                        'codec_type' and 'codec_name' and, where known,
+                        'sample_rate', 'channels', 'bit_rate', 'width', 'height'
+                        and 'fps'. Missing values are None.
+
+    Raises:
+        FFmpegError: If no probing tool is available or probing times out.
+    """
+    ffprobe = get_ffprobe_exe()
+    if not ffprobe:
+        return describe_input(media_path)
+
+    cmd = [ffprobe, '-v', 'error', '-print_format', 'json',
+           '-show_format', '-show_streams', media_path]
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise FFmpegError(f"ffprobe timed out after {timeout} seconds")
+    if proc.returncode != 0:
+        stderr = proc.stderr.decode('utf-8', errors='replace')
+        raise FFmpegError(f"ffprobe failed: {_last_lines(stderr)}")
+
+    data = json.loads(proc.stdout.decode('utf-8', errors='replace') or '{}')
+    fmt = data.get('format', {})
+    streams = []
+    for raw in data.get('streams', []):
+        if raw.get('codec_type') not in ('audio', 'video'):
+            continue
+        streams.append({
+            'codec_type': raw['codec_type'],
+            'codec_name': raw.get('codec_name'),
+            'sample_rate': _to_int(raw.get('sample_rate')),
+            'channels': raw.get('channels'),
+            'bit_rate': _to_int(raw.get('bit_rate')),
+            'width': raw.get('width'),
+            'height': raw.get('height'),
+            'fps': _frame_rate(raw.get('avg_frame_rate')),
+        })
+    return {
+        'duration': _to_float(fmt.get('duration')),
+        'bit_rate': _to_int(fmt.get('bit_rate')),
+        'format_name': fmt.get('format_name'),
+        'streams': streams,
+        'backend': 'ffprobe',
+    }
+
+
+def describe_input(media_path: str) -> Dict[str, Any]:
+    """
+    Read media metadata from ffmpeg's input summary (``ffmpeg -i``).
+
+    Args:
+        media_path (str): Path to the media file.
+
+    Returns:
+        Dict[str, Any]: Same shape as probe(), with 'backend' set to 'ffmpeg'.
+    """
+    proc = run_ffmpeg(['-i', media_path], check=False)
+    duration = None
+    bit_rate = None
+    format_name = None
+    streams = []
+
+    for line in proc.stderr.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('Input #') and ', from ' in stripped:
+            format_name = stripped.split(', ', 1)[1].rsplit(', from ', 1)[0]
+            continue
+        if stripped.startswith('Duration:'):
+            match = _DURATION_PATTERN.search(stripped)
+            if match:
+                hours, minutes, seconds = match.groups()
+                duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+            rate = _BITRATE_PATTERN.search(stripped)
+            if rate:
+                bit_rate = int(rate.group(1)) * 1000
+            continue
+
+        match = _STREAM_PATTERN.search(stripped)
+        if not match:
+            continue
+        codec_type, codec_name, details = match.groups()
+        stream = {
+            'codec_type': codec_type.lower(),
+            'codec_name': codec_name.lower(),
+            'sample_rate': None,
+            'channels': None,
+            'bit_rate': None,
+            'width': None,
+            'height': None,
+            'fps': None,
+        }
+        bitrate = _BITRATE_PATTERN.search(details)
+        if bitrate:
+            stream['bit_rate'] = int(bitrate.group(1)) * 1000
+        if codec_type == 'Audio':
+            rate = _SAMPLE_RATE_PATTERN.search(details)
+            if rate:
+                stream['sample_rate'] = int(rate.group(1))
+            for field in details.split(','):
+                layout = field.split('(')[0].strip()
+                if layout in _CHANNEL_LAYOUTS:
+                    stream['channels'] = _CHANNEL_LAYOUTS[layout]
+                elif layout.endswith(' channels'):
+                    stream['channels'] = int(layout.split()[0])
+        else:
+            resolution = _RESOLUTION_PATTERN.search(details)
+            if resolution:
+                stream['width'], stream['height'] = int(resolution.group(1)), int(resolution.group(2))
+            fps = _FPS_PATTERN.search(details)
+            if fps:
+                stream['fps'] = float(fps.group(1))
+        streams.append(stream)
+
+    return {
+        'duration': duration,
+        'bit_rate': bit_rate,
+        'format_name': format_name,
+        'streams': streams,
+        'backend': 'ffmpeg',
+    }
+
+
+def get_streams(media_path: str) -> List[Dict[str, Any]]:
+    """
+    List the audio and video streams of a media file.
+
+    Args:
+        media_path (str): Path to the media file.
+
+    Returns:
+        List[Dict[str, Any]]: Streams as described in probe().
+    """
+    return describe_input(media_path)['streams']
+
+
+def detect_silences(media_path: str, noise_db: float = -35.0,
+                    min_silence: float = 0.5) -> List[Tuple[float, float]]:
+    """
+    Find silent intervals with ffmpeg's silencedetect filter.
+
+    Args:
+        media_path (str): Path to the media file.
+        noise_db (float): Level below which audio counts as silence, in dB.
+        min_silence (float): Minimum silence length in seconds.
+
+    Returns:
+        List[Tuple[float, float]]: (start, end) of each silence, in seconds.
+    """
+    proc = run_ffmpeg([
+        '-i', media_path, '-vn',
+        '-af', f'silencedetect=noise={noise_db}dB:d={min_silence}',
+        '-f', 'null', '-'
+    ])
+
+    silences = []
+    start = None
+    for line in proc.stderr.splitlines():
+        start_match = _SILENCE_START_PATTERN.search(line)
+        if start_match:
+            start = max(float(start_match.group(1)), 0.0)
+            continue
+        end_match = _SILENCE_END_PATTERN.search(line)
+        if end_match and start is not None:
+            silences.append((start, float(end_match.group(1))))
+            start = None
+    return silences
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _frame_rate(value: Optional[str]) -> Optional[float]:
+    """Convert an ffprobe rate such as '30000/1001' to frames per second."""
+    if not value or '/' not in value:
+        return _to_float(value)
+    num, den = value.split('/', 1)
+    try:
+        return round(float(num) / float(den), 3) if float(den) else None
+    except ValueError:
+        return None
+
+
+def _last_lines(text: str, count: int = 3) -> str:
+    """Return the last non-empty lines of ffmpeg output for error messages."""
+    lines = [line for line in text.strip().splitlines() if line.strip()]
+    return ' | '.join(lines[-count:]) or 'no output'
@@ -0,0 +1,59 @@
+"""
+Content hashing helpers for uploaded and generated media files.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Digest memo keyed on (path, size, mtime) so a file is hashed at most once per process
+_digest_memo: Dict[Tuple[str, int, int], str] = {}
+_memo_lock = threading.Lock()
+_MEMO_MAX_ENTRIES = 1024
+
+
+def file_sha256(file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Compute the SHA-256 of a file by streaming it in fixed-size chunks.
+
+    Args:
+        file_path (str): Path to the file.
+        chunk_size (int): Bytes read per iteration.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _memo_lock:
+        digest = _digest_memo.get(memo_key)
+    if digest:
+        return digest
+
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+
+    remember_digest(file_path, digest)
+    return digest
+
+
+def remember_digest(file_path: str, digest: str):
+    """
+    Record a digest computed elsewhere (e.g. while the file was being written).
+
+    Args:
+        file_path (str): Path to the file, which must exist and be complete.
+        digest (str): Hex SHA-256 digest of the file contents.
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _memo_lock:
+        if len(_digest_memo) >= _MEMO_MAX_ENTRIES:
+            _digest_memo.clear()
+        _digest_memo[memo_key] = digest
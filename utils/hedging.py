@@ -0,0 +1,152 @@
+"""
+Hedged calls: duplicate a slow call and use whichever copy answers first.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Latency below which ``percent`` % of recent calls finished, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(percent / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class HedgedCaller:
+    """
+    Runs calls with a backup request for the slow tail.
+
+    Once enough latencies have been observed, a call that has not finished
+    within the ``percentile`` latency gets a duplicate started next to it, and
+    the first successful result wins. The slower copy is left to finish in the
+    background and its result is discarded, so roughly (100 - percentile) % of
+    calls cost a second request. Without enough samples calls run directly in
+    the caller's thread.
+
+    The primary copy starts immediately on a thread of its own, leaving the
+    caller free to return whichever copy answers first; only hedges use the
+    shared pool, so time queued behind other calls never counts toward the
+    hedge delay.
+    """
+
+    def __init__(self, percentile: float = 95, min_samples: int = 20, max_workers: int = 8,
+                 window: int = 200):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._hedges_skipped = 0
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a call is hedged, or None while there are too few samples."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        return self.latencies.percentile(self.percentile)
+
+    def call(self, func: Callable[..., Any], *args,
+             hedge_permit: Callable[[], bool] = None, **kwargs) -> Any:
+        """
+        Call func(*args, **kwargs), hedging it if it runs past the latency threshold.
+
+        Args:
+            func (Callable): Idempotent call to run
+            hedge_permit (Callable, optional): Asked right before a hedge is sent,
+                                               e.g. to reserve rate limit budget;
+                                               the hedge is skipped if it returns False
+
+        Returns:
+            Any: The first successful result
+
+        Raises:
+            Exception: The first copy's error if every copy failed
+        """
+        with self._lock:
+            self._calls += 1
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed(func, *args, **kwargs)
+
+        primary = Future()
+        threading.Thread(target=self._run_primary, args=(primary, func, args, kwargs),
+                         name='hedge-primary', daemon=True).start()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        if hedge_permit is not None and not hedge_permit():
+            with self._lock:
+                self._hedges_skipped += 1
+            return primary.result()
+
+        with self._lock:
+            self._hedged += 1
+        hedge = self._executor.submit(self._timed, func, *args, **kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self._hedge_wins += 1
+                    return future.result()
+        return primary.result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hedging statistics.
+
+        Returns:
+            Dict[str, Any]: Calls, calls that were hedged, hedges that answered
+                            first, hedges skipped for lack of budget and the
+                            current hedge delay
+        """
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                'calls': self._calls,
+                'hedged': self._hedged,
+                'hedge_wins': self._hedge_wins,
+                'hedges_skipped': self._hedges_skipped,
+                'hedge_delay_seconds': round(delay, 3) if delay is not None else None,
+                'samples': len(self.latencies),
+            }
+
+    def _run_primary(self, future: Future, func: Callable[..., Any], args: tuple, kwargs: dict):
+        try:
+            future.set_result(self._timed(func, *args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _timed(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        started = time.monotonic()
+        result = func(*args, **kwargs)
+        self.latencies.record(time.monotonic() - started)
+        return result
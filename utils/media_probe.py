@@ -0,0 +1,73 @@
+"""
+Cached media metadata lookups, keyed on file content.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .ffmpeg import probe
+from .hashing import file_sha256
+
+_PROBE_CACHE_MAX_ENTRIES = 256
+
+_probe_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def probe_media(media_path: str) -> Dict[str, Any]:
+    """
+    Probe a media file once per distinct content.
+
+    Results are cached on the file's SHA-256, so re-uploads of the same
+    recording and repeated lookups during one pipeline run skip the probe.
+
+    Args:
+        media_path (str): Path to the media file.
+
+    Returns:
+        Dict[str, Any]: Metadata from utils.ffmpeg.probe() plus 'filename',
+                        'filesize', 'sha256', 'audio' (first audio stream or
+                        None) and 'video' (first video stream or None).
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist.
+        FFmpegError: If probing fails.
+    """
+    if not os.path.exists(media_path):
+        raise FileNotFoundError(f"Media file not found at '{media_path}'")
+
+    digest = file_sha256(media_path)
+    with _cache_lock:
+        cached = _probe_cache.get(digest)
+        if cached is not None:
+            _probe_cache.move_to_end(digest)
+
+    if cached is None:
+        cached = probe(media_path)
+        cached['audio'] = _first_stream(cached, 'audio')
+        cached['video'] = _first_stream(cached, 'video')
+        with _cache_lock:
+            _probe_cache[digest] = cached
+            while len(_probe_cache) > _PROBE_CACHE_MAX_ENTRIES:
+                _probe_cache.popitem(last=False)
+
+    info = dict(cached)
+    info.update({
+        'filename': Path(media_path).name,
+        'filesize': os.path.getsize(media_path),
+        'sha256': digest,
+    })
+    return info
+
+
+def clear_probe_cache():
+    """Forget every cached probe result."""
+    with _cache_lock:
+        _probe_cache.clear()
+
+
+def _first_stream(info: Dict[str, Any], codec_type: str) -> Optional[Dict[str, Any]]:
+    return next((s for s in info['streams'] if s['codec_type'] == codec_type), None)
@@ -0,0 +1,79 @@
+"""
+Single-flight de-duplication of concurrent identical calls.
+"""
+
+import copy
+import threading
+from typing import Any, Callable, Dict
+
+
+class _Call:
+    """An execution other callers with the same key can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait and receive a deep copy of its result (or the same
+    exception). Once the call finishes the key is forgotten, so results are
+    not cached here - pair this with a cache for completed calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._shared = 0
+
+    def do(self, key: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) unless an identical call is already running.
+
+        Args:
+            key (str): Identity of the call
+            func (Callable): Function to run
+
+        Returns:
+            Any: The function's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get de-duplication statistics.
+
+        Returns:
+            Dict[str, int]: Calls currently in flight and calls that were
+                            served by another caller's execution
+        """
+        with self._lock:
+            return {'in_flight': len(self._calls), 'shared': self._shared}
@@ -0,0 +1,45 @@
+"""
+Background thread that periodically runs a cleanup function.
+"""
+
+import threading
+from typing import Callable
+
+
+class PeriodicSweeper:
+    """
+    Calls ``sweep`` every ``interval_seconds`` on a daemon thread.
+
+    ``sweep`` returns how many items it removed; errors are printed and the
+    sweeper keeps running.
+    """
+
+    def __init__(self, name: str, interval_seconds: float, sweep: Callable[[], int]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.sweep = sweep
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sweeping (no-op if already running or the interval is not positive)."""
+        if self._thread is not None or self.interval_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"sweeper-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sweeping and wait for the thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                removed = self.sweep()
+                if removed:
+                    print(f"🧹 Swept {removed} expired {self.name}")
+            except Exception as e:
+                print(f"⚠️  Sweeping {self.name} failed: {e}")